@@ -0,0 +1,168 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from benchmark import percentile
+from database import connect
+
+
+class AsyncCursor:
+    """Resultado de AsyncConnection.execute(); as leituras também rodam na thread da conexão."""
+
+    def __init__(self, connection, cursor):
+        self._connection = connection
+        self._cursor = cursor
+        self.lastrowid = cursor.lastrowid
+        self.rowcount = cursor.rowcount
+
+    async def fetchone(self):
+        return await self._connection.run(lambda _: self._cursor.fetchone())
+
+    async def fetchmany(self, size=None):
+        """Próximas linhas do resultado (até 'size', ou cursor.arraysize), para ler resultados grandes em lotes."""
+        size = self._cursor.arraysize if size is None else size
+        return await self._connection.run(lambda _: self._cursor.fetchmany(size))
+
+    async def fetchall(self):
+        return await self._connection.run(lambda _: self._cursor.fetchall())
+
+    async def close(self):
+        await self._connection.run(lambda _: self._cursor.close())
+
+
+class AsyncConnection:
+    """
+    Acesso assíncrono a uma conexão sqlite3. A conexão vive em uma thread
+    exclusiva (um executor com um único worker), onde 'opener' a abre: as
+    operações de todas as corrotinas são enfileiradas nessa thread, na ordem
+    em que foram pedidas, sem bloquear o event loop.
+
+    Instruções de corrotinas diferentes se intercalam na mesma transação.
+    Para que um conjunto de instruções seja atômico, passe uma função a run(),
+    que a executa de uma só vez na thread da conexão.
+    """
+
+    def __init__(self, opener=connect, name="sqlite"):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self._connection = self._executor.submit(opener).result()
+
+    async def run(self, function, *args):
+        """Executa function(conexão, *args) na thread da conexão e retorna seu resultado."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, function, self._connection, *args)
+
+    async def execute(self, sql, params=()):
+        return AsyncCursor(self, await self.run(lambda connection: connection.execute(sql, params)))
+
+    async def executemany(self, sql, rows):
+        return AsyncCursor(self, await self.run(lambda connection: connection.executemany(sql, rows)))
+
+    async def fetchone(self, sql, params=()):
+        return await self.run(lambda connection: connection.execute(sql, params).fetchone())
+
+    async def fetchall(self, sql, params=()):
+        return await self.run(lambda connection: connection.execute(sql, params).fetchall())
+
+    async def commit(self):
+        await self.run(lambda connection: connection.commit())
+
+    async def rollback(self):
+        await self.run(lambda connection: connection.rollback())
+
+    @asynccontextmanager
+    async def transaction(self):
+        """Confirma ao sair do bloco ou desfaz se ele terminar com exceção."""
+        try:
+            yield self
+        except BaseException:
+            await self.rollback()
+            raise
+        await self.commit()
+
+    async def close(self):
+        await self.run(lambda connection: connection.close())
+        self._executor.shutdown(wait=False)
+
+
+async def open_connection(opener=connect):
+    """Abre uma AsyncConnection sem bloquear o event loop."""
+    return await asyncio.get_running_loop().run_in_executor(None, AsyncConnection, opener)
+
+
+class AsyncPool:
+    """
+    Até 'size' AsyncConnections abertas sob demanda, cada uma com sua thread,
+    compartilhadas por quantas corrotinas forem necessárias: quem não encontra
+    conexão livre aguarda a devolução de outra.
+    """
+
+    def __init__(self, opener=connect, size=4):
+        self.opener = opener
+        self.size = size
+        self._connections = []
+        self._opening = 0
+        self._idle = None
+
+    @asynccontextmanager
+    async def connection(self):
+        if self._idle is None:
+            self._idle = asyncio.LifoQueue()
+        if self._idle.empty() and len(self._connections) + self._opening < self.size:
+            self._opening += 1
+            try:
+                connection = await open_connection(self.opener)
+            finally:
+                self._opening -= 1
+            self._connections.append(connection)
+        else:
+            connection = await self._idle.get()
+        try:
+            yield connection
+        finally:
+            self._idle.put_nowait(connection)
+
+    async def close(self):
+        for connection in self._connections:
+            await connection.close()
+        self._connections = []
+        self._idle = None
+
+
+def _place_order(connection, name, item):
+    """Cadastra um usuário com um pedido (acionando o trigger) e confirma, tudo de uma vez."""
+    user_id = connection.execute("INSERT INTO users (name) VALUES (?)", (name,)).lastrowid
+    connection.execute("INSERT INTO orders (user_id, item) VALUES (?, ?)", (user_id, item))
+    connection.commit()
+
+
+async def run_async_load(pool, coroutines=200, operations=5):
+    """
+    Dispara 'coroutines' corrotinas simultâneas, cada uma fazendo 'operations'
+    pares de escrita (usuário e pedido) e leitura (pela view user_orders) no pool.
+    Retorna a vazão e os percentis de latência das operações.
+    """
+    latencies = []
+
+    async def client(number):
+        for operation in range(operations):
+            name = f"Async {number}-{operation}"
+            start = time.perf_counter()
+            async with pool.connection() as connection:
+                await connection.run(_place_order, name, f"Item {number}-{operation}")
+            async with pool.connection() as connection:
+                await connection.fetchall("SELECT name, item FROM user_orders WHERE name = ?", (name,))
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(number) for number in range(coroutines)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "operations": len(latencies),
+        "seconds": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
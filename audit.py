@@ -0,0 +1,139 @@
+from benchmark import measure
+from bulk import chunked
+from datagen import DataGenerator
+
+# Ação registrada pelo trigger order_insert para cada pedido
+ORDER_ACTION = "Novo pedido registrado"
+
+DEFAULT_FLUSH_SIZE = 10_000
+
+
+def disable_order_trigger(connection):
+    """Remove o trigger order_insert e retorna o SQL necessário para recriá-lo."""
+    row = connection.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'order_insert'"
+    ).fetchone()
+    connection.execute("DROP TRIGGER IF EXISTS order_insert")
+    connection.commit()
+    return row[0] if row else None
+
+
+def enable_order_trigger(connection, sql):
+    """Recria o trigger order_insert a partir do SQL retornado por disable_order_trigger()."""
+    connection.execute(sql)
+    connection.commit()
+
+
+class BufferedAuditLog:
+    """
+    Registro de auditoria feito pela aplicação, em vez do trigger order_insert.
+    As ações ficam em memória e são gravadas em lote na tabela logs:
+
+    - mode="rows": uma linha por ação, exatamente como o trigger grava;
+    - mode="summary": uma linha por ação distinta em cada descarga, com a
+      quantidade de ocorrências na coluna 'quantity'.
+
+    As ações pendentes são gravadas a cada 'flush_size' registros, em flush()
+    ou ao sair do bloco 'with'. A gravação acontece na transação corrente da
+    conexão; cabe a quem chama fazer o commit.
+    """
+
+    def __init__(self, connection, flush_size=DEFAULT_FLUSH_SIZE, mode="rows"):
+        if mode not in ("rows", "summary"):
+            raise ValueError(f"Modo de auditoria desconhecido: {mode}")
+        self.connection = connection
+        self.flush_size = flush_size
+        self.mode = mode
+        self.pending = {}
+        self.pending_count = 0
+
+    def record(self, action, count=1):
+        self.pending[action] = self.pending.get(action, 0) + count
+        self.pending_count += count
+        if self.pending_count >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        cursor = self.connection.cursor()
+        if self.mode == "rows":
+            cursor.executemany(
+                "INSERT INTO logs (action) VALUES (?)",
+                ((action,) for action, count in self.pending.items() for _ in range(count)),
+            )
+        else:
+            cursor.executemany("INSERT INTO logs (action, quantity) VALUES (?, ?)", self.pending.items())
+        cursor.close()
+        self.pending = {}
+        self.pending_count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+
+def insert_orders(connection, rows, audit=None, chunk_size=DEFAULT_FLUSH_SIZE):
+    """
+    Insere pedidos (user_id, item) em lotes, um commit por lote. Com 'audit',
+    cada lote também registra suas ações no BufferedAuditLog, antes do commit,
+    para que pedidos e auditoria sejam gravados na mesma transação.
+    """
+    cursor = connection.cursor()
+    total = 0
+    for chunk in chunked(rows, chunk_size):
+        cursor.executemany("INSERT INTO orders (user_id, item) VALUES (?, ?)", chunk)
+        if audit is not None:
+            audit.record(ORDER_ACTION, len(chunk))
+            audit.flush()
+        connection.commit()
+        total += len(chunk)
+    cursor.close()
+    return total
+
+
+def audit_summary(connection):
+    """Informação de auditoria independente do modo: {ação: quantidade de pedidos}."""
+    rows = connection.execute("SELECT action, SUM(quantity) FROM logs GROUP BY action").fetchall()
+    return dict(rows)
+
+
+def clear_orders(connection):
+    connection.execute("DELETE FROM orders")
+    connection.execute("DELETE FROM logs")
+    connection.commit()
+
+
+def measure_trigger_overhead(connection, users, orders, rounds=5, warmup=1):
+    """
+    Mede a inserção de 'orders' pedidos em quatro variantes: com o trigger,
+    sem auditoria nenhuma (referência) e com BufferedAuditLog nos modos
+    'rows' e 'summary'. O banco deve conter 'users' usuários com ids 1..users.
+    """
+    # Gerados uma única vez, para que a geração não entre no tempo medido
+    order_rows = list(DataGenerator().orders(orders, users))
+
+    def rows():
+        return iter(order_rows)
+
+    results = {"trigger": measure(lambda: insert_orders(connection, rows()), rounds=rounds,
+                                  warmup=warmup, rows=orders, setup=lambda: clear_orders(connection))}
+
+    trigger_sql = disable_order_trigger(connection)
+    try:
+        results["sem_auditoria"] = measure(lambda: insert_orders(connection, rows()), rounds=rounds,
+                                           warmup=warmup, rows=orders, setup=lambda: clear_orders(connection))
+        for mode in ("rows", "summary"):
+            results[f"buffer_{mode}"] = measure(
+                lambda: insert_orders(connection, rows(), BufferedAuditLog(connection, mode=mode)),
+                rounds=rounds, warmup=warmup, rows=orders, setup=lambda: clear_orders(connection),
+            )
+    finally:
+        enable_order_trigger(connection, trigger_sql)
+
+    reference = results["sem_auditoria"]["median_ms"]
+    for summary in results.values():
+        summary["overhead"] = summary["median_ms"] / reference - 1 if reference else 0.0
+    return results
@@ -0,0 +1,139 @@
+import os
+import sqlite3
+import tempfile
+
+from database import DB_PATH, connect, reset_database, restore_template, worker_path
+
+# Sistema de arquivos em memória (tmpfs) do Linux; sem ele, usa o diretório temporário
+TMPFS_DIR = "/dev/shm"
+
+# Destinos do banco da sessão: (tipo, PRAGMAs aplicados a cada conexão, descrição)
+BACKENDS = {
+    "file": ("file", {}, "arquivo em disco com a configuração padrão (journal delete, synchronous full)"),
+    "file-wal": ("file", {"journal_mode": "WAL", "synchronous": "NORMAL"},
+                 "arquivo em disco com write-ahead log e synchronous normal"),
+    "file-nosync": ("file", {"synchronous": "OFF"}, "arquivo em disco sem fsync"),
+    "file-memjournal": ("file", {"journal_mode": "MEMORY", "synchronous": "OFF"},
+                        "arquivo em disco sem fsync e com o journal em memória"),
+    "tmpfs": ("tmpfs", {}, "arquivo temporário em tmpfs (/dev/shm), com a configuração padrão"),
+    "memory": ("memdb", {}, "banco em memória compartilhado pelas conexões do processo (vfs=memdb)"),
+    "shared-cache": ("shared-cache", {}, "banco em memória com cache compartilhado (mode=memory&cache=shared)"),
+}
+
+
+class Backend:
+    """
+    Destino do banco de dados da sessão de testes: o arquivo ou URI aberto por
+    todas as conexões e os PRAGMAs (synchronous, journal_mode) aplicados a
+    cada uma. Bancos em memória só existem enquanto houver uma conexão aberta:
+    reset() abre uma conexão-âncora, mantida até close().
+    """
+
+    def __init__(self, name, database, pragmas=None, in_memory=False, temporary=False):
+        self.name = name
+        self.database = database
+        self.pragmas = pragmas or {}
+        self.in_memory = in_memory
+        self.temporary = temporary
+        self._anchor = None
+
+    @property
+    def path(self):
+        """Arquivo do banco, ou None se ele estiver em memória."""
+        return None if self.in_memory else self.database
+
+    def configure(self, connection):
+        """Aplica os PRAGMAs do destino a uma conexão recém-aberta (initializer do ConnectionPool)."""
+        for pragma, value in self.pragmas.items():
+            connection.execute(f"PRAGMA {pragma} = {value}")
+
+    def connect(self, **kwargs):
+        connection = connect(self.database, **kwargs)
+        self.configure(connection)
+        return connection
+
+    def reset(self):
+        """Restaura o esquema limpo a partir do modelo."""
+        if not self.in_memory:
+            reset_database(self.database)
+            return
+        if self._anchor is None:
+            self._anchor = connect(self.database)
+        restore_template(self._anchor, deserialize=False)
+
+    def close(self):
+        """Libera o banco em memória, devolve o arquivo ao journal padrão ou remove o arquivo temporário."""
+        if self._anchor is not None:
+            self._anchor.close()
+            self._anchor = None
+        if self.temporary:
+            for suffix in ("", "-journal", "-wal", "-shm"):
+                if os.path.exists(self.database + suffix):
+                    os.remove(self.database + suffix)
+        elif self.pragmas.get("journal_mode") == "WAL" and os.path.exists(self.database):
+            # O modo WAL fica gravado no arquivo; as próximas sessões devem encontrá-lo como antes
+            connection = sqlite3.connect(self.database)
+            connection.execute("PRAGMA journal_mode = DELETE")
+            connection.close()
+
+
+def open_backend(name, path=DB_PATH):
+    """Cria o Backend 'name' (ver BACKENDS) para o processo atual, com nomes exclusivos por worker."""
+    kind, pragmas, _ = BACKENDS[name]
+    path = worker_path(path)
+    base, ext = os.path.splitext(os.path.basename(path))
+    if kind == "file":
+        return Backend(name, path, pragmas)
+    if kind == "tmpfs":
+        directory = TMPFS_DIR if os.path.isdir(TMPFS_DIR) else tempfile.gettempdir()
+        return Backend(name, os.path.join(directory, f"{base}_{os.getpid()}{ext}"), pragmas, temporary=True)
+    if kind == "memdb":
+        return Backend(name, f"file:/{base}?vfs=memdb", pragmas, in_memory=True)
+    return Backend(name, f"file:{base}?mode=memory&cache=shared", pragmas, in_memory=True)
+
+
+def compare_timings(runs):
+    """
+    Junta os tempos de várias execuções da suíte, uma por destino
+    ({destino: [{"nodeid", "outcome", "duration_s"}...]}), em uma linha por
+    teste com a duração em cada destino. 'io_share' é a fração do tempo no
+    primeiro destino (a referência) que desaparece no destino mais rápido:
+    com um destino em memória na lista, estima quanto do teste é fsync e E/S.
+    """
+    backends = list(runs)
+    durations = {}
+    for backend, tests in runs.items():
+        for test in tests:
+            durations.setdefault(test["nodeid"], {})[backend] = test["duration_s"]
+
+    rows = []
+    for nodeid, times in durations.items():
+        reference = times.get(backends[0])
+        fastest = min(times.values())
+        rows.append({
+            "nodeid": nodeid,
+            "duration_s": times,
+            "io_share": 1 - fastest / reference if reference else None,
+        })
+    rows.sort(key=lambda row: row["duration_s"].get(backends[0], 0.0), reverse=True)
+    totals = {backend: sum(test["duration_s"] for test in tests) for backend, tests in runs.items()}
+    return {"backends": backends, "tests": rows, "totals": totals}
+
+
+def format_comparison(comparison):
+    backends = comparison["backends"]
+    width = max(12, *(len(backend) + 7 for backend in backends))
+    lines = ["".join(f"{backend + ' (ms)':>{width}}" for backend in backends) + f"{'% E/S':>8}  teste"]
+    for row in comparison["tests"]:
+        times = "".join(f"{row['duration_s'][backend] * 1000:>{width}.1f}" if backend in row["duration_s"]
+                        else f"{'-':>{width}}" for backend in backends)
+        share = f"{row['io_share']:>8.0%}" if row["io_share"] is not None else f"{'-':>8}"
+        lines.append(f"{times}{share}  {row['nodeid']}")
+
+    totals = comparison["totals"]
+    reference = totals[backends[0]]
+    lines.append("".join(f"{totals[backend] * 1000:>{width}.1f}" for backend in backends) + f"{'':>8}  total")
+    if reference:
+        lines.append("".join(f"{totals[backend] / reference:>{width - 1}.2f}x" for backend in backends)
+                     + f"{'':>8}  relativo a {backends[0]}")
+    return "\n".join(lines)
@@ -0,0 +1,213 @@
+import argparse
+import json
+import math
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from bulk import bulk_load
+from database import connect, restore_template
+
+# Quantidades de linhas usadas por padrão na linha de comando (1e2 até 1e7)
+DEFAULT_ROWS = [10 ** exponent for exponent in range(2, 8)]
+
+# Inserções individuais fazem um commit por linha; acima disso ficam lentas demais
+MAX_INDIVIDUAL_ROWS = 10_000
+
+
+def percentile(values, pct):
+    """Percentil com interpolação linear entre as amostras ordenadas."""
+    ordered = sorted(values)
+    if not ordered:
+        raise ValueError("É necessária pelo menos uma amostra.")
+    position = (len(ordered) - 1) * pct / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples_ns, rows=None):
+    """Calcula as estatísticas de uma lista de tempos, em nanossegundos."""
+    median_ns = statistics.median(samples_ns)
+    summary = {
+        "rounds": len(samples_ns),
+        "min_ms": min(samples_ns) / 1e6,
+        "median_ms": median_ns / 1e6,
+        "mean_ms": statistics.fmean(samples_ns) / 1e6,
+        "p95_ms": percentile(samples_ns, 95) / 1e6,
+        "stddev_ms": (statistics.stdev(samples_ns) if len(samples_ns) > 1 else 0.0) / 1e6,
+    }
+    if rows is not None:
+        summary["rows"] = rows
+        summary["rows_per_sec"] = rows / (median_ns / 1e9) if median_ns else float("inf")
+    return summary
+
+
+def measure(function, rounds=5, warmup=1, rows=None, setup=None):
+    """
+    Executa a função 'warmup' vezes sem medir e depois 'rounds' vezes medindo
+    com perf_counter_ns. 'setup', se informado, roda antes de cada execução e
+    fica fora da medição. Retorna as estatísticas de summarize().
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        function()
+
+    samples = []
+    for _ in range(rounds):
+        if setup:
+            setup()
+        start = time.perf_counter_ns()
+        function()
+        samples.append(time.perf_counter_ns() - start)
+
+    return summarize(samples, rows)
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Compara resultados com uma linha de base. Retorna a lista de regressões:
+    medições cuja mediana ficou mais de 'tolerance' (20% por padrão) acima da base.
+    """
+    regressions = []
+    for name, current in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        limit = reference["median_ms"] * (1 + tolerance)
+        if current["median_ms"] > limit:
+            regressions.append({
+                "name": name,
+                "baseline_ms": reference["median_ms"],
+                "current_ms": current["median_ms"],
+                "ratio": current["median_ms"] / reference["median_ms"],
+            })
+    return regressions
+
+
+def save_results(results, path):
+    """Grava os resultados em JSON, junto com informações do ambiente."""
+    document = {
+        "environment": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as output:
+        json.dump(document, output, indent=2)
+
+
+def load_results(path):
+    """Lê os resultados gravados por save_results()."""
+    with open(path, encoding="utf-8") as source:
+        return json.load(source)["results"]
+
+
+# Cargas de trabalho
+
+def clear_performance_test(connection):
+    connection.execute("DELETE FROM performance_test")
+    connection.commit()
+
+
+def individual_insert(connection, rows):
+    """Uma inserção e um commit por linha."""
+    cursor = connection.cursor()
+    for i in range(rows):
+        cursor.execute("INSERT INTO performance_test (value) VALUES (?)", (f"Value {i}",))
+        connection.commit()
+    cursor.close()
+
+
+def batch_insert(connection, rows):
+    """Todas as linhas em um único executemany e um único commit."""
+    cursor = connection.cursor()
+    cursor.executemany("INSERT INTO performance_test (value) VALUES (?)", ((f"Value {i}",) for i in range(rows)))
+    connection.commit()
+    cursor.close()
+
+
+def bulk_insert(connection, rows):
+    """Carga em lotes pelo bulk_load(), com o perfil de PRAGMAs 'fast'."""
+    bulk_load(connection, "performance_test", ["value"], ((f"Value {i}",) for i in range(rows)), profile="fast")
+
+
+WORKLOADS = {
+    "individual_insert": individual_insert,
+    "batch_insert": batch_insert,
+    "bulk_insert": bulk_insert,
+}
+
+
+def run_insert_benchmarks(connection, row_counts, rounds=5, warmup=1, workloads=WORKLOADS):
+    """Mede cada carga de trabalho para cada quantidade de linhas."""
+    results = {}
+    for rows in row_counts:
+        for name, workload in workloads.items():
+            if name == "individual_insert" and rows > MAX_INDIVIDUAL_ROWS:
+                continue
+            results[f"{name}[{rows}]"] = measure(
+                lambda: workload(connection, rows),
+                rounds=rounds,
+                warmup=warmup,
+                rows=rows,
+                setup=lambda: clear_performance_test(connection),
+            )
+    return results
+
+
+def print_results(results):
+    print(f"{'medição':<28}{'mediana (ms)':>14}{'p95 (ms)':>12}{'desvio (ms)':>13}{'linhas/s':>14}")
+    for name, summary in results.items():
+        print(
+            f"{name:<28}{summary['median_ms']:>14.3f}{summary['p95_ms']:>12.3f}"
+            f"{summary['stddev_ms']:>13.3f}{summary.get('rows_per_sec', 0):>14,.0f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de inserções no banco de testes.")
+    parser.add_argument("--rows", default=",".join(str(rows) for rows in DEFAULT_ROWS),
+                        help="quantidades de linhas separadas por vírgula (padrão: 1e2 até 1e7)")
+    parser.add_argument("--rounds", type=int, default=5, help="rodadas medidas por cenário")
+    parser.add_argument("--warmup", type=int, default=1, help="rodadas de aquecimento por cenário")
+    parser.add_argument("--output", help="arquivo JSON onde gravar os resultados")
+    parser.add_argument("--baseline", help="arquivo JSON com a linha de base para comparação")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="regressão tolerada (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    row_counts = [int(float(value)) for value in args.rows.split(",")]
+
+    with tempfile.TemporaryDirectory() as directory:
+        connection = connect(os.path.join(directory, "benchmark.sqlite"))
+        restore_template(connection)
+        results = run_insert_benchmarks(connection, row_counts, args.rounds, args.warmup)
+        connection.close()
+
+    print_results(results)
+
+    if args.output:
+        save_results(results, args.output)
+
+    if args.baseline:
+        regressions = compare(results, load_results(args.baseline), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSÃO {regression['name']}: {regression['baseline_ms']:.3f} ms -> "
+                  f"{regression['current_ms']:.3f} ms ({regression['ratio']:.2f}x)")
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+import itertools
+import time
+
+# Perfis de PRAGMA aplicados durante a carga e restaurados ao final
+PRAGMA_PROFILES = {
+    # Mantém as configurações da conexão
+    "safe": {},
+    # WAL com sincronização reduzida: seguro contra falhas do processo
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "temp_store": "MEMORY",
+    },
+    # Sem journal e sem fsync: apenas para bancos descartáveis
+    "unsafe": {
+        "journal_mode": "OFF",
+        "synchronous": "OFF",
+        "cache_size": -256000,
+        "temp_store": "MEMORY",
+        "locking_mode": "EXCLUSIVE",
+    },
+}
+
+# PRAGMAs que o SQLite não permite alterar com uma transação aberta
+OUTSIDE_TRANSACTION_PRAGMAS = {"journal_mode", "synchronous"}
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+class LoadStats:
+    """Resultado de uma carga: linhas gravadas, tempo total e vazão."""
+
+    def __init__(self, table, rows, seconds, chunks):
+        self.table = table
+        self.rows = rows
+        self.seconds = seconds
+        self.chunks = chunks
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds else float("inf")
+
+    def __repr__(self):
+        return (f"LoadStats(table={self.table!r}, rows={self.rows}, chunks={self.chunks}, "
+                f"seconds={self.seconds:.3f}, rows_per_sec={self.rows_per_sec:,.0f})")
+
+
+class DeleteStats(LoadStats):
+    """Resultado de uma exclusão em lotes, incluindo as linhas removidas em cascata."""
+
+    def __init__(self, table, rows, seconds, chunks, changes, max_chunk_seconds):
+        super().__init__(table, rows, seconds, chunks)
+        self.changes = changes
+        self.max_chunk_seconds = max_chunk_seconds
+
+    def __repr__(self):
+        return (f"DeleteStats(table={self.table!r}, rows={self.rows}, changes={self.changes}, "
+                f"chunks={self.chunks}, seconds={self.seconds:.3f}, "
+                f"max_chunk_seconds={self.max_chunk_seconds:.3f})")
+
+
+def chunked(rows, size):
+    """Divide um iterável em listas de até 'size' itens, sem materializar o todo."""
+    iterator = iter(rows)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def apply_pragmas(connection, pragmas):
+    """
+    Aplica os PRAGMAs informados e retorna os valores anteriores. Com uma
+    transação aberta, os PRAGMAs que exigem o contrário são ignorados.
+    """
+    previous = {}
+    for name, value in pragmas.items():
+        if connection.in_transaction and name in OUTSIDE_TRANSACTION_PRAGMAS:
+            continue
+        previous[name] = connection.execute(f"PRAGMA {name}").fetchone()[0]
+        connection.execute(f"PRAGMA {name} = {value}")
+    return previous
+
+
+def table_indexes(connection, table):
+    """Retorna (nome, sql) dos índices criados explicitamente para a tabela."""
+    cursor = connection.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (table,),
+    )
+    return cursor.fetchall()
+
+
+def bulk_load(connection, table, columns, rows, chunk_size=DEFAULT_CHUNK_SIZE,
+              profile="safe", defer_indexes=False, progress=None):
+    """
+    Insere as linhas de qualquer iterável (inclusive geradores) na tabela,
+    em transações explícitas de até 'chunk_size' linhas, usando memória
+    limitada ao tamanho de um lote. Se a carga falhar, o lote em andamento é
+    desfeito e só os lotes anteriores permanecem gravados.
+
+    'profile' escolhe um perfil de PRAGMA_PROFILES (ou um dicionário próprio)
+    válido apenas durante a carga. Com 'defer_indexes', os índices da tabela
+    são removidos antes da carga e recriados ao final. 'progress', se
+    informado, é chamado com o total de linhas gravadas após cada lote.
+    """
+    pragmas = PRAGMA_PROFILES[profile] if isinstance(profile, str) else profile
+    placeholders = ", ".join("?" for _ in columns)
+    statement = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+    # Confirma qualquer transação pendente: alguns PRAGMAs não funcionam dentro dela
+    connection.commit()
+    previous = apply_pragmas(connection, pragmas)
+
+    indexes = table_indexes(connection, table) if defer_indexes else []
+    for name, _ in indexes:
+        connection.execute(f"DROP INDEX {name}")
+
+    total = 0
+    chunks = 0
+    start = time.perf_counter()
+    try:
+        cursor = connection.cursor()
+        for chunk in chunked(rows, chunk_size):
+            cursor.executemany(statement, chunk)
+            connection.commit()
+            total += len(chunk)
+            chunks += 1
+            if progress:
+                progress(total)
+        cursor.close()
+    except BaseException:
+        # Desfaz o lote interrompido: só os lotes completos permanecem gravados
+        connection.rollback()
+        raise
+    finally:
+        # Recria os índices adiados, mesmo se a carga falhar no meio
+        for _, sql in indexes:
+            connection.execute(sql)
+        connection.commit()
+        apply_pragmas(connection, previous)
+
+    return LoadStats(table, total, time.perf_counter() - start, chunks)
+
+
+def bulk_delete(connection, table, where="1", params=(), chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """
+    Exclui as linhas de 'table' que satisfazem 'where' em lotes de até
+    'chunk_size' linhas, cada um em sua própria transação. Assim o bloqueio de
+    escrita é liberado entre os lotes, em vez de ficar preso durante toda a
+    exclusão (inclusive as exclusões em cascata nas tabelas filhas).
+
+    Retorna DeleteStats: 'rows' são as linhas de 'table' e 'changes' inclui
+    as removidas em cascata; 'max_chunk_seconds' é a transação mais longa.
+    """
+    statement = (f"DELETE FROM {table} WHERE rowid IN "
+                 f"(SELECT rowid FROM {table} WHERE {where} LIMIT {int(chunk_size)})")
+
+    connection.commit()
+    total = 0
+    chunks = 0
+    changes = connection.total_changes
+    longest = 0.0
+    start = time.perf_counter()
+    cursor = connection.cursor()
+    while True:
+        chunk_start = time.perf_counter()
+        cursor.execute(statement, params)
+        deleted = cursor.rowcount
+        connection.commit()
+        longest = max(longest, time.perf_counter() - chunk_start)
+        if deleted <= 0:
+            break
+        total += deleted
+        chunks += 1
+        if progress:
+            progress(total)
+    cursor.close()
+
+    return DeleteStats(table, total, time.perf_counter() - start, chunks,
+                       connection.total_changes - changes, longest)
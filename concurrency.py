@@ -0,0 +1,185 @@
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+
+from benchmark import percentile
+from database import connect, reset_database
+from datagen import DataGenerator, populate
+
+# Modos de journal comparados
+JOURNAL_MODES = ["delete", "wal"]
+
+READ_QUERY = "SELECT name, item FROM user_orders WHERE name = ?"
+
+
+def prepare_database(path, journal_mode, users=100):
+    """Restaura o esquema no arquivo, define o modo de journal e carrega os usuários."""
+    reset_database(path)
+    connection = connect(path)
+    connection.execute(f"PRAGMA journal_mode = {journal_mode}")
+    populate(connection, DataGenerator(), users=users, profile="safe")
+    connection.close()
+
+
+def order_counts(path):
+    """Quantidade de pedidos e de logs gravados no arquivo."""
+    connection = connect(path)
+    orders = connection.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+    logs = connection.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+    connection.close()
+    return orders, logs
+
+
+def open_worker(path, busy_timeout, users):
+    """
+    Conexão de um worker, com o busy_timeout informado (em segundos), e os
+    nomes gravados por prepare_database(), gerados de novo sem consultar o banco.
+    """
+    connection = connect(path)
+    connection.execute(f"PRAGMA busy_timeout = {int(busy_timeout * 1000)}")
+    return connection, [name for _, name in DataGenerator().users(users)]
+
+
+def run_operations(connection, names, role, worker, keep_going):
+    """
+    Executa escritas (pedidos, disparando o trigger order_insert) ou leituras
+    (pela view user_orders) enquanto keep_going() for verdadeiro. Retorna as
+    latências das operações concluídas (incluindo a espera por bloqueios) e a
+    quantidade de erros 'database is locked'.
+    """
+    users = len(names)
+    latencies = []
+    locked = 0
+    operation = 0
+    while keep_going():
+        user_id = (worker * 7919 + operation) % users + 1
+        operation += 1
+        start = time.perf_counter()
+        try:
+            if role == "writer":
+                connection.execute("INSERT INTO orders (user_id, item) VALUES (?, ?)",
+                                   (user_id, f"Item {worker}-{operation}"))
+                connection.commit()
+            else:
+                connection.execute(READ_QUERY, (names[user_id - 1],)).fetchall()
+        except sqlite3.OperationalError as error:
+            if "locked" not in str(error) and "busy" not in str(error):
+                raise
+            locked += 1
+            if connection.in_transaction:
+                connection.rollback()
+            continue
+        latencies.append(time.perf_counter() - start)
+    return latencies, locked
+
+
+def _run_worker(path, role, worker, duration, busy_timeout, users):
+    """Executa run_operations() por 'duration' segundos em uma conexão própria."""
+    connection, names = open_worker(path, busy_timeout, users)
+    deadline = time.perf_counter() + duration
+    try:
+        latencies, locked = run_operations(connection, names, role, worker, lambda: time.perf_counter() < deadline)
+    finally:
+        connection.close()
+    return role, latencies, locked
+
+
+def _process_worker(arguments):
+    return _run_worker(*arguments)
+
+
+def run_load(path, writers, readers, duration=1.0, busy_timeout=0.05, users=100, use_processes=False):
+    """
+    Dispara 'writers' escritores e 'readers' leitores simultâneos contra o
+    mesmo arquivo (threads ou processos) e retorna o relatório de run_report().
+    Uma exceção em algum worker é relançada depois que todos terminam.
+    """
+    jobs = [(path, "writer", i, duration, busy_timeout, users) for i in range(writers)]
+    jobs += [(path, "reader", i, duration, busy_timeout, users) for i in range(readers)]
+
+    start = time.perf_counter()
+    if use_processes:
+        with multiprocessing.get_context("spawn").Pool(len(jobs)) as pool:
+            outcomes = pool.map(_process_worker, jobs)
+    else:
+        outcomes = []
+        errors = []
+        lock = threading.Lock()
+
+        def target(arguments):
+            try:
+                outcome = _run_worker(*arguments)
+            except BaseException as error:
+                with lock:
+                    errors.append(error)
+                return
+            with lock:
+                outcomes.append(outcome)
+
+        threads = [threading.Thread(target=target, args=(job,)) for job in jobs]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+    elapsed = time.perf_counter() - start
+
+    return run_report(outcomes, elapsed)
+
+
+def run_report(outcomes, elapsed):
+    """Vazão, taxa de erros de bloqueio e percentis de latência, por papel."""
+    report = {}
+    for role in ("writer", "reader"):
+        latencies = [latency for outcome_role, values, _ in outcomes if outcome_role == role for latency in values]
+        locked = sum(count for outcome_role, _, count in outcomes if outcome_role == role)
+        attempts = len(latencies) + locked
+        entry = {
+            "operations": len(latencies),
+            "locked": locked,
+            "locked_rate": locked / attempts if attempts else 0.0,
+            "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        }
+        if latencies:
+            entry.update({
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p95_ms": percentile(latencies, 95) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000,
+                "max_ms": max(latencies) * 1000,
+            })
+        report[role] = entry
+    return report
+
+
+def concurrency_matrix(directory, levels, journal_modes=JOURNAL_MODES, duration=1.0,
+                       busy_timeout=0.05, use_processes=False):
+    """
+    Executa run_load() para cada modo de journal e nível de concorrência
+    (pares escritores:leitores). Retorna {(modo, escritores, leitores): relatório}.
+    """
+    results = {}
+    for journal_mode in journal_modes:
+        for writers, readers in levels:
+            path = os.path.join(directory, f"concorrencia_{journal_mode}_{writers}_{readers}.sqlite")
+            prepare_database(path, journal_mode)
+            results[(journal_mode, writers, readers)] = run_load(
+                path, writers, readers, duration, busy_timeout, use_processes=use_processes)
+    return results
+
+
+def format_matrix(results):
+    lines = [f"{'journal':<8}{'esc.':>5}{'leit.':>6}{'esc./s':>9}{'leit./s':>10}{'bloqueios':>11}"
+             f"{'esc. p95 (ms)':>15}{'leit. p95 (ms)':>16}"]
+    for (journal_mode, writers, readers), report in results.items():
+        writer, reader = report["writer"], report["reader"]
+        attempts = writer["operations"] + writer["locked"] + reader["operations"] + reader["locked"]
+        locked_rate = (writer["locked"] + reader["locked"]) / attempts if attempts else 0.0
+        lines.append(
+            f"{journal_mode:<8}{writers:>5}{readers:>6}{writer['throughput']:>9.0f}{reader['throughput']:>10.0f}"
+            f"{locked_rate:>11.1%}"
+            f"{writer.get('p95_ms', 0):>15.2f}{reader.get('p95_ms', 0):>16.2f}"
+        )
+    return "\n".join(lines)
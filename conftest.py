@@ -0,0 +1,476 @@
+import asyncio
+import inspect
+
+import pytest
+
+from async_db import AsyncConnection
+from backends import BACKENDS, open_backend
+from benchmark import load_results, save_results
+import events
+from database import SavepointConnection, connect, restore_template, worker_path
+from footprint import MB, FootprintTracker, compact, set_vacuum_mode
+from impact import ImpactSelector, StatementLog
+from index_advisor import Workload
+from pool import ConnectionPool
+from profiler import ProfiledConnection, Profiler
+from query_plan import PlanRecorder, PlanStore
+from scaling import parse_sizes
+from warm_runner import session_backend_key
+
+plan_store_key = pytest.StashKey()
+profiler_key = pytest.StashKey()
+footprint_key = pytest.StashKey()
+impact_key = pytest.StashKey()
+event_log_key = pytest.StashKey()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("database", "Opções do banco de dados de teste")
+    group.addoption(
+        "--db-isolation",
+        action="store",
+        default="session",
+        choices=["session", "test", "rollback"],
+        help="session: um arquivo de banco por processo, compartilhado entre os testes; "
+             "test: cada teste recebe um banco em memória novo, com o esquema já criado; "
+             "rollback: uma única conexão por processo e tudo o que o teste grava é desfeito ao final.",
+    )
+    group.addoption(
+        "--db-backend",
+        action="store",
+        default="file",
+        choices=list(BACKENDS),
+        help="destino do banco nos modos session e rollback: "
+             + "; ".join(f"{name}: {description}" for name, (_, _, description) in BACKENDS.items()),
+    )
+    group.addoption(
+        "--db-pool",
+        action="store",
+        type=int,
+        default=2,
+        help="conexões reaproveitadas entre os testes nos modos session e test "
+             "(0 abre e fecha uma conexão nova a cada teste)",
+    )
+    group.addoption(
+        "--db-vacuum",
+        action="store",
+        default="off",
+        choices=["off", "full", "incremental"],
+        help="auto_vacuum do arquivo de banco da sessão: full devolve as páginas livres a cada commit; "
+             "incremental as devolve ao final de cada teste; off mantém o comportamento padrão.",
+    )
+    group.addoption(
+        "--plans",
+        action="store",
+        default="check",
+        choices=["off", "check", "update"],
+        help="check: compara o EXPLAIN QUERY PLAN de cada consulta com query_plans.json e falha "
+             "se o plano piorar; update: grava os planos atuais como referência; off: desativa.",
+    )
+
+    group = parser.getgroup("profiling", "Profiling das instruções SQL")
+    group.addoption("--profile-sql", action="store_true", default=False,
+                    help="mede tempo, linhas e instruções da VM de cada instrução executada pelos testes")
+    group.addoption("--profile-top", action="store", type=int, default=10,
+                    help="quantidade de instruções mais lentas exibidas no resumo final")
+    group.addoption("--profile-json", action="store", default=None,
+                    help="arquivo JSON com as estatísticas de cada instrução, agrupadas por teste")
+    group.addoption("--capture-workload", action="store", default=None,
+                    help="arquivo JSON onde gravar as consultas executadas pelos testes, para o index_advisor.py")
+
+    group = parser.getgroup("events", "Registro das ações dos testes")
+    group.addoption("--events", action="store", default="auto", choices=["auto", *events.VERBOSITY],
+                    help="ações impressas no console: quiet nenhuma, normal os passos, verbose também os detalhes "
+                         "(como o progresso de cargas); auto usa normal com -s e quiet com a saída capturada")
+    group.addoption("--events-jsonl", action="store", default=None,
+                    help="arquivo JSON lines onde gravar, em segundo plano, todas as ações dos testes")
+
+    group = parser.getgroup("impact", "Seleção incremental de testes")
+    group.addoption("--changed-only", action="store_true", default=False,
+                    help="executa apenas os testes que falharam, cujo código mudou ou que usam tabelas, views, "
+                         "índices ou triggers alterados desde a última execução (cache do pytest)")
+
+    group = parser.getgroup("footprint", "Uso de memória e de disco por teste")
+    group.addoption("--footprint", action="store_true", default=False,
+                    help="mede o pico de memória do Python (tracemalloc) e do SQLite e o tamanho do banco em cada teste")
+    group.addoption("--footprint-json", action="store", default=None,
+                    help="arquivo JSON com as medições de cada teste")
+    group.addoption("--budget-python-mb", action="store", type=float, default=None,
+                    help="falha o teste cujo pico de memória do Python ultrapassar o limite (MB)")
+    group.addoption("--budget-sqlite-mb", action="store", type=float, default=None,
+                    help="falha o teste cujo pico de memória do SQLite ultrapassar o limite (MB)")
+    group.addoption("--budget-db-mb", action="store", type=float, default=None,
+                    help="falha o teste que deixar o arquivo de banco maior que o limite (MB)")
+
+    group = parser.getgroup("benchmark", "Opções dos testes de performance")
+    group.addoption("--bench-rows", action="store", default="100",
+                    help="quantidades de linhas separadas por vírgula (ex.: 100,1000,1e5)")
+    group.addoption("--bench-rounds", action="store", type=int, default=5,
+                    help="rodadas medidas por cenário")
+    group.addoption("--bench-warmup", action="store", type=int, default=1,
+                    help="rodadas de aquecimento por cenário")
+    group.addoption("--bench-json", action="store", default=None,
+                    help="arquivo JSON onde gravar os resultados dos benchmarks")
+    group.addoption("--bench-baseline", action="store", default=None,
+                    help="arquivo JSON com a linha de base; regressões fazem o teste falhar")
+    group.addoption("--bench-tolerance", action="store", type=float, default=0.2,
+                    help="regressão tolerada em relação à linha de base (0.2 = 20%%)")
+    group.addoption("--scale-sizes", action="store", default="1000:10000,4000:40000",
+                    help="tamanhos usuários:pedidos dos testes de escala, separados por vírgula "
+                         "(ex.: 1e5:1e6,1e6:1e7)")
+    group.addoption("--concurrency-levels", action="store", default="1:1,2:4",
+                    help="níveis de concorrência escritores:leitores, separados por vírgula (ex.: 1:1,4:16,16:64)")
+    group.addoption("--concurrency-duration", action="store", type=float, default=0.3,
+                    help="segundos de carga em cada nível de concorrência")
+    group.addoption("--contention-holds", action="store", default="0.05,0.2",
+                    help="segundos em que a transação longa fica aberta nos testes de bloqueio, separados por vírgula")
+    group.addoption("--contention-timeouts", action="store", default="0.01,0.5",
+                    help="valores de busy_timeout (segundos) dos escritores e leitores concorrentes, separados por vírgula")
+    group.addoption("--contention-rows", action="store", default="1e4,1e5",
+                    help="inserções pendentes desfeitas nos testes de rollback de transações grandes (ex.: 1e5,1e6)")
+    group.addoption("--scale-skew", action="store", type=float, default=1.0,
+                    help="expoente da distribuição de Zipf dos pedidos por usuário e dos filhos por pai "
+                         "(0 = uniforme)")
+
+
+def pytest_configure(config):
+    verbosity = config.getoption("--events")
+    if verbosity == "auto":
+        verbosity = "normal" if config.getoption("capture") == "no" else "quiet"
+    path = config.getoption("--events-jsonl")
+    log = events.EventLog(worker_path(path) if path else None, verbosity)
+    config.stash[event_log_key] = log
+    events.install(log)
+
+    if config.getoption("--changed-only"):
+        if getattr(config, "cache", None) is None:
+            raise pytest.UsageError("--changed-only depende do cache do pytest (não use -p no:cacheprovider)")
+        selector = ImpactSelector(config)
+        config.stash[impact_key] = selector
+        config.pluginmanager.register(selector, "sql_impact")
+
+
+def pytest_unconfigure(config):
+    log = config.stash.get(event_log_key, None)
+    if log is not None:
+        log.close()
+        events.install(events.EventLog())
+
+
+def pytest_runtest_logstart(nodeid, location):
+    events.current().start_test(nodeid)
+
+
+def pytest_runtest_logfinish(nodeid, location):
+    events.current().end_test()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Anexa ao relatório de um teste que falhou as ações registradas por ele."""
+    outcome = yield
+    report = outcome.get_result()
+    log = item.config.stash.get(event_log_key, None)
+    if report.failed and log is not None and log.recent:
+        report.sections.append(("Ações registradas", log.format_recent()))
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    """
+    Executa testes 'async def' em um event loop próprio (asyncio.run), sem
+    depender do pytest-asyncio. Testes marcados com @pytest.mark.asyncio
+    ficam a cargo desse plugin, se instalado.
+    """
+    if not inspect.iscoroutinefunction(pyfuncitem.obj) or pyfuncitem.get_closest_marker("asyncio"):
+        return None
+    arguments = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+    asyncio.run(pyfuncitem.obj(**arguments))
+    return True
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    store = config.stash.get(plan_store_key, None)
+    if store is not None and store.new:
+        terminalreporter.write_sep("-", "consultas sem plano de referência")
+        for sql in sorted(store.new):
+            terminalreporter.write_line(sql)
+        terminalreporter.write_line("Execute com --plans=update para registrá-las em query_plans.json.")
+
+    tracker = config.stash.get(footprint_key, None)
+    if tracker is not None and tracker.tests:
+        terminalreporter.write_sep("-", "maior uso de memória e disco por teste")
+        for metric in ("python_peak_bytes", "sqlite_peak_bytes", "db_bytes"):
+            for test_id, stats in tracker.largest(metric, 3):
+                terminalreporter.write_line(f"{metric:<18}{stats[metric] / MB:>10.2f} MB  {test_id}")
+
+    profiler = config.stash.get(profiler_key, None)
+    if profiler is not None and profiler.tests:
+        count = config.getoption("--profile-top")
+        terminalreporter.write_sep("-", f"{count} instruções SQL mais lentas")
+        terminalreporter.write_line(f"{'total (ms)':>11}{'máx (ms)':>10}{'vezes':>7}{'linhas':>9}{'passos VM':>11}  instrução / teste")
+        for test_id, stats in profiler.slowest(count):
+            terminalreporter.write_line(
+                f"{stats.total_ns / 1e6:>11.3f}{stats.max_ns / 1e6:>10.3f}{stats.calls:>7}"
+                f"{stats.rows:>9}{stats.vm_steps:>11}  {stats.sql[:80]}"
+            )
+            terminalreporter.write_line(f"{'':>50}{test_id}")
+
+
+@pytest.fixture(scope="session")
+def db_isolation(request):
+    """Modo de isolamento selecionado pela opção --db-isolation."""
+    return request.config.getoption("--db-isolation")
+
+
+@pytest.fixture(scope="session")
+def db_backend(request):
+    """Destino do banco da sessão, selecionado pela opção --db-backend."""
+    backend = open_backend(request.config.getoption("--db-backend"))
+    request.config.stash[session_backend_key] = backend
+    yield backend
+    del request.config.stash[session_backend_key]
+    backend.close()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def setup_database(request, db_isolation, db_backend):
+    """
+    Fixture que executa uma vez por sessão de teste (ou por worker, em paralelo).
+    Restaura o banco a partir do modelo do esquema, que só é reconstruído
+    quando a definição do esquema muda, e aplica o modo de --db-vacuum.
+    Retorna o caminho (ou URI) do banco de dados utilizado pela sessão.
+    """
+    if db_isolation != "test":
+        db_backend.reset()
+        vacuum = request.config.getoption("--db-vacuum")
+        if vacuum != "off" and db_backend.path:
+            set_vacuum_mode(db_backend.path, vacuum)
+    return db_backend.database
+
+
+@pytest.fixture(scope="session")
+def shared_connection(db_backend, setup_database):
+    """Conexão única da sessão, reaproveitada pelos testes em modo rollback."""
+    connection = db_backend.connect()
+    yield connection
+    connection.close()
+
+
+@pytest.fixture(scope="session")
+def connection_pool(request, setup_database, db_isolation, db_backend):
+    """Pool de conexões da sessão, ou None se desativado com --db-pool=0 ou no modo rollback."""
+    size = request.config.getoption("--db-pool")
+    if size <= 0 or db_isolation == "rollback":
+        yield None
+        return
+
+    if db_isolation == "test":
+        pool = ConnectionPool(":memory:", size=size)
+    else:
+        pool = ConnectionPool(setup_database, size=size, initializer=db_backend.configure)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def db_rollback(shared_connection):
+    """
+    Conexão envolvida em uma transação que é desfeita ao final do teste.
+    O teste pode usar commit() e rollback() normalmente, mas nada do que
+    ele grava permanece no banco.
+    """
+    connection = SavepointConnection(shared_connection)
+    yield connection
+    connection.close()
+
+
+@pytest.fixture(scope="session")
+def plan_store(request):
+    """Planos de referência das consultas, ou None se a verificação estiver desativada."""
+    mode = request.config.getoption("--plans")
+    if mode == "off":
+        yield None
+        return
+
+    store = PlanStore(update=mode == "update")
+    request.config.stash[plan_store_key] = store
+    yield store
+    store.save()
+
+
+@pytest.fixture(scope="session")
+def sql_profiler(request):
+    """Profiler da sessão, ou None se --profile-sql não foi informado."""
+    if not request.config.getoption("--profile-sql"):
+        yield None
+        return
+
+    profiler = Profiler()
+    request.config.stash[profiler_key] = profiler
+    yield profiler
+
+    path = request.config.getoption("--profile-json")
+    if path:
+        profiler.dump(worker_path(path))
+
+
+@pytest.fixture(scope="session")
+def footprint_tracker(request):
+    """Medidor de memória e disco da sessão, ou None se --footprint e os limites não foram informados."""
+    config = request.config
+    budgets = [config.getoption(name) for name in ("--budget-python-mb", "--budget-sqlite-mb", "--budget-db-mb")]
+    if not config.getoption("--footprint") and all(budget is None for budget in budgets):
+        yield None
+        return
+
+    tracker = FootprintTracker(*budgets)
+    config.stash[footprint_key] = tracker
+    yield tracker
+    tracker.close()
+
+    path = config.getoption("--footprint-json")
+    if path:
+        tracker.dump(worker_path(path))
+
+
+@pytest.fixture(autouse=True)
+def db_footprint(request, footprint_tracker, setup_database, db_isolation, db_backend):
+    """
+    Mede o uso de memória e de disco de cada teste e o faz falhar se algum
+    limite for ultrapassado. Com --db-vacuum=incremental, devolve ao final do
+    teste as páginas livres do arquivo de banco.
+    """
+    database = db_backend.path if db_isolation != "test" else None
+    incremental = database is not None and request.config.getoption("--db-vacuum") == "incremental"
+    if footprint_tracker is None:
+        yield
+        if incremental:
+            compact(database, incremental=True)
+        return
+
+    footprint_tracker.start()
+    yield
+    if incremental:
+        compact(database, incremental=True)
+    problems = footprint_tracker.violations(footprint_tracker.stop(request.node.nodeid, database))
+    if problems:
+        pytest.fail("Uso de recursos acima do limite:\n" + "\n".join(problems))
+
+
+@pytest.fixture(scope="session")
+def workload(request):
+    """Consultas executadas pelos testes, ou None se --capture-workload não foi informado."""
+    path = request.config.getoption("--capture-workload")
+    if not path:
+        yield None
+        return
+
+    workload = Workload()
+    yield workload
+    workload.dump(worker_path(path))
+
+
+@pytest.fixture
+def db_connection(request, setup_database, db_isolation, db_backend, connection_pool, plan_store, sql_profiler,
+                  workload):
+    """Fornece uma conexão com o banco de dados (do pool, se ativo) e a libera ao final."""
+    if db_isolation == "rollback":
+        connection = request.getfixturevalue("db_rollback")
+    elif connection_pool is not None:
+        connection = connection_pool.acquire()
+    else:
+        connection = connect(":memory:") if db_isolation == "test" else db_backend.connect()
+
+    if db_isolation == "test":
+        # Banco em memória exclusivo do teste
+        restore_template(connection)
+
+    recorder = PlanRecorder(connection) if plan_store is not None else None
+    if workload is not None:
+        connection.add_trace_listener(workload.record)
+    impact = request.config.stash.get(impact_key, None)
+    statements = StatementLog() if impact is not None else None
+    if statements is not None:
+        connection.add_trace_listener(statements.record)
+
+    if sql_profiler is not None:
+        profiled = ProfiledConnection(connection, sql_profiler, request.node.nodeid)
+        yield profiled
+        profiled.detach()
+    else:
+        yield connection
+
+    if workload is not None:
+        connection.remove_trace_listener(workload.record)
+    if statements is not None:
+        connection.remove_trace_listener(statements.record)
+        impact.observe(request.node, statements)
+    failures = plan_store.check(recorder.plans()) if recorder else {}
+    if connection_pool is not None:
+        connection_pool.release(connection)
+    elif db_isolation != "rollback":
+        connection.close()
+
+    if failures:
+        details = "\n".join(f"{sql}: {'; '.join(problems)}" for sql, problems in failures.items())
+        pytest.fail(f"Plano de execução piorou em relação a query_plans.json:\n{details}")
+
+
+@pytest.fixture
+def async_db_connection(request, setup_database, db_isolation, db_backend):
+    """
+    Versão assíncrona de db_connection: uma AsyncConnection, com sua própria
+    thread, sujeita ao mesmo modo de isolamento (--db-isolation).
+    """
+    impact = request.config.stash.get(impact_key, None)
+    statements = StatementLog()
+
+    def opener():
+        if db_isolation == "test":
+            connection = connect(":memory:")
+            restore_template(connection)
+        else:
+            connection = db_backend.connect()
+        if impact is not None:
+            connection.add_trace_listener(statements.record)
+        if db_isolation == "rollback":
+            return SavepointConnection(connection, close_connection=True)
+        return connection
+
+    connection = AsyncConnection(opener)
+    yield connection
+    asyncio.run(connection.close())
+    if impact is not None:
+        impact.observe(request.node, statements)
+
+
+@pytest.fixture(scope="session")
+def bench_config(request):
+    """Parâmetros dos benchmarks informados na linha de comando."""
+    config = request.config
+    baseline = config.getoption("--bench-baseline")
+    return {
+        "rows": [int(float(value)) for value in config.getoption("--bench-rows").split(",")],
+        "scale_sizes": parse_sizes(config.getoption("--scale-sizes")),
+        "scale_skew": config.getoption("--scale-skew"),
+        "concurrency_levels": parse_sizes(config.getoption("--concurrency-levels")),
+        "concurrency_duration": config.getoption("--concurrency-duration"),
+        "contention_holds": [float(value) for value in config.getoption("--contention-holds").split(",")],
+        "contention_timeouts": [float(value) for value in config.getoption("--contention-timeouts").split(",")],
+        "contention_rows": [int(float(value)) for value in config.getoption("--contention-rows").split(",")],
+        "rounds": config.getoption("--bench-rounds"),
+        "warmup": config.getoption("--bench-warmup"),
+        "baseline": load_results(baseline) if baseline else None,
+        "tolerance": config.getoption("--bench-tolerance"),
+    }
+
+
+@pytest.fixture(scope="session")
+def bench_results(request):
+    """Acumula os resultados de todos os benchmarks da sessão e grava o JSON ao final."""
+    results = {}
+    yield results
+    path = request.config.getoption("--bench-json")
+    if path and results:
+        save_results(results, path)
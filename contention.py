@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+
+from concurrency import JOURNAL_MODES, open_worker, prepare_database, run_operations, run_report
+from database import connect
+from datagen import DataGenerator
+
+# Tempo em que os contendores continuam operando depois que a transação longa termina
+TAIL_SECONDS = 0.05
+
+
+def hold_transaction(path, rows, hold, outcome="rollback", acquired=None, users=100):
+    """
+    Abre uma transação de escrita (BEGIN IMMEDIATE), insere 'rows' pedidos
+    pendentes, espera mais 'hold' segundos e a desfaz (outcome="rollback") ou
+    confirma ("commit"). Sinaliza o evento 'acquired' assim que detém o
+    bloqueio de escrita. Retorna a duração de cada etapa.
+    """
+    acquired = acquired or threading.Event()
+    connection = connect(path)
+    connection.isolation_level = None
+    try:
+        connection.execute("BEGIN IMMEDIATE")
+        acquired.set()
+        start = time.perf_counter()
+        if rows:
+            connection.executemany("INSERT INTO orders (user_id, item) VALUES (?, ?)",
+                                   DataGenerator().orders(rows, users))
+        inserted = time.perf_counter()
+        time.sleep(hold)
+        held = time.perf_counter()
+        connection.execute("ROLLBACK" if outcome == "rollback" else "COMMIT")
+        done = time.perf_counter()
+    finally:
+        # Também libera os contendores se a transação falhar
+        acquired.set()
+        connection.close()
+    return {
+        "rows": rows,
+        "outcome": outcome,
+        "insert_s": inserted - start,
+        "hold_s": held - inserted,
+        "finish_s": done - held,
+        "open_s": done - start,
+    }
+
+
+def run_contention(path, hold, busy_timeout, rows=0, writers=2, readers=2, outcome="rollback", users=100):
+    """
+    Mantém uma transação de escrita aberta (hold_transaction()) enquanto
+    'writers' escritores e 'readers' leitores, cada um com sua conexão e o
+    busy_timeout informado, tentam operar sem parar, até TAIL_SECONDS depois
+    do fim da transação. Retorna o relatório de run_report() (latências
+    incluindo a espera por bloqueios, erros 'database is locked' e vazão)
+    com a duração da transação em "transaction". Uma exceção na transação
+    longa ou em algum contendor é relançada depois que todas as threads terminam.
+    """
+    acquired = threading.Event()
+    # Fim da carga, definido quando a transação termina
+    deadline = [float("inf")]
+    outcomes = []
+    transaction = {}
+    # Exceções das threads, relançadas depois que todas terminam
+    errors = []
+    lock = threading.Lock()
+
+    def keep_going():
+        return time.perf_counter() < deadline[0]
+
+    def contender(role, worker):
+        try:
+            connection, names = open_worker(path, busy_timeout, users)
+            try:
+                acquired.wait()
+                latencies, locked = run_operations(connection, names, role, worker, keep_going)
+            finally:
+                connection.close()
+        except BaseException as error:
+            with lock:
+                errors.append(error)
+            return
+        with lock:
+            outcomes.append((role, latencies, locked))
+
+    def holder():
+        try:
+            transaction.update(hold_transaction(path, rows, hold, outcome, acquired, users))
+        except BaseException as error:
+            with lock:
+                # A falha da transação longa explica as dos contendores: vem primeiro
+                errors.insert(0, error)
+
+    threads = [threading.Thread(target=contender, args=("writer", i)) for i in range(writers)]
+    threads += [threading.Thread(target=contender, args=("reader", i)) for i in range(readers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    holder_thread = threading.Thread(target=holder)
+    holder_thread.start()
+    holder_thread.join()
+    deadline[0] = time.perf_counter() + TAIL_SECONDS
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if errors:
+        raise errors[0]
+
+    report = run_report(outcomes, elapsed)
+    report["transaction"] = transaction
+    return report
+
+
+def contention_matrix(directory, holds, busy_timeouts, rows=1000, journal_modes=JOURNAL_MODES,
+                      writers=2, readers=2):
+    """
+    Executa run_contention() para cada modo de journal, duração da transação
+    longa ('holds', em segundos) e busy_timeout. Retorna
+    {(modo, duração, busy_timeout): relatório}.
+    """
+    results = {}
+    for journal_mode in journal_modes:
+        for hold in holds:
+            for busy_timeout in busy_timeouts:
+                path = os.path.join(directory, f"bloqueio_{journal_mode}_{hold}_{busy_timeout}.sqlite")
+                prepare_database(path, journal_mode)
+                results[(journal_mode, hold, busy_timeout)] = run_contention(
+                    path, hold, busy_timeout, rows, writers, readers)
+    return results
+
+
+def large_rollback_waits(directory, sizes, journal_modes=JOURNAL_MODES, busy_timeout=60.0):
+    """
+    Para cada quantidade de inserções pendentes, mede quanto um escritor e
+    um leitor esperam enquanto a transação é preenchida e desfeita, com um
+    busy_timeout longo o bastante para que nenhum desista. Retorna
+    {(modo, linhas): relatório de run_contention()}.
+    """
+    results = {}
+    for journal_mode in journal_modes:
+        for rows in sizes:
+            path = os.path.join(directory, f"rollback_{journal_mode}_{rows}.sqlite")
+            prepare_database(path, journal_mode)
+            results[(journal_mode, rows)] = run_contention(path, 0.0, busy_timeout, rows, writers=1, readers=1)
+    return results
+
+
+def format_contention(results):
+    lines = [f"{'journal':<8}{'transação (s)':>14}{'busy (s)':>9}{'esc./s':>8}{'bloq. esc.':>11}"
+             f"{'esc. p50/p99/máx (ms)':>23}{'bloq. leit.':>12}{'leit. p99/máx (ms)':>20}"]
+    for (journal_mode, _, busy_timeout), report in results.items():
+        writer, reader = report["writer"], report["reader"]
+        lines.append(
+            f"{journal_mode:<8}{report['transaction']['open_s']:>14.3f}{busy_timeout:>9.3f}"
+            f"{writer['throughput']:>8.0f}{writer['locked_rate']:>11.0%}"
+            f"{_latencies(writer, 'p50_ms', 'p99_ms', 'max_ms'):>23}{reader['locked_rate']:>12.0%}"
+            f"{_latencies(reader, 'p99_ms', 'max_ms'):>20}"
+        )
+    return "\n".join(lines)
+
+
+def format_rollback_waits(results):
+    lines = [f"{'journal':<8}{'pendentes':>11}{'inserção (s)':>13}{'rollback (s)':>13}"
+             f"{'espera esc. (ms)':>17}{'espera leit. máx (ms)':>22}"]
+    for (journal_mode, rows), report in results.items():
+        transaction = report["transaction"]
+        lines.append(
+            f"{journal_mode:<8}{rows:>11}{transaction['insert_s']:>13.3f}{transaction['finish_s']:>13.3f}"
+            f"{report['writer'].get('max_ms', 0):>17.1f}{report['reader'].get('max_ms', 0):>22.1f}"
+        )
+    return "\n".join(lines)
+
+
+def _latencies(entry, *keys):
+    return "/".join(f"{entry[key]:.1f}" for key in keys) if keys[0] in entry else "-"
@@ -0,0 +1,239 @@
+import glob
+import hashlib
+import os
+import sqlite3
+import tempfile
+
+# Arquivo de banco de dados padrão utilizado pelos testes
+DB_PATH = "identifier.sqlite"
+
+# Diretório onde ficam as imagens-modelo do esquema
+TEMPLATE_DIR = ".db_templates"
+
+# Tamanho do cache de instruções preparadas de cada conexão (o padrão do
+# módulo sqlite3 é 128); comporta todas as consultas distintas da suíte
+CACHED_STATEMENTS = 256
+
+# Definição completa do esquema usado pelos testes
+SCHEMA = [
+    # Tabelas principais
+    "CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)",
+    "CREATE TABLE orders (id INTEGER PRIMARY KEY, user_id INTEGER, item TEXT, FOREIGN KEY (user_id) REFERENCES users(id))",
+    # quantity > 1 apenas nos resumos gravados pela auditoria em lote (audit.py)
+    "CREATE TABLE logs (id INTEGER PRIMARY KEY, action TEXT, quantity INTEGER NOT NULL DEFAULT 1)",
+
+    # Tabela para teste de índice
+    "CREATE TABLE test (id INTEGER PRIMARY KEY, name TEXT)",
+    "CREATE INDEX idx_name ON test(name)",
+
+    # Tabelas com CASCADE
+    "CREATE TABLE parents (id INTEGER PRIMARY KEY, name TEXT)",
+    "CREATE TABLE children (id INTEGER PRIMARY KEY, parent_id INTEGER, name TEXT, FOREIGN KEY (parent_id) REFERENCES parents(id) ON DELETE CASCADE)",
+    # Sem índice na chave estrangeira, cada exclusão em cascata percorre children inteira
+    "CREATE INDEX idx_children_parent_id ON children(parent_id)",
+
+    # Tabela para teste de performance
+    "CREATE TABLE performance_test (id INTEGER PRIMARY KEY, value TEXT)",
+
+    # View
+    "CREATE VIEW user_orders AS SELECT users.name, orders.item FROM users INNER JOIN orders ON users.id = orders.user_id",
+
+    # Trigger
+    "CREATE TRIGGER order_insert AFTER INSERT ON orders BEGIN INSERT INTO logs (action) VALUES ('Novo pedido registrado'); END;",
+]
+
+
+def worker_path(path):
+    """
+    Retorna a versão do arquivo exclusiva do processo atual. Quando os testes
+    rodam em paralelo (pytest-xdist), cada worker recebe seu próprio arquivo,
+    por exemplo 'identifier_gw0.sqlite'.
+    """
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if not worker:
+        return path
+    base, ext = os.path.splitext(path)
+    return f"{base}_{worker}{ext}"
+
+
+class TracedConnection(sqlite3.Connection):
+    """
+    Conexão que repassa cada instrução SQL executada para uma lista de ouvintes.
+    O SQLite aceita apenas um callback de trace por conexão; esta classe permite
+    que várias ferramentas (planos de execução, profiling...) observem a mesma conexão.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.trace_listeners = []
+
+    def _dispatch(self, sql):
+        for listener in self.trace_listeners:
+            listener(sql)
+
+    def add_trace_listener(self, listener):
+        if not self.trace_listeners:
+            self.set_trace_callback(self._dispatch)
+        self.trace_listeners.append(listener)
+
+    def remove_trace_listener(self, listener):
+        self.trace_listeners.remove(listener)
+        if not self.trace_listeners:
+            self.set_trace_callback(None)
+
+
+def is_uri(database):
+    """Indica se o banco é informado como URI ('file:...'), como os bancos em memória compartilhados."""
+    return database.startswith("file:")
+
+
+def connect(database=DB_PATH, cached_statements=CACHED_STATEMENTS, check_same_thread=True):
+    """Abre uma conexão com o banco de dados (arquivo ou URI) e habilita chaves estrangeiras."""
+    connection = sqlite3.connect(database, factory=TracedConnection, cached_statements=cached_statements,
+                                 check_same_thread=check_same_thread, uri=is_uri(database))
+
+    # Habilitar suporte a chaves estrangeiras
+    cursor = connection.cursor()
+    cursor.execute("PRAGMA foreign_keys = ON;")
+    cursor.close()
+
+    return connection
+
+
+class SavepointConnection:
+    """
+    Envolve uma conexão em uma transação externa que é sempre desfeita ao final.
+    Dentro dela, commit() e rollback() atuam sobre um SAVEPOINT: commit() confirma
+    o trabalho apenas na transação externa e rollback() desfaz o que foi feito desde
+    o último commit(). Os demais atributos são repassados para a conexão original.
+    Com close_connection=True, close() também fecha a conexão original.
+    """
+
+    def __init__(self, connection, name="test_case", close_connection=False):
+        self._connection = connection
+        self._name = name
+        self._close_connection = close_connection
+
+        # Controle manual das transações (sem BEGIN implícito do módulo sqlite3)
+        connection.isolation_level = None
+        connection.execute("BEGIN")
+        connection.execute(f"SAVEPOINT {name}")
+
+    def commit(self):
+        self._connection.execute(f"RELEASE SAVEPOINT {self._name}")
+        self._connection.execute(f"SAVEPOINT {self._name}")
+
+    def rollback(self):
+        self._connection.execute(f"ROLLBACK TO SAVEPOINT {self._name}")
+
+    def close(self):
+        """Desfaz tudo o que foi feito desde a criação."""
+        if self._connection.in_transaction:
+            self._connection.execute("ROLLBACK")
+        if self._close_connection:
+            self._connection.close()
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+def create_schema(connection):
+    """Cria todas as tabelas, índices, views e triggers necessários para os testes."""
+    cursor = connection.cursor()
+    for statement in SCHEMA:
+        cursor.execute(statement)
+    connection.commit()
+    cursor.close()
+
+
+def schema_fingerprint():
+    """Hash da definição do esquema; muda sempre que SCHEMA for alterado."""
+    digest = hashlib.sha256()
+    digest.update(sqlite3.sqlite_version.encode())
+    for statement in SCHEMA:
+        digest.update(statement.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def template_path():
+    """Caminho da imagem-modelo correspondente ao esquema atual."""
+    return os.path.join(TEMPLATE_DIR, f"schema_{schema_fingerprint()[:16]}.sqlite")
+
+
+def build_template():
+    """
+    Garante que a imagem-modelo do esquema atual exista em disco.
+    O modelo só é reconstruído quando a definição do esquema muda; modelos
+    antigos são removidos. Retorna o caminho do modelo.
+    """
+    path = template_path()
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(TEMPLATE_DIR, exist_ok=True)
+    for stale in glob.glob(os.path.join(TEMPLATE_DIR, "schema_*.sqlite")):
+        if stale == path:
+            continue
+        try:
+            os.remove(stale)
+        except OSError:
+            pass
+
+    source = sqlite3.connect(":memory:")
+    create_schema(source)
+
+    # Grava em arquivo temporário e renomeia, para que workers em paralelo
+    # nunca enxerguem um modelo pela metade
+    fd, temp_path = tempfile.mkstemp(dir=TEMPLATE_DIR, suffix=".tmp")
+    os.close(fd)
+    target = sqlite3.connect(temp_path)
+    source.backup(target)
+    target.close()
+    source.close()
+    os.replace(temp_path, path)
+
+    return path
+
+
+_template_image = None
+
+
+def open_template():
+    """Abre o modelo do esquema atual somente para leitura."""
+    return sqlite3.connect(f"file:{build_template()}?mode=ro", uri=True)
+
+
+def template_image():
+    """Conteúdo serializado do modelo, carregado uma vez por processo."""
+    global _template_image
+    if _template_image is None:
+        template = open_template()
+        _template_image = template.serialize()
+        template.close()
+    return _template_image
+
+
+def restore_template(connection, deserialize=True):
+    """
+    Substitui todo o conteúdo do banco da conexão pelo modelo do esquema,
+    em uma única cópia. Bancos em memória são desserializados diretamente;
+    arquivos recebem o modelo pela API de backup do SQLite. Use
+    deserialize=False em bancos em memória compartilhados (cache=shared):
+    desserializados, eles deixariam de ser vistos pelas outras conexões.
+    """
+    database = connection.execute("PRAGMA database_list").fetchone()[2]
+    if deserialize and not database and hasattr(connection, "deserialize"):
+        connection.deserialize(template_image())
+        return
+
+    template = open_template()
+    template.backup(connection)
+    template.close()
+
+
+def reset_database(database=DB_PATH):
+    """Restaura o esquema limpo, a partir do modelo, no banco de dados informado."""
+    connection = sqlite3.connect(database, uri=is_uri(database))
+    restore_template(connection)
+    connection.close()
@@ -0,0 +1,147 @@
+import random
+from itertools import accumulate
+
+from bulk import bulk_load
+
+# Nomes e sobrenomes em ordem aproximada de frequência: com a distribuição de
+# Zipf, os primeiros aparecem muito mais que os últimos, como na vida real
+FIRST_NAMES = [
+    "Maria", "José", "Ana", "João", "Antônio", "Francisco", "Carlos", "Paulo", "Pedro", "Lucas",
+    "Luíza", "Conceição", "Gabriel", "Letícia", "Júlia", "Mateus", "Raimundo", "Sebastião", "Inês", "Marcelo",
+    "Beatriz", "Íris", "Tiago", "Cecília", "Lúcia", "Vitória", "Otávio", "Débora", "Émerson", "Caetano",
+    "Zoë", "François", "Jürgen", "Søren", "Łukasz", "Nguyễn", "Ángel", "Björk", "Chloé", "Dmitri",
+]
+LAST_NAMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+    "Costa", "Ribeiro", "Martins", "Carvalho", "Araújo", "Gonçalves", "Rocha", "Almeida", "Nascimento", "Conceição",
+    "Brandão", "Magalhães", "Falcão", "Assunção", "Simões", "Guimarães", "Silveira", "Damião", "Lemos", "Sá",
+    "Müller", "Dubois", "Kowalski", "Øster", "Núñez", "Tanaka", "O'Connor", "Barbosa", "D'Ávila", "Çelik",
+]
+
+PRODUCTS = [
+    "Camiseta", "Notebook", "Fone de ouvido", "Cadeira", "Monitor", "Teclado", "Livro", "Cafeteira", "Tênis",
+    "Mochila", "Celular", "Geladeira", "Luminária", "Panela", "Relógio", "Bicicleta", "Impressora", "Ventilador",
+]
+ADJECTIVES = [
+    "básico", "premium", "sem fio", "ergonômico", "inox", "compacto", "gamer", "infantil", "de algodão",
+    "com LED", "dobrável", "portátil", "edição limitada", "recondicionado", "bivolt",
+]
+COLORS = ["preto", "branco", "azul-marinho", "vermelho", "cinza", "verde-musgo", "rosé", "âmbar"]
+
+
+def zipf_cumulative(keys, skew):
+    """Pesos acumulados da distribuição de Zipf sobre as chaves 1..keys (skew 0 = uniforme)."""
+    return list(accumulate(1 / rank ** skew for rank in range(1, keys + 1)))
+
+
+def zipf_keys(count, keys, skew=1.0, seed=42, batch=10_000):
+    """
+    Gera 'count' chaves entre 1 e 'keys' com distribuição de Zipf: a chave de
+    posição k aparece com frequência proporcional a 1/k^skew. A memória usada
+    depende de 'keys' (tabela de pesos), não de 'count'.
+    """
+    generator = random.Random(seed)
+    population = range(1, keys + 1)
+    weights = zipf_cumulative(keys, skew)
+    while count > 0:
+        size = min(batch, count)
+        yield from generator.choices(population, cum_weights=weights, k=size)
+        count -= size
+
+
+class DataGenerator:
+    """
+    Gerador determinístico de dados com formato de produção para o esquema dos
+    testes. Cada tabela tem seu próprio fluxo de números aleatórios, derivado
+    de 'seed': o mesmo seed gera sempre as mesmas linhas, independentemente da
+    ordem em que as tabelas são geradas. Todos os métodos devolvem geradores,
+    prontos para alimentar bulk_load() com memória limitada.
+
+    - nomes com acentos e caracteres de vários alfabetos, com um ou dois
+      sobrenomes, e frequências de Zipf (muitos 'Silva', poucos 'Çelik');
+    - chaves estrangeiras (orders.user_id, children.parent_id) com Zipf de
+      expoente 'skew': poucos usuários concentram a maior parte dos pedidos;
+    - descrições de produtos com comprimento variável.
+    """
+
+    def __init__(self, seed=42, skew=1.0):
+        self.seed = seed
+        self.skew = skew
+        self._first_weights = zipf_cumulative(len(FIRST_NAMES), 1.0)
+        self._last_weights = zipf_cumulative(len(LAST_NAMES), 1.0)
+
+    def _random(self, stream):
+        return random.Random(f"{self.seed}:{stream}")
+
+    def _name(self, generator):
+        first = generator.choices(FIRST_NAMES, cum_weights=self._first_weights)[0]
+        last = generator.choices(LAST_NAMES, cum_weights=self._last_weights, k=generator.choice((1, 1, 2)))
+        return " ".join([first, *last])
+
+    def names(self, count, stream="names"):
+        generator = self._random(stream)
+        for _ in range(count):
+            yield self._name(generator)
+
+    def users(self, count, start_id=1):
+        """Linhas (id, name) de users."""
+        for user_id, name in enumerate(self.names(count, "users"), start_id):
+            yield user_id, name
+
+    def orders(self, count, users, skew=None):
+        """Linhas (user_id, item) de orders, para usuários com ids 1..users."""
+        generator = self._random("orders")
+        user_ids = zipf_keys(count, users, self.skew if skew is None else skew, f"{self.seed}:orders_user_id")
+        for user_id in user_ids:
+            item = generator.choice(PRODUCTS)
+            if generator.random() < 0.7:
+                item += " " + generator.choice(ADJECTIVES)
+            if generator.random() < 0.5:
+                item += " " + generator.choice(COLORS)
+            if generator.random() < 0.3:
+                item += f" {generator.choice('ABCDEFGHJKLMNPRSTUVXZ')}{generator.randint(10, 9999)}"
+            yield user_id, item
+
+    def parents(self, count, start_id=1):
+        """Linhas (id, name) de parents."""
+        for parent_id, name in enumerate(self.names(count, "parents"), start_id):
+            yield parent_id, name
+
+    def children(self, count, parents, skew=None):
+        """Linhas (parent_id, name) de children, para pais com ids 1..parents."""
+        names = self.names(count, "children")
+        parent_ids = zipf_keys(count, parents, self.skew if skew is None else skew, f"{self.seed}:children_parent_id")
+        for parent_id, name in zip(parent_ids, names):
+            yield parent_id, name.split(" ")[0]
+
+    def logins(self, count):
+        """Linhas (name,) da tabela test: logins derivados de nomes, com comprimentos variados."""
+        generator = self._random("logins")
+        for name in self.names(count, "logins"):
+            parts = name.lower().split(" ")
+            login = generator.choice((".", "_", "")).join(parts[:generator.randint(1, len(parts))])
+            if generator.random() < 0.6:
+                login += str(generator.randint(1, 9999))
+            yield (login,)
+
+
+def populate(connection, generator=None, users=0, orders=0, parents=0, children=0, test=0,
+             chunk_size=50_000, profile="unsafe"):
+    """
+    Carrega as quantidades pedidas de cada tabela com bulk_load(), direto do
+    gerador (padrão: DataGenerator()), e atualiza as estatísticas do otimizador.
+    As chaves estrangeiras apontam para os ids 1..users e 1..parents.
+    """
+    generator = generator or DataGenerator()
+    tables = [
+        ("users", ["id", "name"], users, lambda: generator.users(users)),
+        ("orders", ["user_id", "item"], orders, lambda: generator.orders(orders, users)),
+        ("parents", ["id", "name"], parents, lambda: generator.parents(parents)),
+        ("children", ["parent_id", "name"], children, lambda: generator.children(children, parents)),
+        ("test", ["name"], test, lambda: generator.logins(test)),
+    ]
+    for table, columns, count, rows in tables:
+        if count:
+            bulk_load(connection, table, columns, rows(), chunk_size=chunk_size, profile=profile)
+    connection.execute("ANALYZE")
+    connection.commit()
@@ -0,0 +1,154 @@
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+from colorama import Fore, Style, init
+
+from benchmark import measure
+
+# Inicializar colorama
+init(autoreset=True)
+
+# Verbosidade do console: quiet não imprime nada, normal imprime os passos
+# ("step") e verbose também os detalhes ("detail"), como o progresso de cargas
+VERBOSITY = {"quiet": 0, "normal": 1, "verbose": 2}
+LEVELS = {"step": 1, "detail": 2}
+
+
+class EventLog:
+    """
+    Registro estruturado das ações dos testes. Cada evento (horário, teste,
+    nível, ação e detalhes) fica em memória e é entregue em lotes de
+    'batch_size' a uma thread que grava o arquivo JSON lines 'path', sem que
+    o teste espere pela escrita. No console, só são impressos os eventos até a
+    verbosidade escolhida. Os últimos 'recent' eventos do teste atual ficam
+    disponíveis para o relatório de falhas.
+
+    emit() deve ser chamado pela thread que executa os testes.
+    """
+
+    def __init__(self, path=None, verbosity="normal", batch_size=1000, recent=200, stream=None):
+        self.path = path
+        self.verbosity = VERBOSITY[verbosity]
+        self.batch_size = batch_size
+        self.stream = stream
+        self.test_id = None
+        self.recent = deque(maxlen=recent)
+        self.emitted = 0
+        self._buffer = []
+        self._queue = None
+        self._writer = None
+        if path:
+            self._queue = queue.Queue()
+            self._writer = threading.Thread(target=self._write, args=(path,), name="event-log", daemon=True)
+            self._writer.start()
+
+    def emit(self, action, details="", level="step"):
+        event = (time.time(), self.test_id, level, action, details)
+        self.emitted += 1
+        self.recent.append(event)
+        if LEVELS[level] <= self.verbosity:
+            self.render(action, details)
+        if self._queue is not None:
+            self._buffer.append(event)
+            if len(self._buffer) >= self.batch_size:
+                self.flush()
+
+    def render(self, action, details=""):
+        """Imprime uma ação de teste formatada com cores."""
+        print(f"{Fore.BLUE}[AÇÃO]{Style.RESET_ALL} {Fore.GREEN}{action}{Style.RESET_ALL}", file=self.stream)
+        if details:
+            print(f"  {Fore.WHITE}{details}{Style.RESET_ALL}", file=self.stream)
+
+    def flush(self):
+        """Entrega os eventos acumulados à thread de gravação."""
+        if self._queue is not None and self._buffer:
+            self._queue.put(self._buffer)
+            self._buffer = []
+
+    def start_test(self, test_id):
+        self.test_id = test_id
+        self.recent.clear()
+
+    def end_test(self):
+        self.flush()
+        self.test_id = None
+
+    def format_recent(self):
+        """Eventos recentes do teste, um por linha, para o relatório de falhas."""
+        lines = []
+        for timestamp, _, level, action, details in self.recent:
+            clock = time.strftime("%H:%M:%S", time.localtime(timestamp)) + f".{int(timestamp % 1 * 1000):03d}"
+            lines.append(f"{clock} [{level}] {action}" + (f" - {details}" if details else ""))
+        return "\n".join(lines)
+
+    def _write(self, path):
+        with open(path, "w", encoding="utf-8") as output:
+            while True:
+                batch = self._queue.get()
+                if batch is None:
+                    return
+                output.write("".join(
+                    json.dumps({"ts": timestamp, "test": test_id, "level": level, "action": action,
+                                "details": details}, ensure_ascii=False) + "\n"
+                    for timestamp, test_id, level, action, details in batch
+                ))
+
+    def close(self):
+        """Grava os eventos pendentes e encerra a thread de gravação."""
+        self.flush()
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+            self._queue = None
+
+
+# Fora do pytest, as ações são impressas como sempre foram
+_log = EventLog()
+
+
+def install(log):
+    """Define o EventLog que recebe as ações de print_action() e retorna o anterior."""
+    global _log
+    previous, _log = _log, log
+    return previous
+
+
+def current():
+    return _log
+
+
+def print_action(action, details="", level="step"):
+    """Registra uma ação de teste no EventLog atual, que a imprime conforme a verbosidade."""
+    _log.emit(action, details, level)
+
+
+def measure_overhead(directory, events=10_000, rounds=5, warmup=1):
+    """
+    Custo de registrar 'events' ações de três formas: impressas com cores a
+    cada ação (como o antigo print_action), em silêncio só na memória e em
+    silêncio com gravação em JSON lines em segundo plano. A saída impressa vai
+    para um arquivo em 'directory', mais barato que um terminal de verdade.
+    Retorna {forma: estatísticas de measure()}.
+    """
+    def emit_all(log):
+        for number in range(events):
+            log.emit("Inserindo usuário", f"Nome: 'Cliente {number}'")
+        log.flush()
+
+    results = {}
+    with open(os.path.join(directory, "console.txt"), "w", encoding="utf-8") as console:
+        log = EventLog(verbosity="normal", stream=console)
+        results["print"] = measure(lambda: emit_all(log), rounds=rounds, warmup=warmup, rows=events)
+
+    log = EventLog(verbosity="quiet")
+    results["quiet"] = measure(lambda: emit_all(log), rounds=rounds, warmup=warmup, rows=events)
+
+    log = EventLog(os.path.join(directory, "eventos.jsonl"), verbosity="quiet")
+    results["jsonl"] = measure(lambda: emit_all(log), rounds=rounds, warmup=warmup, rows=events)
+    log.close()
+    return results
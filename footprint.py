@@ -0,0 +1,159 @@
+import ctypes
+import ctypes.util
+import json
+import os
+import sqlite3
+import tracemalloc
+
+# Códigos de sqlite3_status64()
+SQLITE_STATUS_MEMORY_USED = 0
+SQLITE_STATUS_PAGECACHE_OVERFLOW = 2
+
+MB = 1024 * 1024
+
+
+def _load_sqlite_library():
+    """
+    Biblioteca do SQLite usada pelo módulo sqlite3, para ler as estatísticas
+    de memória que o módulo não expõe. Retorna None se não for possível
+    carregá-la (por exemplo, SQLite embutido estaticamente sem exportar símbolos).
+    """
+    import _sqlite3
+
+    for name in (_sqlite3.__file__, ctypes.util.find_library("sqlite3")):
+        if not name:
+            continue
+        try:
+            library = ctypes.CDLL(name)
+            library.sqlite3_libversion.restype = ctypes.c_char_p
+            library.sqlite3_status64.argtypes = [ctypes.c_int, ctypes.POINTER(ctypes.c_int64),
+                                                 ctypes.POINTER(ctypes.c_int64), ctypes.c_int]
+        except (OSError, AttributeError):
+            continue
+        # Garante que é a mesma versão (e, na prática, a mesma biblioteca) usada pelo sqlite3
+        if library.sqlite3_libversion().decode() == sqlite3.sqlite_version:
+            return library
+    return None
+
+
+_library = _load_sqlite_library()
+
+
+def sqlite_status(op, reset=False):
+    """(valor atual, pico) de uma estatística global do SQLite, ou None se indisponível."""
+    if _library is None:
+        return None
+    current = ctypes.c_int64()
+    highwater = ctypes.c_int64()
+    if _library.sqlite3_status64(op, ctypes.byref(current), ctypes.byref(highwater), int(reset)) != 0:
+        return None
+    return current.value, highwater.value
+
+
+def database_footprint(connection):
+    """Tamanho do banco da conexão: páginas em uso, páginas livres e bytes."""
+    page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+    page_count = connection.execute("PRAGMA page_count").fetchone()[0]
+    freelist = connection.execute("PRAGMA freelist_count").fetchone()[0]
+    return {
+        "page_size": page_size,
+        "page_count": page_count,
+        "freelist_count": freelist,
+        "db_bytes": page_count * page_size,
+        "free_bytes": freelist * page_size,
+    }
+
+
+def file_footprint(path):
+    """database_footprint() de um arquivo de banco, aberto somente para leitura."""
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return database_footprint(connection)
+    finally:
+        connection.close()
+
+
+def set_vacuum_mode(path, mode):
+    """
+    Define o auto_vacuum do arquivo ('full' ou 'incremental') e compacta o
+    banco com VACUUM, necessário para que a mudança tenha efeito.
+    """
+    connection = sqlite3.connect(path)
+    connection.execute(f"PRAGMA auto_vacuum = {mode}")
+    connection.execute("VACUUM")
+    connection.close()
+
+
+def compact(path, incremental=False):
+    """Devolve ao sistema as páginas livres do arquivo (incremental_vacuum ou VACUUM)."""
+    connection = sqlite3.connect(path)
+    # Com execute(), o módulo sqlite3 executa apenas um passo do incremental_vacuum
+    # (uma página); executescript() executa a instrução até o fim
+    connection.executescript("PRAGMA incremental_vacuum;" if incremental else "VACUUM;")
+    connection.close()
+
+
+class FootprintTracker:
+    """
+    Mede, para cada teste, o pico de memória alocada pelo Python (tracemalloc),
+    o pico de memória do SQLite (sqlite3_memory_used), o cache de páginas e o
+    tamanho do banco ao final, e compara com os limites configurados.
+    """
+
+    def __init__(self, python_mb=None, sqlite_mb=None, db_mb=None):
+        self.budgets = {"python_peak_bytes": python_mb, "sqlite_peak_bytes": sqlite_mb, "db_bytes": db_mb}
+        self.tests = {}
+        self._baseline = 0
+        self._previous_peak = 0
+        self._started_tracing = False
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        # Só zera os picos globais quando o rastreamento é deste medidor: dentro de
+        # outra medição (como a de --footprint), zerá-los apagaria o pico dela
+        if self._started_tracing:
+            tracemalloc.reset_peak()
+            sqlite_status(SQLITE_STATUS_MEMORY_USED, reset=True)
+        self._baseline, self._previous_peak = tracemalloc.get_traced_memory()
+
+    def stop(self, test_id, database=None):
+        """Encerra a medição do teste e retorna {métrica: valor}; 'database' é o arquivo a inspecionar."""
+        current, peak = tracemalloc.get_traced_memory()
+        # Sem reset_peak(), um pico anterior ao início só indica que o deste trecho não o superou
+        growth = (peak if peak > self._previous_peak else current) - self._baseline
+        stats = {"python_peak_bytes": max(0, growth)}
+
+        memory = sqlite_status(SQLITE_STATUS_MEMORY_USED)
+        if memory is not None:
+            stats["sqlite_used_bytes"], stats["sqlite_peak_bytes"] = memory
+        page_cache = sqlite_status(SQLITE_STATUS_PAGECACHE_OVERFLOW)
+        if page_cache is not None:
+            stats["page_cache_bytes"] = page_cache[0]
+        if database and os.path.exists(database):
+            stats.update(file_footprint(database))
+
+        self.tests[test_id] = stats
+        return stats
+
+    def violations(self, stats):
+        """Mensagens dos limites ultrapassados (em MB) pelas estatísticas de um teste."""
+        problems = []
+        for metric, budget in self.budgets.items():
+            if budget is not None and metric in stats and stats[metric] > budget * MB:
+                problems.append(f"{metric} = {stats[metric] / MB:.2f} MB excede o limite de {budget} MB")
+        return problems
+
+    def largest(self, metric, count=5):
+        ranked = [(test_id, stats) for test_id, stats in self.tests.items() if metric in stats]
+        return sorted(ranked, key=lambda pair: pair[1][metric], reverse=True)[:count]
+
+    def close(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as output:
+            json.dump({"budgets": self.budgets, "tests": self.tests}, output, indent=2)
@@ -0,0 +1,236 @@
+import ast
+import hashlib
+import os
+import sqlite3
+
+import pytest
+
+from database import template_image
+from query_plan import normalize_sql
+
+# Chave do cache do pytest (.pytest_cache) com o resultado e as dependências de cada teste
+CACHE_KEY = "sql_impact/tests"
+
+# Tabelas e views usadas pelo teste em execução
+touched_key = pytest.StashKey()
+
+# Dependência de todo o esquema: testes que não usam as fixtures de conexão ou
+# executam instruções que não podem ser analisadas no modelo
+WHOLE_SCHEMA = "*"
+
+
+def schema_groups(connection):
+    """{objeto: tabela ou view a que pertence}; índices e triggers pertencem à sua tabela."""
+    return dict(connection.execute("SELECT name, tbl_name FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'"))
+
+
+def schema_fingerprints(connection):
+    """
+    Hash de cada tabela (com seus índices e triggers) e de cada view do
+    esquema, e do esquema inteiro em WHOLE_SCHEMA.
+    """
+    digests = {WHOLE_SCHEMA: hashlib.sha256()}
+    for table, kind, name, sql in connection.execute(
+            "SELECT tbl_name, type, name, sql FROM sqlite_master WHERE name NOT LIKE 'sqlite_%' "
+            "ORDER BY tbl_name, type, name"):
+        entry = f"{kind}\0{name}\0{sql}\0".encode()
+        digests.setdefault(table, hashlib.sha256()).update(entry)
+        digests[WHOLE_SCHEMA].update(entry)
+    return {name: digest.hexdigest()[:16] for name, digest in digests.items()}
+
+
+class ImpactAnalyzer:
+    """
+    Descobre as tabelas e views de que cada instrução depende: a instrução é
+    preparada (com EXPLAIN, sem executar) em uma cópia em memória do modelo do
+    esquema que tem um authorizer, chamado pelo SQLite para cada tabela,
+    coluna, view e trigger envolvidos, inclusive exclusões em cascata.
+    Instruções que não podem ser preparadas no modelo (por usarem objetos
+    criados pelo próprio teste) dependem de todo o esquema.
+    """
+
+    def __init__(self):
+        # Sem cache de instruções: o authorizer só é chamado quando a instrução é preparada
+        self._connection = sqlite3.connect(":memory:", cached_statements=0)
+        self._connection.deserialize(template_image())
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self.groups = schema_groups(self._connection)
+        self.fingerprints = schema_fingerprints(self._connection)
+        self._names = set()
+        self._cache = {}
+        self._connection.set_authorizer(self._authorize)
+
+    def _authorize(self, action, first, second, database, source):
+        self._names.update((first, second, source))
+        return sqlite3.SQLITE_OK
+
+    def objects(self, sql):
+        """Tabelas e views usadas pela instrução (ou {WHOLE_SCHEMA})."""
+        key = normalize_sql(sql)
+        if key not in self._cache:
+            self._names = set()
+            statement = sql if sql.lstrip().upper().startswith("EXPLAIN") else f"EXPLAIN {sql}"
+            try:
+                self._connection.execute(statement)
+                self._cache[key] = {self.groups[name] for name in self._names if name in self.groups}
+            except sqlite3.Error:
+                self._cache[key] = {WHOLE_SCHEMA}
+        return self._cache[key]
+
+
+class StatementLog:
+    """Ouvinte de trace que guarda um exemplo de cada instrução distinta executada na conexão."""
+
+    def __init__(self):
+        self.statements = {}
+
+    def record(self, sql):
+        # Linhas de comentário são as instruções internas dos triggers
+        if not sql.lstrip().startswith("--"):
+            self.statements.setdefault(normalize_sql(sql), sql)
+
+
+def _is_schema(node):
+    return isinstance(node, ast.Assign) and any(isinstance(target, ast.Name) and target.id == "SCHEMA"
+                                                for target in node.targets)
+
+
+def _is_other_test(node, keep):
+    return isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith("test") \
+        and node.name != keep
+
+
+def module_digest(path, keep_test=None):
+    """
+    Hash da árvore sintática do módulo (comentários e formatação não contam),
+    sem a lista SCHEMA, já coberta pelos hashes do esquema. Com 'keep_test',
+    as demais funções de teste do arquivo também são ignoradas.
+    """
+    with open(path, encoding="utf-8") as source:
+        tree = ast.parse(source.read())
+    tree.body = [node for node in tree.body
+                 if not _is_schema(node) and not (keep_test and _is_other_test(node, keep_test))]
+    return hashlib.sha256(ast.dump(tree).encode()).hexdigest()
+
+
+def local_imports(path, root):
+    """Módulos do projeto (arquivos .py em 'root') importados pelo arquivo."""
+    with open(path, encoding="utf-8") as source:
+        tree = ast.parse(source.read())
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split(".")[0])
+    candidates = (os.path.join(root, f"{name}.py") for name in names)
+    return {candidate for candidate in candidates if os.path.exists(candidate)}
+
+
+class ImpactSelector:
+    """
+    Plugin do pytest (--changed-only) que executa apenas os testes afetados
+    desde a última execução. Cada teste fica registrado no cache do pytest com
+    o hash do seu código (a função de teste, o restante do arquivo, conftest.py
+    e os módulos do projeto importados, direta ou indiretamente, sem a lista
+    SCHEMA) e o hash de cada tabela ou view em que suas instruções tocaram.
+    O teste volta a ser executado se falhou, se o código mudou ou se alguma
+    dessas tabelas, views, índices ou triggers mudou.
+    """
+
+    def __init__(self, config):
+        self.root = str(config.rootpath)
+        self.cache = config.cache
+        self.previous = config.cache.get(CACHE_KEY, {})
+        self.results = {}
+        self._analyzer = None
+        self._closures = {}
+        self._digests = {}
+
+    @property
+    def analyzer(self):
+        if self._analyzer is None:
+            self._analyzer = ImpactAnalyzer()
+        return self._analyzer
+
+    def _closure(self, path):
+        """O arquivo e todos os módulos do projeto de que ele depende."""
+        if path not in self._closures:
+            seen = set()
+            pending = [path]
+            while pending:
+                current = pending.pop()
+                if current not in seen:
+                    seen.add(current)
+                    pending.extend(local_imports(current, self.root))
+            self._closures[path] = seen
+        return self._closures[path]
+
+    def _digest(self, path, keep_test=None):
+        key = (path, keep_test)
+        if key not in self._digests:
+            self._digests[key] = module_digest(path, keep_test)
+        return self._digests[key]
+
+    def code_fingerprint(self, item):
+        test_file = str(item.path)
+        dependencies = self._closure(test_file) | self._closure(os.path.join(self.root, "conftest.py"))
+        digest = hashlib.sha256()
+        for path in sorted(dependencies):
+            keep = getattr(item, "originalname", None) if path == test_file else None
+            digest.update(f"{os.path.relpath(path, self.root)}\0{self._digest(path, keep)}\0".encode())
+        return digest.hexdigest()[:16]
+
+    def is_unchanged(self, item):
+        entry = self.previous.get(item.nodeid)
+        if not entry or entry["outcome"] != "passed" or entry["code"] != self.code_fingerprint(item):
+            return False
+        fingerprints = self.analyzer.fingerprints
+        return all(fingerprints.get(name) == digest for name, digest in entry["objects"].items())
+
+    def observe(self, item, log):
+        """Registra as tabelas e views usadas pelas instruções de uma conexão do teste."""
+        touched = item.stash.setdefault(touched_key, set())
+        for sql in log.statements.values():
+            touched.update(self.analyzer.objects(sql))
+
+    def pytest_collection_modifyitems(self, config, items):
+        selected = []
+        deselected = []
+        for item in items:
+            (deselected if self.is_unchanged(item) else selected).append(item)
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = selected
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        # As dependências seguem no relatório da finalização, que também chega ao
+        # processo principal em execuções paralelas (pytest-xdist)
+        if call.when == "teardown":
+            touched = item.stash.get(touched_key, {WHOLE_SCHEMA})
+            fingerprints = self.analyzer.fingerprints
+            item.user_properties.append(("sql_impact", {
+                "code": self.code_fingerprint(item),
+                "objects": {name: fingerprints[name] for name in sorted(touched) if name in fingerprints},
+            }))
+        yield
+
+    def pytest_runtest_logreport(self, report):
+        result = self.results.setdefault(report.nodeid, {"outcome": "passed"})
+        if report.failed:
+            result["outcome"] = "failed"
+        elif report.skipped and result["outcome"] == "passed":
+            result["outcome"] = "skipped"
+        for name, value in report.user_properties:
+            if name == "sql_impact":
+                result.update(value)
+
+    def pytest_sessionfinish(self, session):
+        if hasattr(session.config, "workerinput"):
+            return
+        entries = dict(self.previous)
+        for nodeid, result in self.results.items():
+            if "code" in result:
+                entries[nodeid] = result
+        self.cache.set(CACHE_KEY, entries)
@@ -0,0 +1,267 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+
+from benchmark import measure
+from database import connect, restore_template
+from datagen import DataGenerator, populate
+from query_plan import explain, is_explainable, normalize_sql, plan_access
+from scaling import parse_sizes
+
+# Coluna comparada em um filtro ou JOIN: "tabela.coluna = ?", "coluna LIKE ?", "? = tabela.coluna"...
+_OPERATOR = r"(?:=|==|<>|!=|<=|>=|<|>|\bLIKE\b|\bGLOB\b|\bIN\b|\bIS\b|\bBETWEEN\b)"
+_LEFT_PREDICATE = re.compile(rf"(?:(\w+)\.)?(\w+)\s*{_OPERATOR}", re.IGNORECASE)
+_RIGHT_PREDICATE = re.compile(rf"{_OPERATOR}\s*(?:(\w+)\.)?(\w+)", re.IGNORECASE)
+
+# Ganho mínimo para que um índice seja recomendado
+MIN_SPEEDUP = 1.2
+
+
+class Workload:
+    """
+    Instruções executadas pelos testes, agrupadas pela forma normalizada, com
+    um exemplo executável (parâmetros já substituídos) e a quantidade de execuções.
+    """
+
+    def __init__(self, statements=None):
+        self.statements = statements or {}
+
+    def record(self, sql):
+        if not is_explainable(sql):
+            return
+        entry = self.statements.setdefault(normalize_sql(sql), {"sql": sql, "count": 0})
+        entry["count"] += 1
+
+    def merge(self, other):
+        for key, entry in other.statements.items():
+            current = self.statements.setdefault(key, {"sql": entry["sql"], "count": 0})
+            current["count"] += entry["count"]
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as output:
+            json.dump(dict(sorted(self.statements.items())), output, indent=2, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, *paths):
+        """Carrega e mescla os arquivos gravados (um por worker, em execuções paralelas)."""
+        workload = cls()
+        for path in paths:
+            with open(path, encoding="utf-8") as source:
+                workload.merge(cls(json.load(source)))
+        return workload
+
+
+def table_columns(connection):
+    """{tabela: {colunas}} das tabelas comuns do banco."""
+    tables = [row[0] for row in connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+    return {table: {row[1] for row in connection.execute(f"PRAGMA table_info({table})")} for table in tables}
+
+
+def indexed_columns(connection, table):
+    """Colunas que já são a primeira coluna de algum índice da tabela (ou a chave primária)."""
+    columns = {row[1] for row in connection.execute(f"PRAGMA table_info({table})") if row[5] == 1}
+    for index in connection.execute(f"PRAGMA index_list({table})").fetchall():
+        first = connection.execute(f"PRAGMA index_info({index[1]})").fetchone()
+        if first:
+            columns.add(first[2])
+    return columns
+
+
+def statement_text(connection, sql):
+    """SQL normalizado da instrução, acrescido da definição das views que ela consulta."""
+    text = normalize_sql(sql)
+    for name, definition in connection.execute("SELECT name, sql FROM sqlite_master WHERE type = 'view'"):
+        if re.search(rf"\b{name}\b", text, re.IGNORECASE):
+            text += " " + normalize_sql(definition)
+    return text
+
+
+def predicate_columns(text):
+    """Pares (qualificador ou None, coluna) comparados em filtros e JOINs."""
+    return {(qualifier, column) for pattern in (_LEFT_PREDICATE, _RIGHT_PREDICATE)
+            for qualifier, column in pattern.findall(text)}
+
+
+def candidate_indexes(connection, workload):
+    """
+    Para cada instrução cujo plano percorre uma tabela inteira (SCAN), propõe
+    índices de uma coluna nas colunas dessa tabela usadas em filtros, JOINs
+    (inclusive dentro de views) e chaves estrangeiras acionadas por exclusões.
+    Retorna {(tabela, coluna): [chaves das instruções afetadas]}.
+    """
+    columns = table_columns(connection)
+    candidates = {}
+    for key, entry in workload.statements.items():
+        try:
+            scans, _ = plan_access(explain(connection, entry["sql"]))
+        except sqlite3.Error:
+            continue
+        text = statement_text(connection, entry["sql"])
+        predicates = predicate_columns(text)
+        for table in scans:
+            if table not in columns:
+                continue
+            wanted = {column for qualifier, column in predicates
+                      if column in columns[table] and (qualifier is None or qualifier == table
+                                                       or qualifier not in columns)}
+            # Exclusões e atualizações na tabela referenciada percorrem a chave estrangeira
+            for foreign_key in connection.execute(f"PRAGMA foreign_key_list({table})"):
+                if re.search(rf"\b{foreign_key[2]}\b", text, re.IGNORECASE):
+                    wanted.add(foreign_key[3])
+            for column in wanted - indexed_columns(connection, table):
+                candidates.setdefault((table, column), []).append(key)
+    return candidates
+
+
+def prepare_copy(path, database=None, users=20_000, orders=200_000):
+    """
+    Monta em 'path' o banco onde os índices são testados: uma cópia de
+    'database' ou, sem ele, o esquema com dados sintéticos (datagen.py) no
+    volume pedido.
+    """
+    connection = connect(path)
+    if database:
+        source = sqlite3.connect(f"file:{database}?mode=ro", uri=True)
+        source.backup(connection)
+        source.close()
+    else:
+        restore_template(connection)
+        populate(connection, DataGenerator(), users=users, orders=orders, parents=users // 10,
+                 children=orders // 10, test=users)
+    connection.isolation_level = None
+    return connection
+
+
+def _discarding(connection, function):
+    """Executa a função em um SAVEPOINT desfeito em seguida, para medir escritas sem alterar o banco."""
+    def run():
+        connection.execute("SAVEPOINT advisor")
+        try:
+            function()
+        finally:
+            connection.execute("ROLLBACK TO advisor")
+            connection.execute("RELEASE advisor")
+    return run
+
+
+def _time_statements(connection, workload, keys, rounds, warmup):
+    """Tempo total estimado das instruções: mediana de cada uma vezes suas execuções."""
+    total = 0.0
+    for key in keys:
+        entry = workload.statements[key]
+        summary = measure(_discarding(connection, lambda: connection.execute(entry["sql"]).fetchall()),
+                          rounds=rounds, warmup=warmup)
+        total += summary["median_ms"] * entry["count"]
+    return total
+
+
+def _time_writes(connection, table, rows, rounds, warmup):
+    """Mediana da inserção de 'rows' linhas copiadas da própria tabela."""
+    columns = [row[1] for row in connection.execute(f"PRAGMA table_info({table})") if row[5] == 0]
+    column_list = ", ".join(columns)
+    sql = f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {table} LIMIT {rows}"
+    return measure(_discarding(connection, lambda: connection.execute(sql)), rounds=rounds, warmup=warmup)["median_ms"]
+
+
+def _used_bytes(connection):
+    """Espaço ocupado pelas páginas em uso (índices removidos deixam páginas livres)."""
+    page_count = connection.execute("PRAGMA page_count").fetchone()[0]
+    free_pages = connection.execute("PRAGMA freelist_count").fetchone()[0]
+    return (page_count - free_pages) * connection.execute("PRAGMA page_size").fetchone()[0]
+
+
+def evaluate_candidate(connection, workload, table, column, keys, rounds=5, warmup=1, write_rows=1000):
+    """
+    Cria o índice na cópia, mede as instruções afetadas e a inserção de linhas
+    antes e depois, verifica se os planos passam a usá-lo e remove o índice.
+    """
+    name = f"idx_advisor_{table}_{column}"
+    before = _time_statements(connection, workload, keys, rounds, warmup)
+    writes_before = _time_writes(connection, table, write_rows, rounds, warmup)
+    size_before = _used_bytes(connection)
+
+    ddl = f"CREATE INDEX {name} ON {table}({column})"
+    connection.execute(ddl)
+    try:
+        size = _used_bytes(connection) - size_before
+        uses_index = any(name in plan_access(explain(connection, workload.statements[key]["sql"]))[1] for key in keys)
+        after = _time_statements(connection, workload, keys, rounds, warmup)
+        writes_after = _time_writes(connection, table, write_rows, rounds, warmup)
+    finally:
+        connection.execute(f"DROP INDEX {name}")
+
+    speedup = before / after if after else 0.0
+    return {
+        "table": table,
+        "column": column,
+        "ddl": ddl.replace(name, f"idx_{table}_{column}"),
+        "statements": keys,
+        "executions": sum(workload.statements[key]["count"] for key in keys),
+        "before_ms": before,
+        "after_ms": after,
+        "speedup": speedup,
+        "uses_index": uses_index,
+        "write_overhead": writes_after / writes_before - 1 if writes_before else 0.0,
+        "size_bytes": size,
+        "recommended": uses_index and speedup >= MIN_SPEEDUP,
+    }
+
+
+def advise(connection, workload, rounds=5, warmup=1, write_rows=1000):
+    """Avalia todos os candidatos e retorna os resultados, do maior ganho para o menor."""
+    results = [evaluate_candidate(connection, workload, table, column, keys, rounds, warmup, write_rows)
+               for (table, column), keys in sorted(candidate_indexes(connection, workload).items())]
+    return sorted(results, key=lambda result: result["speedup"], reverse=True)
+
+
+def format_report(results):
+    lines = [f"{'índice':<26}{'instruções':>11}{'antes (ms)':>12}{'depois (ms)':>13}{'ganho':>8}"
+             f"{'custo escrita':>15}{'tamanho (KB)':>14}  recomendado"]
+    for result in results:
+        lines.append(
+            f"{result['table'] + '(' + result['column'] + ')':<26}{result['executions']:>11}"
+            f"{result['before_ms']:>12.3f}{result['after_ms']:>13.3f}{result['speedup']:>7.1f}x"
+            f"{result['write_overhead']:>+15.0%}{result['size_bytes'] / 1024:>14.0f}  "
+            f"{'sim' if result['recommended'] else 'não'}"
+        )
+    for result in results:
+        if result["recommended"]:
+            lines.append(f"{result['ddl']};")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Propõe índices a partir das instruções executadas pelos testes "
+                    "(pytest --capture-workload=carga.json) e mede cada um em uma cópia do banco.")
+    parser.add_argument("workload", nargs="+", help="arquivos JSON gravados por --capture-workload")
+    parser.add_argument("--database", default=None,
+                        help="banco a ser copiado; sem ele, usa o esquema com dados sintéticos")
+    parser.add_argument("--scale", default="20000:200000",
+                        help="usuários:pedidos dos dados sintéticos (padrão: 20000:200000)")
+    parser.add_argument("--rounds", type=int, default=5, help="rodadas medidas por instrução")
+    parser.add_argument("--warmup", type=int, default=1, help="rodadas de aquecimento por instrução")
+    parser.add_argument("--output", default=None, help="arquivo JSON onde gravar o relatório")
+    args = parser.parse_args(argv)
+
+    workload = Workload.load(*args.workload)
+    (users, orders), = parse_sizes(args.scale)
+    with tempfile.TemporaryDirectory() as directory:
+        connection = prepare_copy(os.path.join(directory, "advisor.sqlite"), args.database, users, orders)
+        results = advise(connection, workload, args.rounds, args.warmup)
+        connection.close()
+
+    print(format_report(results))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from benchmark import measure
+from database import CACHED_STATEMENTS, DB_PATH, connect
+
+# Consultas típicas de um teste, usadas na medição do custo por teste
+TEST_QUERIES = [
+    ("SELECT COUNT(*) FROM users WHERE name = ?", ("Cliente 1",)),
+    ("SELECT name, item FROM user_orders WHERE name = ?", ("Cliente 1",)),
+    ("SELECT id FROM test WHERE name = ?", ("User_500",)),
+]
+
+
+class PoolTimeout(Exception):
+    """Nenhuma conexão ficou livre dentro do tempo de espera."""
+
+
+class ConnectionPool:
+    """
+    Conjunto de conexões reaproveitadas entre testes (ou threads). Cada conexão
+    é criada uma única vez, com as chaves estrangeiras habilitadas, o cache de
+    instruções preparadas ajustado e o 'initializer' opcional aplicado, e
+    mantém esse cache entre um uso e outro.
+
+    - acquire() entrega a conexão livre usada mais recentemente (cache mais
+      quente), criando uma nova enquanto houver menos de 'size' conexões, ou
+      espera até 'timeout' segundos por uma devolução;
+    - release() desfaz a transação pendente e devolve a conexão ao estado
+      padrão (sem row_factory, trace, progress handler ou authorizer);
+    - conexões que falham na verificação de saúde (fechadas ou com erro) são
+      descartadas e substituídas por novas.
+    """
+
+    def __init__(self, database=DB_PATH, size=4, cached_statements=CACHED_STATEMENTS,
+                 initializer=None, timeout=5.0):
+        if size < 1:
+            raise ValueError("O pool precisa de pelo menos uma conexão")
+        self.database = database
+        self.size = size
+        self.cached_statements = cached_statements
+        self.initializer = initializer
+        self.timeout = timeout
+        self.stats = {"created": 0, "reused": 0, "discarded": 0}
+        self._idle = []
+        self._open = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def _create(self):
+        connection = connect(self.database, self.cached_statements, check_same_thread=False)
+        if self.initializer is not None:
+            self.initializer(connection)
+        with self._condition:
+            self.stats["created"] += 1
+        return connection
+
+    @staticmethod
+    def _healthy(connection):
+        try:
+            connection.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except sqlite3.Error:
+            pass
+
+    def _discard(self, connection):
+        self._close_quietly(connection)
+        with self._condition:
+            self._open -= 1
+            self.stats["discarded"] += 1
+            self._condition.notify()
+
+    def acquire(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("O pool de conexões foi fechado")
+                if self._idle:
+                    connection = self._idle.pop()
+                    break
+                if self._open < self.size:
+                    self._open += 1
+                    connection = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    raise PoolTimeout(f"Nenhuma das {self.size} conexões foi liberada em {timeout} s")
+
+        if connection is not None:
+            if self._healthy(connection):
+                with self._condition:
+                    self.stats["reused"] += 1
+                return connection
+            # A vaga da conexão descartada passa direto à substituta: liberá-la aqui
+            # deixaria outra thread em espera ocupá-la antes, ultrapassando 'size'
+            self._close_quietly(connection)
+            with self._condition:
+                self.stats["discarded"] += 1
+
+        try:
+            return self._create()
+        except Exception:
+            with self._condition:
+                self._open -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, connection):
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+            connection.row_factory = None
+            connection.text_factory = str
+            connection.isolation_level = ""
+            if getattr(connection, "trace_listeners", None):
+                connection.trace_listeners.clear()
+            connection.set_trace_callback(None)
+            connection.set_progress_handler(None, 0)
+            connection.set_authorizer(None)
+        except sqlite3.Error:
+            self._discard(connection)
+            return
+
+        with self._condition:
+            if self._closed:
+                connection.close()
+                self._open -= 1
+                return
+            self._idle.append(connection)
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        connection = self.acquire(timeout)
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def close(self):
+        """Fecha as conexões livres; as que estiverem em uso são fechadas ao serem devolvidas."""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._condition.notify_all()
+        for connection in idle:
+            connection.close()
+
+
+def _run_queries(connection, queries):
+    for sql, params in queries:
+        connection.execute(sql, params).fetchall()
+
+
+def measure_connection_overhead(database, tests=2000, rounds=5, warmup=1, queries=TEST_QUERIES):
+    """
+    Simula o ciclo de conexão de 'tests' testes, cada um executando 'queries':
+    abrindo e fechando uma conexão nova por teste (como fazia db_connection) e
+    pegando e devolvendo uma conexão do pool. Retorna {variante: estatísticas},
+    com o custo médio por teste em 'per_test_us'.
+    """
+    def unpooled():
+        for _ in range(tests):
+            connection = connect(database)
+            _run_queries(connection, queries)
+            connection.close()
+
+    pool = ConnectionPool(database, size=1)
+
+    def pooled():
+        for _ in range(tests):
+            with pool.connection() as connection:
+                _run_queries(connection, queries)
+
+    try:
+        results = {
+            "sem_pool": measure(unpooled, rounds=rounds, warmup=warmup, rows=tests),
+            "pool": measure(pooled, rounds=rounds, warmup=warmup, rows=tests),
+        }
+    finally:
+        pool.close()
+
+    for summary in results.values():
+        summary["per_test_us"] = summary["median_ms"] * 1000 / tests
+    return results
@@ -0,0 +1,184 @@
+import json
+import time
+
+from query_plan import normalize_sql
+
+# A cada quantas instruções da VM do SQLite o progress handler é chamado
+PROGRESS_INTERVAL = 100
+
+
+class StatementStats:
+    """Estatísticas acumuladas de uma instrução (forma normalizada) em um teste."""
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.rows = 0
+        self.vm_steps = 0
+
+    def add(self, elapsed_ns, rows, vm_steps):
+        self.total_ns += elapsed_ns
+        self.max_ns = max(self.max_ns, elapsed_ns)
+        self.rows += rows
+        self.vm_steps += vm_steps
+
+    def as_dict(self):
+        return {
+            "sql": self.sql,
+            "calls": self.calls,
+            "total_ms": self.total_ns / 1e6,
+            "max_ms": self.max_ns / 1e6,
+            "mean_ms": self.total_ns / self.calls / 1e6 if self.calls else 0.0,
+            "rows": self.rows,
+            "vm_steps": self.vm_steps,
+        }
+
+
+class Profiler:
+    """Agrega as estatísticas de instruções por teste durante a sessão."""
+
+    def __init__(self):
+        self.tests = {}
+
+    def statement(self, test_id, sql):
+        statements = self.tests.setdefault(test_id, {})
+        key = normalize_sql(sql)
+        if key not in statements:
+            statements[key] = StatementStats(key)
+        return statements[key]
+
+    def slowest(self, count=10):
+        """As 'count' instruções com maior tempo total, em todos os testes."""
+        entries = [
+            (test_id, stats)
+            for test_id, statements in self.tests.items()
+            for stats in statements.values()
+        ]
+        entries.sort(key=lambda entry: entry[1].total_ns, reverse=True)
+        return entries[:count]
+
+    def dump(self, path):
+        document = {
+            test_id: [stats.as_dict() for stats in statements.values()]
+            for test_id, statements in self.tests.items()
+        }
+        with open(path, "w", encoding="utf-8") as output:
+            json.dump(document, output, indent=2, ensure_ascii=False)
+
+
+class ProfiledCursor:
+    """
+    Cursor que mede cada instrução: tempo de relógio de execute() somado ao das
+    leituras seguintes, linhas lidas ou alteradas (inclusive por triggers) e
+    instruções da VM executadas.
+    """
+
+    def __init__(self, cursor, connection):
+        self._cursor = cursor
+        self._connection = connection
+        self._stats = None
+
+    def _measure(self, method, sql, *args):
+        connection = self._connection
+        self._stats = connection.profiler.statement(connection.test_id, sql)
+        self._stats.calls += 1
+
+        changes = connection.total_changes
+        connection.vm_calls = 0
+        start = time.perf_counter_ns()
+        try:
+            return method(sql, *args)
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            self._stats.add(elapsed, connection.total_changes - changes, connection.vm_calls * PROGRESS_INTERVAL)
+
+    def _fetch(self, method, *args):
+        if self._stats is None:
+            return method(*args)
+        connection = self._connection
+        connection.vm_calls = 0
+        start = time.perf_counter_ns()
+        result = method(*args)
+        elapsed = time.perf_counter_ns() - start
+        rows = len(result) if isinstance(result, list) else int(result is not None)
+        self._stats.add(elapsed, rows, connection.vm_calls * PROGRESS_INTERVAL)
+        return result
+
+    def execute(self, sql, *args):
+        self._measure(self._cursor.execute, sql, *args)
+        return self
+
+    def executemany(self, sql, *args):
+        self._measure(self._cursor.executemany, sql, *args)
+        return self
+
+    def fetchone(self):
+        return self._fetch(self._cursor.fetchone)
+
+    def fetchmany(self, *args):
+        return self._fetch(self._cursor.fetchmany, *args)
+
+    def fetchall(self):
+        return self._fetch(self._cursor.fetchall)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    @property
+    def row_factory(self):
+        return self._cursor.row_factory
+
+    @row_factory.setter
+    def row_factory(self, factory):
+        self._cursor.row_factory = factory
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class ProfiledConnection:
+    """Envolve uma conexão para que todas as instruções passem por ProfiledCursor."""
+
+    def __init__(self, connection, profiler, test_id):
+        self._connection = connection
+        self.profiler = profiler
+        self.test_id = test_id
+        self.vm_calls = 0
+        connection.set_progress_handler(self._on_progress, PROGRESS_INTERVAL)
+
+    def _on_progress(self):
+        self.vm_calls += 1
+        return 0
+
+    def _timed(self, name, method):
+        stats = self.profiler.statement(self.test_id, name)
+        stats.calls += 1
+        start = time.perf_counter_ns()
+        try:
+            return method()
+        finally:
+            stats.add(time.perf_counter_ns() - start, 0, 0)
+
+    def commit(self):
+        # O commit é onde o fsync acontece; ele aparece no relatório como 'COMMIT'
+        return self._timed("COMMIT", self._connection.commit)
+
+    def rollback(self):
+        return self._timed("ROLLBACK", self._connection.rollback)
+
+    def cursor(self, *args):
+        return ProfiledCursor(self._connection.cursor(*args), self)
+
+    def execute(self, sql, *args):
+        return self.cursor().execute(sql, *args)
+
+    def executemany(self, sql, *args):
+        return self.cursor().executemany(sql, *args)
+
+    def detach(self):
+        self._connection.set_progress_handler(None, PROGRESS_INTERVAL)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
@@ -0,0 +1,178 @@
+import json
+import os
+import re
+import sqlite3
+
+# Arquivo com os planos de referência ("golden") de cada consulta
+GOLDEN_PLANS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "query_plans.json")
+
+# Apenas instruções que têm plano de execução relevante
+EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT INTO", "REPLACE")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+# Identificadores entre aspas (mantidos como estão) ou palavras soltas
+_WORD = re.compile(r'"(?:[^"]|"")*"|`[^`]*`|\b[A-Za-z_]+\b')
+_INSERT_SELECT = re.compile(r"\bSELECT\b")
+
+# Palavras-chave do SQLite, escritas em maiúsculas na chave normalizada
+KEYWORDS = frozenset("""
+    ABORT ACTION ADD AFTER ALL ALTER ALWAYS ANALYZE AND AS ASC ATTACH AUTOINCREMENT BEFORE BEGIN BETWEEN BY
+    CASCADE CASE CAST CHECK COLLATE COLUMN COMMIT CONFLICT CONSTRAINT CREATE CROSS CURRENT CURRENT_DATE
+    CURRENT_TIME CURRENT_TIMESTAMP DATABASE DEFAULT DEFERRABLE DEFERRED DELETE DESC DETACH DISTINCT DO DROP
+    EACH ELSE END ESCAPE EXCEPT EXCLUDE EXCLUSIVE EXISTS EXPLAIN FAIL FILTER FIRST FOLLOWING FOR FOREIGN FROM
+    FULL GENERATED GLOB GROUP GROUPS HAVING IF IGNORE IMMEDIATE IN INDEX INDEXED INITIALLY INNER INSERT
+    INSTEAD INTERSECT INTO IS ISNULL JOIN KEY LAST LEFT LIKE LIMIT MATCH MATERIALIZED NATURAL NO NOT NOTHING
+    NOTNULL NULL NULLS OF OFFSET ON OR ORDER OTHERS OUTER OVER PARTITION PLAN PRAGMA PRECEDING PRIMARY QUERY
+    RAISE RANGE RECURSIVE REFERENCES REGEXP REINDEX RELEASE RENAME REPLACE RESTRICT RETURNING RIGHT ROLLBACK
+    ROW ROWS SAVEPOINT SELECT SET TABLE TEMP TEMPORARY THEN TIES TO TRANSACTION TRIGGER UNBOUNDED UNION
+    UNIQUE UPDATE USING VACUUM VALUES VIEW VIRTUAL WHEN WHERE WINDOW WITH WITHOUT
+""".split())
+_PLAN_STEP = re.compile(
+    r"^(SCAN|SEARCH) (\w+)(?: AS \w+)?"
+    r"(?: USING (?:COVERING )?INDEX (\w+)| USING (INTEGER PRIMARY KEY|ROWID SEARCH|PRIMARY KEY))?"
+)
+
+
+def _upper_keyword(match):
+    word = match.group()
+    return word.upper() if word.upper() in KEYWORDS else word
+
+
+def normalize_sql(sql):
+    """
+    Troca literais por '?', escreve as palavras-chave em maiúsculas e
+    normaliza espaços, para agrupar a mesma consulta.
+    """
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _WORD.sub(_upper_keyword, sql)
+    return _WHITESPACE.sub(" ", sql).strip().rstrip(";").strip()
+
+
+def is_explainable(sql):
+    statement = sql.lstrip().upper()
+    if not statement.startswith(EXPLAINABLE):
+        return False
+    # INSERT ... VALUES não consulta tabelas; INSERT ... SELECT sim
+    if statement.startswith(("INSERT", "REPLACE")):
+        return bool(_INSERT_SELECT.search(statement))
+    return True
+
+
+def explain(connection, sql):
+    """
+    Retorna as linhas de detalhe do EXPLAIN QUERY PLAN da instrução. Com
+    foreign_keys ligado, o plano de um DELETE inclui as buscas nas tabelas
+    filhas (ex.: ON DELETE CASCADE em children).
+    """
+    return [row[3] for row in connection.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()]
+
+
+def plan_access(plan):
+    """Extrai do plano as tabelas percorridas por inteiro e os índices utilizados."""
+    scans = set()
+    indexes = set()
+    for detail in plan:
+        match = _PLAN_STEP.match(detail)
+        if not match:
+            continue
+        kind, table, index, key = match.groups()
+        if kind == "SCAN" and not index:
+            scans.add(table)
+        if index:
+            indexes.add(index)
+        if key:
+            indexes.add(f"{table}:{key}")
+    return scans, indexes
+
+
+def compare_plans(golden, current):
+    """Lista os problemas do plano atual em relação ao de referência."""
+    golden_scans, golden_indexes = plan_access(golden)
+    current_scans, current_indexes = plan_access(current)
+
+    problems = [f"passou a percorrer a tabela inteira (SCAN {table})"
+                for table in sorted(current_scans - golden_scans)]
+    problems += [f"deixou de usar o índice {index}"
+                 for index in sorted(golden_indexes - current_indexes)]
+    return problems
+
+
+class PlanRecorder:
+    """Registra as instruções executadas em uma conexão, agrupadas pela forma normalizada."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.statements = {}
+        connection.add_trace_listener(self)
+
+    def __call__(self, sql):
+        # O SQLite não repassa ao trace as instruções EXPLAIN feitas pelo próprio teste
+        if is_explainable(sql):
+            self.statements.setdefault(normalize_sql(sql), sql)
+
+    def detach(self):
+        self.connection.remove_trace_listener(self)
+
+    def plans(self):
+        """Calcula o plano de cada instrução registrada (deixa de registrar novas)."""
+        self.detach()
+        plans = {}
+        for key, sql in self.statements.items():
+            try:
+                plans[key] = explain(self.connection, sql)
+            except sqlite3.Error:
+                # Objetos criados e excluídos pelo próprio teste, por exemplo
+                continue
+        return plans
+
+
+class PlanStore:
+    """Planos de referência gravados em JSON e verificação de regressões."""
+
+    def __init__(self, path=GOLDEN_PLANS_PATH, update=False):
+        self.path = path
+        self.update = update
+        self.golden = {}
+        self.new = {}
+        self.changed = False
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as source:
+                self.golden = json.load(source)
+
+    def check(self, plans):
+        """
+        Compara os planos com os de referência e retorna {sql: [problemas]}.
+        No modo de atualização, os planos atuais passam a ser a referência.
+        """
+        failures = {}
+        for sql, plan in plans.items():
+            golden = self.golden.get(sql)
+            if self.update:
+                if golden != plan:
+                    self.golden[sql] = plan
+                    self.changed = True
+                continue
+            if golden is None:
+                self.new[sql] = plan
+                continue
+            problems = compare_plans(golden, plan)
+            if problems:
+                failures[sql] = problems
+        return failures
+
+    def save(self):
+        if not self.changed:
+            return
+        # Mescla com o arquivo atual, que outros processos podem ter atualizado
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as source:
+                merged = json.load(source)
+        else:
+            merged = {}
+        merged.update(self.golden)
+        with open(self.path, "w", encoding="utf-8") as output:
+            json.dump(dict(sorted(merged.items())), output, indent=2, ensure_ascii=False)
+            output.write("\n")
@@ -1,8 +1,17 @@
 import pytest
 import sys
 import os
+import argparse
+import contextlib
+import importlib.util
+import json
+import subprocess
+import tempfile
+import time
 from colorama import Fore, Back, Style, init
 
+from backends import BACKENDS, compare_timings, format_comparison
+
 # Inicializar colorama
 init(autoreset=True)
 
@@ -10,6 +19,41 @@ init(autoreset=True)
 if "TERM" not in os.environ:
     os.environ["TERM"] = "xterm"  # Valor padrão simples
 
+# Descrições dos testes de test_database.py
+TEST_DESCRIPTIONS = {
+    "test_update_user": "Teste de atualização de dados em uma tabela",
+    "test_join_users_orders": "Teste de operação JOIN entre tabelas",
+    "test_view_execution": "Teste de execução de uma VIEW",
+    "test_trigger_execution": "Teste de execução de um TRIGGER",
+    "test_foreign_key_constraint": "Teste de restrição de chave estrangeira",
+    "test_index_performance": "Teste de performance com índices",
+    "test_transaction_rollback": "Teste de transação e rollback",
+    "test_parameterized_query": "Teste de consultas parametrizadas",
+    "test_like_query": "Teste de consultas com operador LIKE",
+    "test_cascade_delete": "Teste de deleção em cascata",
+    "test_batch_insert_performance": "Teste de performance de inserção em lote"
+}
+
+# Suítes selecionáveis por nome na linha de comando (opções do menu).
+# Cada item é um teste de test_database.py ou um arquivo de testes.
+SUITES = {
+    "basic": [
+        "test_update_user",
+        "test_join_users_orders",
+        "test_view_execution",
+        "test_trigger_execution",
+        "test_foreign_key_constraint"
+    ],
+    "index": ["test_index_performance"],
+    "transaction": ["test_transaction_rollback"],
+    "parameterized": ["test_parameterized_query"],
+    "like": ["test_like_query"],
+    "cascade": ["test_cascade_delete"],
+    "batch": ["test_batch_insert_performance"],
+    "scale": ["test_scaling.py", "test_audit.py", "test_search.py", "test_cascade.py", "test_concurrency.py"],
+    "all": ["."]
+}
+
 def clear_screen():
     """Limpa a tela do console sem depender da variável TERM."""
     # Método seguro que funciona em todos os ambientes
@@ -25,23 +69,8 @@ def run_specific_test(test_name):
     """Executa um teste específico usando pytest."""
     print(f"\n{Fore.GREEN}Executando teste: {Fore.YELLOW}{test_name}{Style.RESET_ALL}\n")
 
-    # Obter informações sobre o teste
-    test_descriptions = {
-        "test_update_user": "Teste de atualização de dados em uma tabela",
-        "test_join_users_orders": "Teste de operação JOIN entre tabelas",
-        "test_view_execution": "Teste de execução de uma VIEW",
-        "test_trigger_execution": "Teste de execução de um TRIGGER",
-        "test_foreign_key_constraint": "Teste de restrição de chave estrangeira",
-        "test_index_performance": "Teste de performance com índices",
-        "test_transaction_rollback": "Teste de transação e rollback",
-        "test_parameterized_query": "Teste de consultas parametrizadas",
-        "test_like_query": "Teste de consultas com operador LIKE",
-        "test_cascade_delete": "Teste de deleção em cascata",
-        "test_batch_insert_performance": "Teste de performance de inserção em lote"
-    }
-
-    if test_name in test_descriptions:
-        print(f"{Fore.CYAN}Descrição: {Fore.WHITE}{test_descriptions[test_name]}{Style.RESET_ALL}\n")
+    if test_name in TEST_DESCRIPTIONS:
+        print(f"{Fore.CYAN}Descrição: {Fore.WHITE}{TEST_DESCRIPTIONS[test_name]}{Style.RESET_ALL}\n")
 
     print_step("Preparando ambiente de teste", "Configurando banco de dados e dependências")
     print_step("Executando teste", f"Iniciando {test_name}")
@@ -61,27 +90,12 @@ def run_basic_tests():
     print_step("Preparando ambiente de teste", "Configurando banco de dados e dependências")
 
     # Lista de testes básicos
-    basic_tests = [
-        "test_update_user",
-        "test_join_users_orders",
-        "test_view_execution",
-        "test_trigger_execution",
-        "test_foreign_key_constraint"
-    ]
-
-    # Descrições dos testes
-    test_descriptions = {
-        "test_update_user": "Teste de atualização de dados em uma tabela",
-        "test_join_users_orders": "Teste de operação JOIN entre tabelas",
-        "test_view_execution": "Teste de execução de uma VIEW",
-        "test_trigger_execution": "Teste de execução de um TRIGGER",
-        "test_foreign_key_constraint": "Teste de restrição de chave estrangeira"
-    }
+    basic_tests = SUITES["basic"]
 
     # Mostrar descrições dos testes
     for test_name in basic_tests:
         print(f"\n{Fore.GREEN}Teste: {Fore.YELLOW}{test_name}{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}Descrição: {Fore.WHITE}{test_descriptions[test_name]}{Style.RESET_ALL}")
+        print(f"{Fore.CYAN}Descrição: {Fore.WHITE}{TEST_DESCRIPTIONS[test_name]}{Style.RESET_ALL}")
 
     print_step("Executando todos os testes básicos em uma única sessão", "Isso garante que o banco de dados seja limpo apenas uma vez no início")
 
@@ -171,6 +185,7 @@ def main_menu():
         print(f"{Fore.GREEN}7.{Style.RESET_ALL} Testes de Performance de Inserção em Lote")
         print(f"{Fore.YELLOW}M.{Style.RESET_ALL} Manual e Explicações Detalhadas")
         print(f"{Fore.BLUE}0.{Style.RESET_ALL} Executar todos os testes")
+        print(f"{Fore.BLUE}A.{Style.RESET_ALL} Executar apenas os testes afetados pelas últimas mudanças")
         print(f"{Fore.RED}Q.{Style.RESET_ALL} Sair")
 
         opcao = input(f"\n{Fore.CYAN}Digite sua escolha: {Style.RESET_ALL}").strip().upper()
@@ -199,6 +214,13 @@ def main_menu():
             pytest.main(["-v", "-s"])
             print_step("Testes concluídos", "Verificando resultados")
             input(f"\n{Fore.GREEN}Pressione Enter para continuar...{Style.RESET_ALL}")
+        elif opcao == 'A':
+            clear_screen()
+            print(f"\n{Fore.GREEN}Executando os testes afetados...{Style.RESET_ALL}\n")
+            print_step("Comparando com a última execução", "Código dos testes e tabelas, views e triggers usados")
+            pytest.main(["-v", "-s", "--changed-only"])
+            print_step("Testes concluídos", "Testes sem mudanças aparecem como 'deselected'")
+            input(f"\n{Fore.GREEN}Pressione Enter para continuar...{Style.RESET_ALL}")
         elif opcao == 'Q':
             print(f"\n{Fore.YELLOW}Encerrando o sistema de testes. Até logo!{Style.RESET_ALL}")
             sys.exit(0)
@@ -206,5 +228,191 @@ def main_menu():
             print(f"\n{Fore.RED}Opção inválida. Tente novamente.{Style.RESET_ALL}")
             input(f"\n{Fore.GREEN}Pressione Enter para continuar...{Style.RESET_ALL}")
 
+class TimingCollector:
+    """Plugin do pytest que coleta o resultado e a duração de cada teste."""
+
+    def __init__(self):
+        self.tests = {}
+
+    def pytest_runtest_logreport(self, report):
+        entry = self.tests.setdefault(report.nodeid, {"nodeid": report.nodeid, "outcome": "passed", "duration_s": 0.0})
+        entry["duration_s"] += report.duration
+        if report.failed:
+            entry["outcome"] = "failed" if report.when == "call" else "error"
+        elif report.skipped and entry["outcome"] == "passed":
+            entry["outcome"] = "skipped"
+
+def resolve_suites(names):
+    """
+    Converte nomes de suítes (SUITES), nomes de testes (TEST_DESCRIPTIONS) ou
+    caminhos do pytest ('arquivo.py', 'arquivo.py::teste') em argumentos do pytest.
+    """
+    targets = []
+    for name in names:
+        items = SUITES.get(name, [name])
+        for item in items:
+            if item in TEST_DESCRIPTIONS:
+                target = f"test_database.py::{item}"
+            elif item == "." or ".py" in item:
+                target = item
+            else:
+                raise ValueError(f"Suíte desconhecida: {name}. Disponíveis: {', '.join(list(SUITES) + list(TEST_DESCRIPTIONS))}")
+            if target not in targets:
+                targets.append(target)
+    return targets
+
+def run_session(targets, extra_args, quiet=False):
+    """Executa os alvos em uma única sessão do pytest, no próprio processo."""
+    collector = TimingCollector()
+    args = ["-q" if quiet else "-v", *targets, *extra_args]
+    exit_code = pytest.main(args, plugins=[collector])
+    return int(exit_code), list(collector.tests.values())
+
+def run_parallel_sessions(targets, jobs, extra_args):
+    """
+    Sem o pytest-xdist, divide os alvos entre 'jobs' processos, cada um com sua
+    própria sessão do pytest e bancos em memória isolados (--db-isolation=test,
+    a menos que 'extra_args' já escolha outro modo de isolamento).
+    """
+    groups = [targets[i::jobs] for i in range(jobs) if targets[i::jobs]]
+    if not any(arg.startswith("--db-isolation") for arg in extra_args):
+        extra_args = ["--db-isolation=test", *extra_args]
+    with tempfile.TemporaryDirectory() as directory:
+        processes = []
+        for index, group in enumerate(groups):
+            output = os.path.join(directory, f"sessao_{index}.json")
+            command = [sys.executable, os.path.abspath(__file__), "--suite", ",".join(group),
+                       "--format", "json", "--output", output, "--", *extra_args]
+            processes.append((subprocess.Popen(command, stdout=subprocess.DEVNULL), output))
+
+        exit_code = 0
+        tests = []
+        for process, output in processes:
+            code = process.wait()
+            exit_code = exit_code or code
+            if os.path.exists(output):
+                with open(output, encoding="utf-8") as source:
+                    tests.extend(json.load(source)["tests"])
+    return exit_code, tests
+
+def run_backend_sessions(backends, suites, jobs, extra_args):
+    """
+    Executa a suíte uma vez para cada destino do banco (--db-backend), em
+    sequência e em processos separados, para que as medições não disputem o
+    disco. Retorna o maior código de saída e {destino: testes}.
+    """
+    runs = {}
+    exit_code = 0
+    with tempfile.TemporaryDirectory() as directory:
+        for backend in backends:
+            output = os.path.join(directory, f"{backend}.json")
+            command = [sys.executable, os.path.abspath(__file__), "--suite", ",".join(suites), "--jobs", str(jobs),
+                       "--format", "json", "--output", output, "--", f"--db-backend={backend}", *extra_args]
+            exit_code = max(exit_code, subprocess.run(command, stdout=subprocess.DEVNULL).returncode)
+            runs[backend] = []
+            if os.path.exists(output):
+                with open(output, encoding="utf-8") as source:
+                    runs[backend] = json.load(source)["tests"]
+    return exit_code, runs
+
+def build_summary(suites, targets, exit_code, tests, elapsed):
+    """Resumo de tempos em formato serializável."""
+    totals = {}
+    for test in tests:
+        totals[test["outcome"]] = totals.get(test["outcome"], 0) + 1
+    return {
+        "suites": suites,
+        "targets": targets,
+        "exit_code": exit_code,
+        "duration_s": elapsed,
+        "totals": totals,
+        "tests": sorted(tests, key=lambda test: test["duration_s"], reverse=True),
+    }
+
+def write_json(document, path=None):
+    """Grava o resumo JSON no arquivo informado ou na saída padrão."""
+    document = json.dumps(document, indent=2, ensure_ascii=False)
+    if path:
+        with open(path, "w", encoding="utf-8") as output:
+            output.write(document)
+    else:
+        print(document)
+
+def print_summary(summary):
+    """Imprime o resumo de tempos para leitura humana."""
+    print(f"\n{Fore.CYAN}{'=' * 60}{Style.RESET_ALL}")
+    for test in summary["tests"]:
+        color = Fore.GREEN if test["outcome"] in ("passed", "skipped") else Fore.RED
+        print(f"{color}{test['outcome']:<8}{Style.RESET_ALL}{test['duration_s']:>9.3f}s  {test['nodeid']}")
+    totals = ", ".join(f"{count} {outcome}" for outcome, count in sorted(summary["totals"].items()))
+    print(f"{Fore.YELLOW}Total: {totals} em {summary['duration_s']:.2f}s (código de saída {summary['exit_code']}){Style.RESET_ALL}")
+
+def run_cli(argv):
+    """
+    Modo não interativo, para execuções automatizadas. Exemplo:
+        python run_testes.py --suite basic,index,batch --jobs 4 --format json
+    Argumentos após '--' são repassados ao pytest. Retorna o código de saída do pytest.
+    """
+    parser = argparse.ArgumentParser(description="Executa as suítes de testes do banco de dados sem o menu interativo.")
+    parser.add_argument("--suite", default="all",
+                        help=f"suítes separadas por vírgula ({', '.join(SUITES)}) ou nomes de testes")
+    parser.add_argument("--jobs", type=int, default=1, help="processos em paralelo (pytest-xdist, se instalado; sem ele, sessões "
+                             "separadas com --db-isolation=test, se outro modo não for informado)")
+    parser.add_argument("--format", choices=["text", "json"], default="text", help="formato do resumo de tempos")
+    parser.add_argument("--output", help="grava o resumo JSON neste arquivo em vez da saída padrão")
+    parser.add_argument("--backends",
+                        help=f"executa a suíte em cada destino do banco, separados por vírgula ({', '.join(BACKENDS)}), "
+                             "e compara os tempos de cada teste lado a lado")
+    parser.add_argument("pytest_args", nargs="*", help="argumentos extras do pytest (após '--')")
+    args = parser.parse_args(argv)
+
+    suites = [name.strip() for name in args.suite.split(",") if name.strip()]
+    try:
+        targets = resolve_suites(suites)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return pytest.ExitCode.USAGE_ERROR
+
+    extra_args = list(args.pytest_args)
+    machine_readable = args.format == "json"
+    start = time.perf_counter()
+
+    if args.backends:
+        backends = [name.strip() for name in args.backends.split(",") if name.strip()]
+        unknown = [name for name in backends if name not in BACKENDS]
+        if unknown:
+            print(f"Destino desconhecido: {', '.join(unknown)}. Disponíveis: {', '.join(BACKENDS)}", file=sys.stderr)
+            return pytest.ExitCode.USAGE_ERROR
+        exit_code, runs = run_backend_sessions(backends, suites, args.jobs, extra_args)
+        comparison = compare_timings(runs)
+        comparison["exit_code"] = exit_code
+        comparison["duration_s"] = time.perf_counter() - start
+        if machine_readable:
+            write_json(comparison, args.output)
+        else:
+            print(format_comparison(comparison))
+        return exit_code
+
+    if args.jobs > 1 and importlib.util.find_spec("xdist") is None:
+        exit_code, tests = run_parallel_sessions(targets, args.jobs, extra_args)
+    else:
+        if args.jobs > 1:
+            extra_args = ["-n", str(args.jobs), *extra_args]
+        # No formato JSON, a saída do pytest vai para stderr e stdout fica só com o resumo
+        redirect = contextlib.redirect_stdout(sys.stderr) if machine_readable else contextlib.nullcontext()
+        with redirect:
+            exit_code, tests = run_session(targets, extra_args, quiet=machine_readable)
+
+    summary = build_summary(suites, targets, exit_code, tests, time.perf_counter() - start)
+
+    if machine_readable:
+        write_json(summary, args.output)
+    else:
+        print_summary(summary)
+
+    return exit_code
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
     main_menu()
@@ -0,0 +1,91 @@
+from benchmark import measure
+from datagen import DataGenerator, populate
+from streaming import consume, digest_query
+
+# Índice opcional na chave estrangeira usada pelo JOIN da view user_orders
+ORDERS_USER_INDEX = "CREATE INDEX idx_orders_user_id ON orders(user_id)"
+
+# Consultas medidas sobre a view
+VIEW_QUERIES = {
+    # Percorre o JOIN inteiro
+    "full_join": "SELECT COUNT(*), COUNT(DISTINCT name) FROM user_orders",
+    # Pedidos de um único usuário, filtrando pela coluna da view
+    "user_lookup": "SELECT item FROM user_orders WHERE name = ?",
+}
+
+
+def parse_sizes(value):
+    """Converte '1000:10000,1e6:1e7' em [(1000, 10000), (1000000, 10000000)]."""
+    sizes = []
+    for pair in value.split(","):
+        users, orders = pair.split(":")
+        sizes.append((int(float(users)), int(float(orders))))
+    return sizes
+
+
+def populate_users_orders(connection, users, orders, skew=1.0, seed=42, chunk_size=50_000):
+    """Carrega 'users' usuários e 'orders' pedidos, com user_id na distribuição de Zipf."""
+    populate(connection, DataGenerator(seed, skew), users=users, orders=orders, chunk_size=chunk_size)
+
+
+def hot_user_name(connection):
+    """Nome do usuário com mais pedidos na distribuição de Zipf (id 1)."""
+    return connection.execute("SELECT name FROM users WHERE id = 1").fetchone()[0]
+
+
+def measure_view(connection, rounds=5, warmup=1, hot_user=None):
+    """Mede cada consulta de VIEW_QUERIES e retorna {consulta: estatísticas}."""
+    hot_user = hot_user or hot_user_name(connection)
+    results = {}
+    for name, sql in VIEW_QUERIES.items():
+        params = (hot_user,) if "?" in sql else ()
+        rows = consume(connection, sql, params)
+        results[name] = measure(lambda: consume(connection, sql, params), rounds=rounds, warmup=warmup, rows=rows)
+    return results
+
+
+def view_results(connection, hot_user=None):
+    """
+    Resumo (ResultDigest) do resultado de cada consulta, para comparar
+    execuções com e sem índice sem carregar os resultados em memória.
+    """
+    hot_user = hot_user or hot_user_name(connection)
+    return {
+        name: digest_query(connection, sql, (hot_user,) if "?" in sql else ())
+        for name, sql in VIEW_QUERIES.items()
+    }
+
+
+def join_scaling_report(results):
+    """
+    Monta as linhas do relatório de crescimento: para cada consulta e variante
+    (com/sem índice), a latência em cada tamanho e o crescimento em relação ao
+    tamanho anterior.
+    """
+    lines = []
+    previous = {}
+    for (users, orders, variant, query), summary in sorted(results.items()):
+        key = (variant, query)
+        growth = summary["median_ms"] / previous[key] if key in previous and previous[key] else None
+        previous[key] = summary["median_ms"]
+        lines.append({
+            "users": users,
+            "orders": orders,
+            "variant": variant,
+            "query": query,
+            "median_ms": summary["median_ms"],
+            "p95_ms": summary["p95_ms"],
+            "growth": growth,
+        })
+    return lines
+
+
+def format_report(lines):
+    output = [f"{'usuários':>10}{'pedidos':>11}  {'variante':<11}{'consulta':<13}{'mediana (ms)':>13}{'p95 (ms)':>10}{'cresc.':>8}"]
+    for line in lines:
+        growth = f"{line['growth']:.2f}x" if line["growth"] else "-"
+        output.append(
+            f"{line['users']:>10}{line['orders']:>11}  {line['variant']:<11}{line['query']:<13}"
+            f"{line['median_ms']:>13.3f}{line['p95_ms']:>10.3f}{growth:>8}"
+        )
+    return "\n".join(output)
@@ -0,0 +1,62 @@
+import sqlite3
+
+# Índice FTS5 com tokenizador trigram sobre users.name. Com ele, buscas LIKE
+# com curinga no início ('%Silva') usam o índice em vez de percorrer users.
+NAME_SEARCH_SCHEMA = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(name, content='users', content_rowid='id', tokenize='trigram')",
+
+    # Triggers que mantêm o índice sincronizado com a tabela users
+    "CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN "
+    "INSERT INTO users_fts (rowid, name) VALUES (new.id, new.name); END;",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN "
+    "INSERT INTO users_fts (users_fts, rowid, name) VALUES ('delete', old.id, old.name); END;",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE OF name ON users BEGIN "
+    "INSERT INTO users_fts (users_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+    "INSERT INTO users_fts (rowid, name) VALUES (new.id, new.name); END;",
+]
+
+
+def fts5_available():
+    """Indica se o SQLite em uso foi compilado com FTS5 e o tokenizador trigram."""
+    connection = sqlite3.connect(":memory:")
+    try:
+        connection.execute("CREATE VIRTUAL TABLE probe USING fts5(name, tokenize='trigram')")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        connection.close()
+
+
+def install_name_search(connection):
+    """
+    Cria o índice de busca de users.name (se ainda não existir) e indexa as
+    linhas já presentes. A partir daí, os triggers mantêm o índice atualizado.
+    """
+    for statement in NAME_SEARCH_SCHEMA:
+        connection.execute(statement)
+    connection.execute("INSERT INTO users_fts (users_fts) VALUES ('rebuild')")
+    connection.commit()
+
+
+def remove_name_search(connection):
+    for name in ("users_fts_insert", "users_fts_delete", "users_fts_update"):
+        connection.execute(f"DROP TRIGGER IF EXISTS {name}")
+    connection.execute("DROP TABLE IF EXISTS users_fts")
+    connection.commit()
+
+
+def search_users(connection, pattern):
+    """
+    Usuários cujo nome satisfaz o padrão LIKE, via índice trigram. O resultado
+    é o mesmo de 'SELECT id, name FROM users WHERE name LIKE ?'; padrões com
+    menos de 3 caracteres fixos seguidos não aproveitam o índice.
+    """
+    return connection.execute(
+        "SELECT rowid, name FROM users_fts WHERE name LIKE ? ORDER BY rowid", (pattern,)
+    ).fetchall()
+
+
+def count_users(connection, pattern):
+    """Equivalente indexado de 'SELECT COUNT(*) FROM users WHERE name LIKE ?'."""
+    return connection.execute("SELECT COUNT(*) FROM users_fts WHERE name LIKE ?", (pattern,)).fetchone()[0]
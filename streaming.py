@@ -0,0 +1,121 @@
+import hashlib
+import sqlite3
+
+# Linhas lidas por chamada a fetchmany()
+DEFAULT_BATCH_SIZE = 1000
+
+_MASK = (1 << 64) - 1
+
+
+def dict_factory(cursor, row):
+    """Row factory que devolve cada linha como {coluna: valor}."""
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+# Formatos de linha aceitos por iter_rows(): tuplas (o padrão do sqlite3, o mais
+# barato), sqlite3.Row (acesso por nome e por posição) ou dicionários
+ROW_FACTORIES = {
+    "tuple": None,
+    "row": sqlite3.Row,
+    "dict": dict_factory,
+}
+
+
+def iter_batches(connection, sql, params=(), batch_size=DEFAULT_BATCH_SIZE, row_factory="tuple"):
+    """
+    Executa a consulta e gera listas de até 'batch_size' linhas, lidas com
+    fetchmany(): só um lote fica em memória de cada vez. O cursor é fechado
+    ao final (ou quando o gerador é descartado).
+    """
+    cursor = connection.cursor()
+    cursor.row_factory = ROW_FACTORIES[row_factory]
+    try:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield rows
+    finally:
+        cursor.close()
+
+
+def iter_rows(connection, sql, params=(), batch_size=DEFAULT_BATCH_SIZE, row_factory="tuple"):
+    """Gera as linhas da consulta uma a uma, lidas em lotes por iter_batches()."""
+    for rows in iter_batches(connection, sql, params, batch_size, row_factory):
+        yield from rows
+
+
+def consume(connection, sql, params=(), batch_size=DEFAULT_BATCH_SIZE):
+    """Lê todo o resultado sem guardá-lo e retorna a quantidade de linhas."""
+    return sum(len(rows) for rows in iter_batches(connection, sql, params, batch_size))
+
+
+def row_hash(row):
+    """Hash de 64 bits da linha; 1 e 1.0, ou '1' e 1, resultam em hashes diferentes."""
+    encoded = repr(tuple((type(value).__name__, value) for value in row)).encode()
+    return int.from_bytes(hashlib.blake2b(encoded, digest_size=8).digest(), "little")
+
+
+class ResultDigest:
+    """
+    Resumo de um conjunto de linhas em memória constante: a quantidade de
+    linhas e um checksum que não depende da ordem (soma dos hashes das linhas
+    módulo 2^64, que distingue linhas repetidas). Com ordered=True, também
+    mantém um hash encadeado, que depende da ordem, para consultas com ORDER BY.
+    Dois resumos são iguais se os conjuntos (e, quando ambos têm, as
+    sequências) de linhas forem iguais.
+    """
+
+    def __init__(self, ordered=False):
+        self.rows = 0
+        self.checksum = 0
+        self._sequence = hashlib.blake2b(digest_size=16) if ordered else None
+
+    @property
+    def sequence(self):
+        return self._sequence.hexdigest() if self._sequence is not None else None
+
+    def add(self, row):
+        value = row_hash(row)
+        self.rows += 1
+        self.checksum = (self.checksum + value) & _MASK
+        if self._sequence is not None:
+            self._sequence.update(value.to_bytes(8, "little"))
+
+    def update(self, rows):
+        for row in rows:
+            self.add(row)
+        return self
+
+    def __eq__(self, other):
+        if not isinstance(other, ResultDigest):
+            return NotImplemented
+        if self.sequence is not None and other.sequence is not None and self.sequence != other.sequence:
+            return False
+        return self.rows == other.rows and self.checksum == other.checksum
+
+    def __repr__(self):
+        ordered = f", sequence={self.sequence}" if self.sequence is not None else ""
+        return f"ResultDigest(rows={self.rows}, checksum={self.checksum:016x}{ordered})"
+
+
+def digest_query(connection, sql, params=(), batch_size=DEFAULT_BATCH_SIZE, ordered=False):
+    """ResultDigest do resultado da consulta, lido em lotes."""
+    digest = ResultDigest(ordered)
+    for rows in iter_batches(connection, sql, params, batch_size):
+        digest.update(rows)
+    return digest
+
+
+def assert_same_results(connection, sql, expected_sql, params=(), expected_params=None,
+                        batch_size=DEFAULT_BATCH_SIZE, ordered=False):
+    """
+    Verifica, em memória constante, se duas consultas devolvem as mesmas
+    linhas (na mesma ordem, com ordered=True). Retorna o resumo comum.
+    """
+    actual = digest_query(connection, sql, params, batch_size, ordered)
+    expected = digest_query(connection, expected_sql, params if expected_params is None else expected_params,
+                            batch_size, ordered)
+    assert actual == expected, f"Resultados diferentes: {actual!r} (esperado {expected!r})"
+    return actual
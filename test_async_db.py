@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from async_db import AsyncPool, run_async_load
+from database import connect, restore_template
+
+
+async def test_async_update_user(async_db_connection):
+    """Testa a atualização de um usuário pela camada assíncrona."""
+    await async_db_connection.execute("INSERT INTO users (name) VALUES ('Alice Async')")
+    await async_db_connection.commit()
+
+    async with async_db_connection.transaction():
+        await async_db_connection.execute("UPDATE users SET name = 'Alicia Async' WHERE name = 'Alice Async'")
+
+    result = await async_db_connection.fetchone("SELECT name FROM users WHERE name = 'Alicia Async'")
+    assert result == ("Alicia Async",), "O nome atualizado deveria existir no banco."
+
+
+async def test_async_join_users_orders(async_db_connection):
+    """Testa o JOIN da view user_orders a partir de uma corrotina."""
+    cursor = await async_db_connection.execute("INSERT INTO users (name) VALUES ('Bob Async')")
+    await async_db_connection.execute("INSERT INTO orders (user_id, item) VALUES (?, 'Laptop')", (cursor.lastrowid,))
+    await async_db_connection.commit()
+
+    cursor = await async_db_connection.execute("SELECT * FROM user_orders WHERE name = 'Bob Async'")
+    assert await cursor.fetchall() == [("Bob Async", "Laptop")]
+
+
+async def test_async_fetchmany_reads_in_batches(async_db_connection):
+    """Testa a leitura de um resultado em lotes, sem carregá-lo inteiro."""
+    await async_db_connection.executemany("INSERT INTO test (name) VALUES (?)", [(f"Lote {n}",) for n in range(5)])
+    cursor = await async_db_connection.execute("SELECT name FROM test WHERE name LIKE 'Lote %' ORDER BY id")
+    assert [len(await cursor.fetchmany(2)) for _ in range(4)] == [2, 2, 1, 0]
+
+
+async def test_async_trigger_with_hundreds_of_coroutines(async_db_connection):
+    """Testa se o trigger registra um log por pedido quando centenas de corrotinas inserem ao mesmo tempo."""
+    initial_logs = (await async_db_connection.fetchone("SELECT COUNT(*) FROM logs"))[0]
+    user = await async_db_connection.execute("INSERT INTO users (name) VALUES ('Diana Async')")
+    await async_db_connection.commit()
+
+    def place(connection, number):
+        connection.execute("INSERT INTO orders (user_id, item) VALUES (?, ?)", (user.lastrowid, f"Item {number}"))
+        connection.commit()
+
+    await asyncio.gather(*(async_db_connection.run(place, number) for number in range(300)))
+
+    orders = await async_db_connection.fetchone("SELECT COUNT(*) FROM orders WHERE user_id = ?", (user.lastrowid,))
+    logs = await async_db_connection.fetchone("SELECT COUNT(*) FROM logs")
+    assert orders == (300,)
+    assert logs[0] == initial_logs + 300, "O trigger deveria registrar um log para cada pedido."
+
+
+async def test_async_query_does_not_block_event_loop(async_db_connection):
+    """Testa se o event loop continua atendendo outras corrotinas durante uma consulta demorada."""
+    ticks = 0
+    query = asyncio.ensure_future(async_db_connection.fetchone(
+        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 1000000) SELECT SUM(i) FROM n"))
+    while not query.done():
+        ticks += 1
+        await asyncio.sleep(0.001)
+
+    assert (await query) == (500000500000,)
+    assert ticks > 1, "A consulta deveria rodar fora do event loop."
+
+
+@pytest.fixture
+def async_file_db(tmp_path):
+    """Arquivo de banco com o esquema criado, em WAL, para a carga concorrente."""
+    path = str(tmp_path / "async.sqlite")
+    connection = connect(path)
+    restore_template(connection)
+    connection.execute("PRAGMA journal_mode = wal")
+    connection.close()
+    return path
+
+
+async def test_async_pool_load(async_file_db, bench_results):
+    """Mede centenas de corrotinas escrevendo e lendo pelo pool com uma e com várias conexões."""
+    report = [f"\n{'conexões':>9}{'operações':>11}{'oper./s':>10}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}"]
+    total = 0
+    for size in (1, 4):
+        pool = AsyncPool(lambda: connect(async_file_db), size=size)
+        try:
+            result = await run_async_load(pool, coroutines=200, operations=3)
+        finally:
+            await pool.close()
+        total += result["operations"]
+        bench_results[f"async_load[{size}]"] = result
+        report.append(f"{size:>9}{result['operations']:>11}{result['throughput']:>10.0f}"
+                      f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}")
+    print("\n".join(report))
+
+    connection = connect(async_file_db)
+    orders, logs = connection.execute("SELECT (SELECT COUNT(*) FROM orders), (SELECT COUNT(*) FROM logs)").fetchone()
+    connection.close()
+    assert orders == total == 2 * 200 * 3
+    assert logs == orders, "Cada pedido deveria gerar exatamente um log, mesmo sob concorrência."
@@ -0,0 +1,77 @@
+import pytest
+
+from audit import (ORDER_ACTION, BufferedAuditLog, audit_summary, disable_order_trigger, insert_orders,
+                   measure_trigger_overhead)
+from bulk import bulk_load
+from database import connect, restore_template
+from datagen import DataGenerator
+
+
+@pytest.fixture
+def orders_db(tmp_path):
+    """Banco em arquivo com 100 usuários, pronto para receber pedidos."""
+    connection = connect(str(tmp_path / "auditoria.sqlite"))
+    restore_template(connection)
+    bulk_load(connection, "users", ["id", "name"], DataGenerator().users(100))
+    yield connection
+    connection.close()
+
+
+def orders(count):
+    return DataGenerator().orders(count, 100)
+
+
+def test_buffered_rows_match_trigger(orders_db):
+    """Testa se o modo 'rows' grava exatamente as mesmas linhas de log que o trigger."""
+    insert_orders(orders_db, orders(2500), chunk_size=1000)
+    by_trigger = orders_db.execute("SELECT action, quantity FROM logs ORDER BY id").fetchall()
+
+    orders_db.execute("DELETE FROM orders")
+    orders_db.execute("DELETE FROM logs")
+    disable_order_trigger(orders_db)
+    insert_orders(orders_db, orders(2500), BufferedAuditLog(orders_db, mode="rows"), chunk_size=1000)
+    buffered = orders_db.execute("SELECT action, quantity FROM logs ORDER BY id").fetchall()
+
+    assert buffered == by_trigger
+    assert len(buffered) == 2500
+
+
+def test_buffered_summary_preserves_audit_information(orders_db):
+    """Testa se o modo 'summary' registra a mesma informação com poucas linhas."""
+    insert_orders(orders_db, orders(2500), chunk_size=1000)
+    by_trigger = audit_summary(orders_db)
+
+    orders_db.execute("DELETE FROM orders")
+    orders_db.execute("DELETE FROM logs")
+    disable_order_trigger(orders_db)
+    insert_orders(orders_db, orders(2500), BufferedAuditLog(orders_db, mode="summary"), chunk_size=1000)
+
+    assert audit_summary(orders_db) == by_trigger == {ORDER_ACTION: 2500}
+    assert orders_db.execute("SELECT COUNT(*) FROM logs").fetchone()[0] == 3, "Uma linha por lote de pedidos."
+
+
+def test_buffer_flushes_on_size_and_exit(orders_db):
+    """Testa a descarga automática ao atingir flush_size e ao sair do bloco 'with'."""
+    with BufferedAuditLog(orders_db, flush_size=3) as audit:
+        for _ in range(4):
+            audit.record("Pedido cancelado")
+        assert audit_summary(orders_db) == {"Pedido cancelado": 3}
+    assert audit_summary(orders_db) == {"Pedido cancelado": 4}
+
+
+def test_trigger_overhead(orders_db, bench_config, bench_results):
+    """Mede o custo do trigger na inserção de pedidos e compara com a auditoria em lote."""
+    _, count = bench_config["scale_sizes"][-1]
+    results = measure_trigger_overhead(orders_db, 100, count, rounds=bench_config["rounds"],
+                                       warmup=bench_config["warmup"])
+    report = [f"\n{'variante':<16}{'mediana (ms)':>13}{'pedidos/s':>12}{'custo extra':>13}"]
+    for variant, summary in results.items():
+        bench_results[f"order_audit_{variant}[{count}]"] = summary
+        report.append(f"{variant:<16}{summary['median_ms']:>13.3f}{summary['rows_per_sec']:>12,.0f}"
+                      f"{summary['overhead']:>+13.0%}")
+    print("\n".join(report))
+
+    trigger_rows = orders_db.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'order_insert'").fetchone()[0]
+    assert trigger_rows == 1, "O trigger deveria ser recriado ao final da medição."
+    assert results["buffer_summary"]["median_ms"] < results["trigger"]["median_ms"], \
+        "A auditoria resumida deveria custar menos que o trigger."
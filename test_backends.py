@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from backends import BACKENDS, compare_timings, format_comparison, open_backend
+
+
+@pytest.mark.parametrize("name", ["memory", "shared-cache"])
+def test_memory_backend_is_shared(name):
+    """Testa se as conexões do processo enxergam o mesmo banco em memória, que existe até close()."""
+    backend = open_backend(name, "backend_teste.sqlite")
+    backend.reset()
+    writer = backend.connect()
+    writer.execute("INSERT INTO users (name) VALUES ('Compartilhado')")
+    writer.commit()
+    reader = backend.connect()
+    assert reader.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 1
+    writer.close()
+    reader.close()
+    assert backend.path is None
+
+    backend.reset()
+    reader = backend.connect()
+    assert reader.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0, "reset() deveria restaurar o esquema limpo."
+    reader.close()
+    backend.close()
+
+
+def test_file_backend_pragmas(tmp_path):
+    """Testa se o backend file-wal aplica seus PRAGMAs às conexões e devolve o arquivo ao journal padrão."""
+    backend = open_backend("file-wal", str(tmp_path / "wal.sqlite"))
+    backend.reset()
+    connection = backend.connect()
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert connection.execute("PRAGMA synchronous").fetchone()[0] == 1
+    connection.execute("INSERT INTO users (name) VALUES ('Wal')")
+    connection.commit()
+    connection.close()
+
+    backend.close()
+    connection = open_backend("file", backend.path).connect()
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "delete", "close() deveria desfazer o modo WAL."
+    assert connection.execute("PRAGMA synchronous").fetchone()[0] == 2
+    connection.close()
+
+
+def test_tmpfs_backend_is_removed():
+    """Testa se o arquivo temporário do backend tmpfs é removido em close()."""
+    backend = open_backend("tmpfs", "backend_teste.sqlite")
+    backend.reset()
+    assert os.path.exists(backend.path)
+    backend.close()
+    assert not os.path.exists(backend.path)
+
+
+def test_all_backends_listed():
+    """Testa se os destinos em disco, tmpfs e memória estão disponíveis em --db-backend."""
+    assert {"file", "tmpfs", "memory", "shared-cache"} <= set(BACKENDS)
+
+
+def test_compare_timings():
+    """Testa o cálculo da fração de tempo atribuída a E/S e dos totais por backend na comparação."""
+    runs = {
+        "file": [{"nodeid": "a", "duration_s": 0.010}, {"nodeid": "b", "duration_s": 0.002}],
+        "memory": [{"nodeid": "a", "duration_s": 0.004}, {"nodeid": "b", "duration_s": 0.002}],
+    }
+    comparison = compare_timings(runs)
+
+    assert [row["nodeid"] for row in comparison["tests"]] == ["a", "b"]
+    assert comparison["tests"][0]["io_share"] == pytest.approx(0.6)
+    assert comparison["tests"][1]["io_share"] == pytest.approx(0.0)
+    assert comparison["totals"] == {"file": pytest.approx(0.012), "memory": pytest.approx(0.006)}
+    assert "0.50x" in format_comparison(comparison)
@@ -0,0 +1,47 @@
+import pytest
+
+from benchmark import compare, load_results, measure, percentile, save_results, summarize
+
+
+def test_percentile_interpolates():
+    """Testa o cálculo de percentis com interpolação linear."""
+    values = [10, 20, 30, 40, 50]
+    assert percentile(values, 0) == 10
+    assert percentile(values, 50) == 30
+    assert percentile(values, 95) == pytest.approx(48)
+    assert percentile(values, 100) == 50
+
+
+def test_summarize_reports_throughput():
+    """Testa as estatísticas e a vazão calculadas a partir das amostras."""
+    summary = summarize([1_000_000, 2_000_000, 3_000_000], rows=1000)
+    assert summary["rounds"] == 3
+    assert summary["median_ms"] == pytest.approx(2.0)
+    assert summary["stddev_ms"] == pytest.approx(1.0)
+    assert summary["rows_per_sec"] == pytest.approx(500_000)
+
+
+def test_measure_runs_warmup_and_setup():
+    """Testa se o aquecimento não entra nas amostras e se o setup roda antes de cada execução."""
+    calls = {"setup": 0, "function": 0}
+    summary = measure(
+        lambda: calls.__setitem__("function", calls["function"] + 1),
+        rounds=4,
+        warmup=2,
+        setup=lambda: calls.__setitem__("setup", calls["setup"] + 1),
+    )
+    assert summary["rounds"] == 4
+    assert calls == {"setup": 6, "function": 6}
+
+
+def test_compare_flags_regressions(tmp_path):
+    """Testa a detecção de regressões em relação a uma linha de base gravada em JSON."""
+    baseline = {"batch_insert[100]": summarize([1_000_000]), "batch_insert[1000]": summarize([5_000_000])}
+    path = tmp_path / "baseline.json"
+    save_results(baseline, path)
+
+    current = {"batch_insert[100]": summarize([1_100_000]), "batch_insert[1000]": summarize([7_000_000])}
+    regressions = compare(current, load_results(path), tolerance=0.2)
+
+    assert [regression["name"] for regression in regressions] == ["batch_insert[1000]"]
+    assert regressions[0]["ratio"] == pytest.approx(1.4)
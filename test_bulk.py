@@ -0,0 +1,80 @@
+import sqlite3
+
+import pytest
+
+from bulk import PRAGMA_PROFILES, bulk_load, chunked
+from database import connect, restore_template
+
+
+@pytest.fixture
+def file_connection(tmp_path):
+    """Conexão com um arquivo novo, para que os PRAGMAs de journal tenham efeito."""
+    connection = connect(str(tmp_path / "carga.sqlite"))
+    restore_template(connection)
+    yield connection
+    connection.close()
+
+
+def test_chunked_streams_iterable():
+    """Testa a divisão em lotes sem consumir o gerador inteiro de uma vez."""
+    consumed = []
+
+    def rows():
+        for i in range(7):
+            consumed.append(i)
+            yield (i,)
+
+    chunks = chunked(rows(), 3)
+    assert next(chunks) == [(0,), (1,), (2,)]
+    assert consumed == [0, 1, 2], "Apenas o primeiro lote deveria ter sido lido."
+    assert [len(chunk) for chunk in chunks] == [3, 1]
+
+
+@pytest.mark.parametrize("profile", sorted(PRAGMA_PROFILES))
+def test_bulk_load_restores_pragmas_and_indexes(file_connection, profile):
+    """Testa a carga em lotes com cada perfil, adiando e recriando os índices."""
+    before = {name: file_connection.execute(f"PRAGMA {name}").fetchone()[0] for name in PRAGMA_PROFILES["unsafe"]}
+    progress = []
+
+    stats = bulk_load(
+        file_connection, "test", ["name"], ((f"User_{i}",) for i in range(2500)),
+        chunk_size=1000, profile=profile, defer_indexes=True, progress=progress.append,
+    )
+
+    after = {name: file_connection.execute(f"PRAGMA {name}").fetchone()[0] for name in PRAGMA_PROFILES["unsafe"]}
+    indexes = file_connection.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'test'").fetchall()
+    plan = file_connection.execute("EXPLAIN QUERY PLAN SELECT * FROM test WHERE name = 'User_500'").fetchall()
+
+    assert stats.rows == 2500 and stats.chunks == 3
+    assert progress == [1000, 2000, 2500]
+    assert file_connection.execute("SELECT COUNT(*) FROM test").fetchone()[0] == 2500
+    assert indexes == [("idx_name",)], "O índice adiado deveria ter sido recriado."
+    assert "idx_name" in str(plan), "O índice recriado deveria ser usado nas consultas."
+    assert after == before, "Os PRAGMAs deveriam voltar aos valores anteriores à carga."
+
+
+def test_bulk_load_failure_discards_partial_chunk(file_connection):
+    """Testa se um erro no meio de um lote desfaz o lote inteiro, mantendo só os lotes já confirmados."""
+    rows = [("a", 1), ("b", 1), ("c", 1), ("d", 1), ("e", None), ("f", 1)]
+    with pytest.raises(sqlite3.IntegrityError):
+        bulk_load(file_connection, "logs", ["action", "quantity"], rows, chunk_size=3, defer_indexes=True)
+
+    loaded = file_connection.execute("SELECT action FROM logs ORDER BY id").fetchall()
+    assert loaded == [("a",), ("b",), ("c",)], "O lote interrompido não deveria ter sido gravado."
+    assert not file_connection.in_transaction
+
+
+def test_bulk_load_users_and_orders(file_connection):
+    """Testa a carga de users e orders respeitando a chave estrangeira e o trigger."""
+    bulk_load(file_connection, "users", ["id", "name"], ((i, f"Cliente {i}") for i in range(1, 101)), profile="fast")
+    stats = bulk_load(
+        file_connection, "orders", ["user_id", "item"],
+        ((i % 100 + 1, f"Item {i}") for i in range(1000)), chunk_size=256, profile="fast",
+    )
+
+    logs = file_connection.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+    joined = file_connection.execute("SELECT COUNT(*) FROM user_orders").fetchone()[0]
+
+    assert stats.rows_per_sec > 0
+    assert logs == 1000, "O trigger deveria registrar um log por pedido carregado."
+    assert joined == 1000
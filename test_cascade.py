@@ -0,0 +1,74 @@
+import pytest
+
+from benchmark import measure
+from bulk import bulk_delete
+from database import connect, restore_template
+from datagen import DataGenerator, populate
+
+
+@pytest.fixture
+def family_db(tmp_path, bench_config):
+    """
+    Banco em arquivo com pais e filhos no maior tamanho de --scale-sizes
+    (usuários:pedidos viram pais:filhos), com a quantidade de filhos por pai
+    na distribuição de Zipf de --scale-skew: os primeiros pais têm mais filhos.
+    """
+    parents, children = bench_config["scale_sizes"][-1]
+    connection = connect(str(tmp_path / "cascata.sqlite"))
+    restore_template(connection)
+    populate(connection, DataGenerator(skew=bench_config["scale_skew"]), parents=parents, children=children)
+    yield connection, parents, children
+    connection.close()
+
+
+def test_cascade_delete_uses_fk_index(family_db):
+    """Testa, pelo plano de execução, se a exclusão em cascata busca os filhos pelo índice."""
+    connection, _, _ = family_db
+    plan = [row[3] for row in connection.execute("EXPLAIN QUERY PLAN DELETE FROM parents WHERE id = 1").fetchall()]
+    assert any("children" in step and "idx_children_parent_id" in step for step in plan), \
+        f"A cascata deveria usar idx_children_parent_id, plano: {plan}"
+    assert "SCAN children" not in plan
+
+
+def test_cascade_delete_fanout(family_db, bench_config, bench_results):
+    """Mede a exclusão dos pais com mais filhos, com e sem o índice na chave estrangeira."""
+    connection, parents, children = family_db
+    deleted = bench_config["rounds"] * 2 + bench_config["warmup"] * 2
+    fanout = connection.execute("SELECT COUNT(*) FROM children WHERE parent_id <= ?", (deleted,)).fetchone()[0] // deleted
+    next_parent = iter(range(1, parents + 1))
+
+    def delete_one():
+        connection.execute("DELETE FROM parents WHERE id = ?", (next(next_parent),))
+        connection.commit()
+
+    report = [f"\n{'variante':<12}{'filhos/pai':>11}{'linhas em children':>20}{'mediana (ms)':>14}{'p95 (ms)':>10}"]
+    for variant in ("com_indice", "sem_indice"):
+        if variant == "sem_indice":
+            connection.execute("DROP INDEX idx_children_parent_id")
+            connection.commit()
+        summary = measure(delete_one, rounds=bench_config["rounds"], warmup=bench_config["warmup"], rows=fanout)
+        bench_results[f"cascade_delete_{variant}[{parents}:{children}]"] = summary
+        report.append(f"{variant:<12}{fanout:>11}{children:>20}{summary['median_ms']:>14.3f}{summary['p95_ms']:>10.3f}")
+    print("\n".join(report))
+
+    orphans = connection.execute(
+        "SELECT COUNT(*) FROM children WHERE parent_id NOT IN (SELECT id FROM parents)").fetchone()[0]
+    assert connection.execute("SELECT COUNT(*) FROM parents").fetchone()[0] == parents - deleted
+    assert orphans == 0, "Os filhos dos pais excluídos deveriam ter sido removidos."
+
+
+def test_bulk_delete_in_bounded_transactions(family_db):
+    """Testa a exclusão de todos os pais em lotes, com as cascatas, em transações curtas."""
+    connection, parents, children = family_db
+    chunk_size = max(1, parents // 8)
+    progress = []
+
+    stats = bulk_delete(connection, "parents", "id > ?", (0,), chunk_size=chunk_size, progress=progress.append)
+    print(f"\n{stats}")
+
+    assert stats.rows == parents
+    assert stats.changes == parents + children, "As exclusões em cascata deveriam ser contadas."
+    assert stats.chunks == -(-parents // chunk_size)
+    assert progress[-1] == parents
+    assert connection.execute("SELECT COUNT(*) FROM children").fetchone()[0] == 0
+    assert not connection.in_transaction, "Nenhuma transação deveria ficar aberta."
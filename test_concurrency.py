@@ -0,0 +1,45 @@
+import os
+import sqlite3
+
+import pytest
+
+from concurrency import concurrency_matrix, format_matrix, order_counts, prepare_database, run_load
+
+
+def test_concurrency_matrix(tmp_path, bench_config, bench_results):
+    """
+    Compara rollback journal e WAL com escritores e leitores simultâneos em cada
+    nível de --concurrency-levels, conferindo que nenhuma escrita confirmada se perde.
+    """
+    results = concurrency_matrix(str(tmp_path), bench_config["concurrency_levels"],
+                                 duration=bench_config["concurrency_duration"])
+    print("\n" + format_matrix(results))
+
+    for (journal_mode, writers, readers), report in results.items():
+        bench_results[f"concurrency_{journal_mode}[{writers}:{readers}]"] = report
+        orders, logs = order_counts(os.path.join(tmp_path, f"concorrencia_{journal_mode}_{writers}_{readers}.sqlite"))
+        assert orders == report["writer"]["operations"], "Cada escrita confirmada deveria estar no banco."
+        assert logs == orders, "O trigger deveria gravar um log para cada pedido, mesmo sob concorrência."
+        assert report["writer"]["operations"] > 0
+
+
+@pytest.mark.parametrize("journal_mode", ["delete", "wal"])
+def test_concurrency_with_processes(tmp_path, journal_mode):
+    """Testa a carga com processos em vez de threads."""
+    path = str(tmp_path / f"processos_{journal_mode}.sqlite")
+    prepare_database(path, journal_mode)
+
+    report = run_load(path, writers=2, readers=2, duration=0.3, busy_timeout=0.5, use_processes=True)
+
+    orders, logs = order_counts(path)
+    assert orders == logs == report["writer"]["operations"] > 0
+    assert report["reader"]["operations"] > 0
+
+
+def test_worker_failures_are_raised(tmp_path):
+    """Testa se o erro de um worker em thread é relançado, em vez de ele sumir do relatório."""
+    path = str(tmp_path / "vazio.sqlite")
+    sqlite3.connect(path).close()
+
+    with pytest.raises(sqlite3.OperationalError, match="no such table"):
+        run_load(path, writers=1, readers=1, duration=0.1)
@@ -0,0 +1,72 @@
+import os
+import sqlite3
+
+import pytest
+
+from concurrency import order_counts, prepare_database
+from contention import (contention_matrix, format_contention, format_rollback_waits, hold_transaction,
+                        large_rollback_waits, run_contention)
+
+
+def test_hold_transaction_commit_and_rollback(tmp_path):
+    """Testa se a transação longa desfaz ou confirma os pedidos pendentes e os logs do trigger."""
+    path = str(tmp_path / "transacao.sqlite")
+    prepare_database(path, "delete")
+
+    rolled_back = hold_transaction(path, rows=500, hold=0.0)
+    assert order_counts(path) == (0, 0), "O rollback deveria descartar os pedidos e os logs pendentes."
+    committed = hold_transaction(path, rows=500, hold=0.0, outcome="commit")
+    assert order_counts(path) == (500, 500)
+    assert rolled_back["open_s"] >= rolled_back["insert_s"] and committed["outcome"] == "commit"
+
+
+def test_thread_failures_are_raised(tmp_path):
+    """Testa se erros da transação longa e dos contendores são relançados, em vez de gerar um relatório incompleto."""
+    path = str(tmp_path / "vazio.sqlite")
+    sqlite3.connect(path).close()
+
+    with pytest.raises(sqlite3.OperationalError, match="no such table: orders"):
+        run_contention(path, hold=0.0, busy_timeout=0.1, rows=10, writers=0, readers=1)
+    with pytest.raises(sqlite3.OperationalError, match="no such table: user_orders"):
+        run_contention(path, hold=0.0, busy_timeout=0.1, writers=0, readers=1)
+
+
+def test_busy_timeout_under_long_transactions(tmp_path, bench_config, bench_results):
+    """
+    Mantém uma transação de escrita aberta por cada duração de --contention-holds
+    enquanto escritores e leitores tentam operar com cada busy_timeout de
+    --contention-timeouts, e mostra a espera e a taxa de desistência.
+    """
+    results = contention_matrix(str(tmp_path), bench_config["contention_holds"], bench_config["contention_timeouts"])
+    print("\n" + format_contention(results))
+
+    for (journal_mode, hold, busy_timeout), report in results.items():
+        bench_results[f"contention_{journal_mode}[{hold}s:{busy_timeout}s]"] = report
+        writer, reader = report["writer"], report["reader"]
+        orders, logs = order_counts(os.path.join(tmp_path, f"bloqueio_{journal_mode}_{hold}_{busy_timeout}.sqlite"))
+        assert orders == logs == writer["operations"], "Só as escritas confirmadas pelos concorrentes devem ficar no banco."
+
+        if busy_timeout > 2 * report["transaction"]["open_s"]:
+            assert writer["locked"] == 0, "Com busy_timeout maior que a transação, nenhum escritor deveria desistir."
+        if busy_timeout < hold / 2:
+            assert writer["locked"] > 0, "Com busy_timeout curto, escritores deveriam desistir durante a transação."
+        if journal_mode == "wal":
+            assert reader["locked"] == 0, "No modo WAL, leitores não esperam pelo escritor."
+
+
+def test_large_rollback_blocks_writers(tmp_path, bench_config, bench_results):
+    """
+    Desfaz transações com cada quantidade de --contention-rows inserções
+    pendentes e mede a espera de um escritor e de um leitor concorrentes.
+    """
+    results = large_rollback_waits(str(tmp_path), bench_config["contention_rows"])
+    print("\n" + format_rollback_waits(results))
+
+    for (journal_mode, rows), report in results.items():
+        bench_results[f"large_rollback_{journal_mode}[{rows}]"] = report
+        transaction = report["transaction"]
+        orders, _ = order_counts(os.path.join(tmp_path, f"rollback_{journal_mode}_{rows}.sqlite"))
+        assert orders == report["writer"]["operations"], "As inserções desfeitas não deveriam permanecer no banco."
+        assert report["writer"]["locked"] == report["reader"]["locked"] == 0
+        # O primeiro escritor espera a transação inteira: inserções e rollback
+        assert report["writer"]["max_ms"] >= transaction["open_s"] * 1000 / 2
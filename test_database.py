@@ -1,82 +1,10 @@
 import pytest
 import sqlite3
-import time
-from colorama import Fore, Style, init
-
-# Inicializar colorama
-init(autoreset=True)
-
-def print_action(action, details=""):
-    """Imprime uma ação de teste formatada com cores."""
-    print(f"{Fore.BLUE}[AÇÃO]{Style.RESET_ALL} {Fore.GREEN}{action}{Style.RESET_ALL}")
-    if details:
-        print(f"  {Fore.WHITE}{details}{Style.RESET_ALL}")
-
-@pytest.fixture(scope="session", autouse=True)
-def setup_database():
-    """
-    Fixture que executa uma vez por sessão de teste.
-    Exclui tabelas existentes e cria todas as tabelas necessárias para os testes.
-    """
-    connection = sqlite3.connect("identifier.sqlite")
-    cursor = connection.cursor()
-
-    # Excluir tabelas existentes se existirem
-    tables_to_drop = ["users", "orders", "logs", "test", "children", "parents", "performance_test"]
-    views_to_drop = ["user_orders"]
-    triggers_to_drop = ["order_insert"]
-
-    # Excluir triggers
-    for trigger in triggers_to_drop:
-        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
-
-    # Excluir views
-    for view in views_to_drop:
-        cursor.execute(f"DROP VIEW IF EXISTS {view}")
-
-    # Excluir tabelas
-    for table in tables_to_drop:
-        cursor.execute(f"DROP TABLE IF EXISTS {table}")
-
-    # Criar todas as tabelas necessárias para os testes
-    # Tabelas principais
-    cursor.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
-    cursor.execute("CREATE TABLE orders (id INTEGER PRIMARY KEY, user_id INTEGER, item TEXT, FOREIGN KEY (user_id) REFERENCES users(id))")
-    cursor.execute("CREATE TABLE logs (id INTEGER PRIMARY KEY, action TEXT)")
-
-    # Tabela para teste de índice
-    cursor.execute("CREATE TABLE test (id INTEGER PRIMARY KEY, name TEXT)")
-    cursor.execute("CREATE INDEX idx_name ON test(name)")
-
-    # Cria tabelas com CASCADE
-    cursor.execute("CREATE TABLE parents (id INTEGER PRIMARY KEY, name TEXT)")
-    cursor.execute("CREATE TABLE children (id INTEGER PRIMARY KEY, parent_id INTEGER, name TEXT, FOREIGN KEY (parent_id) REFERENCES parents(id) ON DELETE CASCADE)")
-
-    # Cria tabela para teste de peformance
-    cursor.execute("CREATE TABLE performance_test (id INTEGER PRIMARY KEY, value TEXT)")
-
-    # Criar view
-    cursor.execute("CREATE VIEW user_orders AS SELECT users.name, orders.item FROM users INNER JOIN orders ON users.id = orders.user_id")
-
-    # Criar trigger
-    cursor.execute("CREATE TRIGGER order_insert AFTER INSERT ON orders BEGIN INSERT INTO logs (action) VALUES ('Novo pedido registrado'); END;")
-
-    connection.commit()
-    cursor.close()
-    connection.close()
-
-@pytest.fixture
-def db_connection():
-    """Cria e fecha conexão com banco de dados."""
-    connection = sqlite3.connect("identifier.sqlite")
-
-    # Habilitar suporte a chaves estrangeiras
-    cursor = connection.cursor()
-    cursor.execute("PRAGMA foreign_keys = ON;")
-    cursor.close()
 
-    yield connection
-    connection.close()
+from benchmark import compare, run_insert_benchmarks
+from bulk import bulk_load
+from events import print_action
+from streaming import iter_rows
 
 # 📌 Teste de Atualização
 def test_update_user(db_connection):
@@ -108,13 +36,14 @@ def test_join_users_orders(db_connection):
 
     print_action("Inserindo usuário", "Nome: 'Bob'")
     cursor.execute("INSERT INTO users (name) VALUES ('Bob')")
+    user_id = cursor.lastrowid
 
-    print_action("Inserindo pedido", "Usuário ID: 2, Item: 'Laptop'")
-    cursor.execute("INSERT INTO orders (user_id, item) VALUES (2, 'Laptop')")
+    print_action("Inserindo pedido", f"Usuário ID: {user_id}, Item: 'Laptop'")
+    cursor.execute("INSERT INTO orders (user_id, item) VALUES (?, 'Laptop')", (user_id,))
     db_connection.commit()
 
-    print_action("Executando consulta JOIN", "Selecionando da view user_orders")
-    cursor.execute("SELECT * FROM user_orders")
+    print_action("Executando consulta JOIN", "Selecionando da view user_orders onde name = 'Bob'")
+    cursor.execute("SELECT * FROM user_orders WHERE name = 'Bob'")
     result = cursor.fetchone()
     cursor.close()
 
@@ -156,19 +85,27 @@ def test_trigger_execution(db_connection):
     print_action("Iniciando teste de execução de TRIGGER")
     cursor = db_connection.cursor()
 
-    print_action("Inserindo pedido", "Usuário ID: 1, Item: 'Teclado'")
-    cursor.execute("INSERT INTO orders (user_id, item) VALUES (1, 'Teclado')")
+    print_action("Inserindo usuário", "Nome: 'Diana'")
+    cursor.execute("INSERT INTO users (name) VALUES ('Diana')")
+    user_id = cursor.lastrowid
+
+    # Contagem inicial, para não depender dos testes executados antes
+    cursor.execute("SELECT COUNT(*) FROM logs")
+    initial_count = cursor.fetchone()[0]
+
+    print_action("Inserindo pedido", f"Usuário ID: {user_id}, Item: 'Teclado'")
+    cursor.execute("INSERT INTO orders (user_id, item) VALUES (?, 'Teclado')", (user_id,))
     db_connection.commit()
     print_action("Trigger acionado", "Deve ter inserido um registro na tabela logs")
 
     print_action("Verificando logs", "Contando registros na tabela logs")
     cursor.execute("SELECT COUNT(*) FROM logs")
     count = cursor.fetchone()[0]
-    print_action("Resultado da contagem", f"Total de logs: {count}")
+    print_action("Resultado da contagem", f"Total de logs: {count} (antes: {initial_count})")
     cursor.close()
 
     print_action("Validando resultado")
-    assert count == 3, "O trigger deveria ter inserido um log automaticamente."
+    assert count == initial_count + 1, "O trigger deveria ter inserido um log automaticamente."
     print_action("Teste concluído com sucesso", "✅")
 
 
@@ -193,26 +130,31 @@ def test_index_performance(db_connection):
     cursor = db_connection.cursor()
 
     print_action("Inserindo dados de teste", "Adicionando 1000 registros na tabela test")
-    # Inserindo muitos dados para testar busca rápida
-    for i in range(1, 1001):
-        cursor.execute("INSERT INTO test (name) VALUES (?)", (f"User_{i}",))
-        if i % 200 == 0:  # Mostrar progresso a cada 200 inserções
-            print_action("Progresso", f"Inseridos {i} registros")
-    db_connection.commit()
-    print_action("Inserção concluída", "1000 registros inseridos com sucesso")
+    # Inserindo muitos dados para testar busca rápida, em lotes de 200 (progresso a cada lote)
+    stats = bulk_load(
+        db_connection,
+        "test",
+        ["name"],
+        ((f"User_{i}",) for i in range(1, 1001)),
+        chunk_size=200,
+        progress=lambda total: print_action("Progresso", f"Inseridos {total} registros", level="detail"),
+    )
+    print_action("Inserção concluída", f"{stats.rows} registros inseridos ({stats.rows_per_sec:,.0f} linhas/s)")
+
+    print_action("Executando consulta", "Buscando o registro 'User_500'")
+    cursor.execute("SELECT * FROM test WHERE name = 'User_500'")
+    assert cursor.fetchone() is not None, "O registro 'User_500' deveria existir."
 
-    print_action("Analisando plano de execução", "Verificando se a consulta utiliza o índice")
-    # Testando se busca usa índice
-    cursor.execute("EXPLAIN QUERY PLAN SELECT * FROM test WHERE name = 'User_500'")
-    result = cursor.fetchall()
     cursor.close()
 
-    # Verifica se o plano de execução menciona o uso do índice
-    plano_execucao = str(result)
+    print_action("Analisando plano de execução", "Verificando se a consulta utiliza o índice")
+    # Testando se busca usa índice: cada linha do plano como sqlite3.Row, acessada pelo nome da coluna
+    plano_execucao = [row["detail"] for row in iter_rows(
+        db_connection, "EXPLAIN QUERY PLAN SELECT * FROM test WHERE name = 'User_500'", row_factory="row")]
     print_action("Plano de execução obtido", f"Resultado: {plano_execucao}")
 
     print_action("Validando uso do índice")
-    assert "COVERING INDEX" in plano_execucao, "A busca deveria utilizar o índice."
+    assert any("COVERING INDEX" in detail for detail in plano_execucao), "A busca deveria utilizar o índice."
     print_action("Teste concluído com sucesso", "✅")
 
 #######################
@@ -304,52 +246,50 @@ def test_cascade_delete(db_connection):
 
     # Insere dados
     cursor.execute("INSERT INTO parents (name) VALUES ('Pai1')")
+    parent1_id = cursor.lastrowid
     cursor.execute("INSERT INTO parents (name) VALUES ('Pai2')")
-    cursor.execute("INSERT INTO children (parent_id, name) VALUES (1, 'Filho1')")
-    cursor.execute("INSERT INTO children (parent_id, name) VALUES (1, 'Filho2')")
-    cursor.execute("INSERT INTO children (parent_id, name) VALUES (2, 'Filho3')")
-    cursor.execute("INSERT INTO children (parent_id, name) VALUES (2, 'Filho4')")
+    parent2_id = cursor.lastrowid
+    cursor.execute("INSERT INTO children (parent_id, name) VALUES (?, 'Filho1')", (parent1_id,))
+    cursor.execute("INSERT INTO children (parent_id, name) VALUES (?, 'Filho2')", (parent1_id,))
+    cursor.execute("INSERT INTO children (parent_id, name) VALUES (?, 'Filho3')", (parent2_id,))
+    cursor.execute("INSERT INTO children (parent_id, name) VALUES (?, 'Filho4')", (parent2_id,))
     db_connection.commit()
 
     # Deleta o pai
-    cursor.execute("DELETE FROM parents WHERE id = 1")
+    cursor.execute("DELETE FROM parents WHERE id = ?", (parent1_id,))
     db_connection.commit()
 
     # Verifica se os filhos foram deletados
-    cursor.execute("SELECT COUNT(*) FROM children WHERE parent_id = 1")
+    cursor.execute("SELECT COUNT(*) FROM children WHERE parent_id = ?", (parent1_id,))
     count = cursor.fetchone()[0]
     cursor.close()
 
     assert count == 0, "Todos os filhos deveriam ter sido deletados em cascata."
 
 # 5. Teste de desempenho para operações em lote
-def test_batch_insert_performance(db_connection):
+def test_batch_insert_performance(db_connection, bench_config, bench_results):
     """Testa o desempenho de inserções em lote vs individuais."""
-    cursor = db_connection.cursor()
-
-
-    # Mede tempo para inserções individuais
-    start_time = time.time()
-    for i in range(100):
-        cursor.execute("INSERT INTO performance_test (value) VALUES (?)", (f"Value {i}",))
-        db_connection.commit()
-    individual_time = time.time() - start_time
-
-    # Limpa tabela
-    cursor.execute("DELETE FROM performance_test")
-    db_connection.commit()
-
-    # Mede tempo para inserção em lote
-    start_time = time.time()
-    values = [(f"Value {i}",) for i in range(100)]
-    cursor.executemany("INSERT INTO performance_test (value) VALUES (?)", values)
-    db_connection.commit()
-    batch_time = time.time() - start_time
-
-    cursor.close()
-
-    # Verifica se a inserção em lote é mais rápida
-    assert batch_time < individual_time, "Inserção em lote deveria ser mais rápida que inserções individuais."
+    results = run_insert_benchmarks(
+        db_connection,
+        bench_config["rows"],
+        rounds=bench_config["rounds"],
+        warmup=bench_config["warmup"],
+    )
+    bench_results.update(results)
+
+    # Verifica se a inserção em lote é mais rápida, comparando as medianas
+    for rows in bench_config["rows"]:
+        individual = results.get(f"individual_insert[{rows}]")
+        if individual is None:
+            continue
+        batch = results[f"batch_insert[{rows}]"]
+        assert batch["median_ms"] < individual["median_ms"], \
+            f"Inserção em lote deveria ser mais rápida que inserções individuais ({rows} linhas)."
+
+    # Verifica regressões em relação à linha de base, se informada
+    if bench_config["baseline"] is not None:
+        regressions = compare(results, bench_config["baseline"], bench_config["tolerance"])
+        assert not regressions, f"Regressões de performance detectadas: {regressions}"
 
 """
 #################################################
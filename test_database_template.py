@@ -0,0 +1,52 @@
+import os
+
+import database
+
+
+def schema_objects(connection):
+    """Lista (tipo, nome) de todos os objetos do esquema."""
+    cursor = connection.execute("SELECT type, name FROM sqlite_master ORDER BY type, name")
+    return cursor.fetchall()
+
+
+def test_restore_template_replaces_contents(tmp_path, monkeypatch):
+    """Testa se a restauração do modelo descarta os dados e recria o esquema completo."""
+    monkeypatch.setattr(database, "TEMPLATE_DIR", str(tmp_path / "templates"))
+    monkeypatch.setattr(database, "_template_image", None)
+    target = str(tmp_path / "alvo.sqlite")
+
+    connection = database.connect(target)
+    database.create_schema(connection)
+    connection.execute("INSERT INTO users (name) VALUES ('Alice')")
+    connection.execute("CREATE TABLE sobra (id INTEGER)")
+    connection.commit()
+    connection.close()
+
+    database.reset_database(target)
+
+    connection = database.connect(target)
+    count = connection.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+    objects = schema_objects(connection)
+    connection.close()
+
+    expected = database.connect(":memory:")
+    database.create_schema(expected)
+
+    assert count == 0, "O banco restaurado deveria estar vazio."
+    assert objects == schema_objects(expected), "O esquema restaurado deveria ser idêntico ao definido em SCHEMA."
+
+
+def test_template_rebuilt_only_when_schema_changes(tmp_path, monkeypatch):
+    """Testa se o modelo é reaproveitado enquanto o esquema não muda."""
+    monkeypatch.setattr(database, "TEMPLATE_DIR", str(tmp_path))
+
+    first = database.build_template()
+    mtime = (tmp_path / os.path.basename(first)).stat().st_mtime_ns
+    assert database.build_template() == first
+    assert (tmp_path / os.path.basename(first)).stat().st_mtime_ns == mtime, "O modelo não deveria ser reconstruído."
+
+    monkeypatch.setattr(database, "SCHEMA", database.SCHEMA + ["CREATE TABLE extra (id INTEGER)"])
+    second = database.build_template()
+
+    assert second != first, "Um esquema diferente deveria gerar um novo modelo."
+    assert sorted(p.name for p in tmp_path.iterdir()) == [os.path.basename(second)], "O modelo antigo deveria ser removido."
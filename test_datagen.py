@@ -0,0 +1,67 @@
+import tracemalloc
+from collections import Counter
+
+from database import connect, restore_template
+from datagen import DataGenerator, populate, zipf_keys
+
+
+def test_zipf_keys_concentrate_on_first_keys():
+    """Testa se a distribuição de Zipf concentra as ocorrências nas primeiras chaves."""
+    keys = list(zipf_keys(10_000, 1000, skew=1.0))
+    assert min(keys) >= 1 and max(keys) <= 1000
+    assert sum(1 for key in keys if key <= 100) > 6000, "10% das chaves deveriam ter a maior parte das ocorrências."
+    assert keys == list(zipf_keys(10_000, 1000, skew=1.0)), "A geração deveria ser determinística."
+
+    uniform = Counter(zipf_keys(10_000, 10, skew=0))
+    assert all(800 < count < 1200 for count in uniform.values()), "Com skew 0 a distribuição deveria ser uniforme."
+
+
+def test_generator_is_deterministic_per_table():
+    """Testa se o mesmo seed gera as mesmas linhas, em qualquer ordem de geração."""
+    first = DataGenerator(seed=1)
+    users = list(first.users(500))
+    orders = list(first.orders(500, 500))
+
+    second = DataGenerator(seed=1)
+    assert list(second.orders(500, 500)) == orders
+    assert list(second.users(500)) == users
+    assert list(DataGenerator(seed=2).users(500)) != users
+
+
+def test_generated_names_look_like_production():
+    """Testa se os nomes têm acentos, outros alfabetos e comprimentos variados."""
+    names = [name for _, name in DataGenerator().users(5000)]
+    lengths = {len(name) for name in names}
+
+    assert any(not name.isascii() for name in names)
+    assert max(lengths) - min(lengths) >= 10, "Os nomes deveriam ter comprimentos variados."
+    assert Counter(name.split(" ")[-1] for name in names).most_common(1)[0][0] == "Silva"
+    assert len({login for login, in DataGenerator().logins(5000)}) > 1000
+
+
+def test_populate_streams_in_bounded_memory():
+    """Testa a carga de todas as tabelas com chaves válidas e memória independente do volume."""
+    connection = connect(":memory:")
+    restore_template(connection)
+
+    # Com --footprint o rastreamento já está ativo e o pico pertence à medição do
+    # teste: sem reset_peak(), o pico só conta se a carga o ultrapassar
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    baseline, previous_peak = tracemalloc.get_traced_memory()
+    populate(connection, users=1000, orders=50_000, parents=100, children=1000, test=500, chunk_size=5000)
+    current, peak = tracemalloc.get_traced_memory()
+    if not tracing:
+        tracemalloc.stop()
+    peak = (peak if peak > previous_peak else current) - baseline
+
+    counts = connection.execute(
+        "SELECT (SELECT COUNT(*) FROM users), (SELECT COUNT(*) FROM orders), (SELECT COUNT(*) FROM parents), "
+        "(SELECT COUNT(*) FROM children), (SELECT COUNT(*) FROM test), (SELECT COUNT(*) FROM logs)").fetchone()
+    orphans = connection.execute("PRAGMA foreign_key_check").fetchall()
+    connection.close()
+
+    assert counts == (1000, 50_000, 100, 1000, 500, 50_000)
+    assert orphans == []
+    assert peak < 10 * 1024 * 1024, f"A carga deveria usar memória limitada ao lote, usou {peak / 1e6:.1f} MB."
@@ -0,0 +1,63 @@
+import io
+import json
+
+import events
+from events import EventLog, measure_overhead, print_action
+
+
+def test_verbosity_controls_console_output():
+    """Testa se cada verbosidade imprime só os eventos do seu nível, registrando todos."""
+    for verbosity, expected in (("quiet", []), ("normal", ["Inserindo"]), ("verbose", ["Inserindo", "Progresso"])):
+        stream = io.StringIO()
+        log = EventLog(verbosity=verbosity, stream=stream)
+        log.emit("Inserindo", "Nome: 'Alice'")
+        log.emit("Progresso", "Inseridos 1000 registros", level="detail")
+        assert [action for action in ("Inserindo", "Progresso") if action in stream.getvalue()] == expected
+        assert log.emitted == 2
+
+
+def test_jsonl_keeps_every_event_with_its_test(tmp_path):
+    """Testa se o arquivo JSON lines recebe todos os eventos, na ordem e com o teste que os emitiu."""
+    path = tmp_path / "eventos.jsonl"
+    log = EventLog(str(path), verbosity="quiet", batch_size=2)
+    previous = events.install(log)
+    try:
+        log.start_test("test_modulo.py::test_a")
+        for number in range(5):
+            print_action("Inserindo usuário", f"Cliente {number}")
+        log.end_test()
+        print_action("Fora de teste", level="detail")
+    finally:
+        events.install(previous)
+        log.close()
+
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [record["details"] for record in records[:5]] == [f"Cliente {number}" for number in range(5)]
+    assert {record["test"] for record in records[:5]} == {"test_modulo.py::test_a"}
+    assert records[5] == {"ts": records[5]["ts"], "test": None, "level": "detail", "action": "Fora de teste",
+                          "details": ""}
+
+
+def test_recent_events_are_kept_per_test():
+    """Testa se o relatório de falhas mostra só os últimos eventos do teste atual."""
+    log = EventLog(verbosity="quiet", recent=3)
+    log.start_test("test_a")
+    log.emit("Primeira ação")
+    log.start_test("test_b")
+    for number in range(5):
+        log.emit("Ação", str(number))
+    lines = log.format_recent().splitlines()
+    assert len(lines) == 3
+    assert lines[-1].endswith("[step] Ação - 4")
+    assert "Primeira" not in log.format_recent()
+
+
+def test_quiet_logging_overhead(tmp_path, bench_results):
+    """Testa se registrar em silêncio custa menos que imprimir cada ação e se o JSON lines recebe todas elas."""
+    results = measure_overhead(str(tmp_path), events=5000, rounds=3)
+    for mode, summary in results.items():
+        bench_results[f"event_log_{mode}[5000]"] = summary
+    assert results["quiet"]["median_ms"] < results["print"]["median_ms"]
+    # O custo com JSON lines divide a CPU com a thread de gravação e só é registrado
+    with open(tmp_path / "eventos.jsonl", encoding="utf-8") as output:
+        assert sum(1 for _ in output) == 5000 * (3 + 1)
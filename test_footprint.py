@@ -0,0 +1,70 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from footprint import (MB, SQLITE_STATUS_MEMORY_USED, FootprintTracker, compact, file_footprint, set_vacuum_mode,
+                       sqlite_status)
+
+
+def fill_and_delete(path):
+    """Grava e apaga dados suficientes para deixar páginas livres no arquivo."""
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE IF NOT EXISTS lixo (valor TEXT)")
+    connection.executemany("INSERT INTO lixo VALUES (?)", (("x" * 500,) for _ in range(2000)))
+    connection.commit()
+    connection.execute("DELETE FROM lixo")
+    connection.commit()
+    connection.close()
+
+
+def test_tracker_measures_python_and_sqlite_memory():
+    """Testa a medição do pico de memória e a verificação dos limites."""
+    tracker = FootprintTracker(python_mb=1)
+    tracker.start()
+    data = bytearray(4 * MB)
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE t (valor TEXT)")
+    connection.executemany("INSERT INTO t VALUES (?)", (("y" * 100,) for _ in range(20_000)))
+    stats = tracker.stop("exemplo")
+    connection.close()
+    tracker.close()
+    del data
+
+    assert stats["python_peak_bytes"] >= 4 * MB
+    assert tracker.violations(stats) and "python_peak_bytes" in tracker.violations(stats)[0]
+    if sqlite_status(SQLITE_STATUS_MEMORY_USED) is not None:
+        assert stats["sqlite_peak_bytes"] > 1 * MB
+
+
+@pytest.mark.parametrize("mode", ["off", "full", "incremental"])
+def test_vacuum_modes_reclaim_free_pages(tmp_path, mode):
+    """Testa se os modos de auto_vacuum devolvem as páginas livres do arquivo."""
+    path = str(tmp_path / f"{mode}.sqlite")
+    fill_and_delete(path)
+    if mode != "off":
+        set_vacuum_mode(path, mode)
+        fill_and_delete(path)
+    if mode == "incremental":
+        assert file_footprint(path)["freelist_count"] > 0
+        compact(path, incremental=True)
+
+    footprint = file_footprint(path)
+    if mode == "off":
+        assert footprint["freelist_count"] > 0
+    else:
+        assert footprint["freelist_count"] == 0
+        assert footprint["db_bytes"] < 100 * 1024
+
+
+def test_budget_fails_test():
+    """Testa se um teste que ultrapassa o limite de memória é reprovado."""
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "--db-isolation=test",
+         "--budget-python-mb=0.000001", "test_database.py::test_update_user"],
+        capture_output=True, text=True, timeout=120, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    assert result.returncode == 1
+    assert "excede o limite" in result.stdout
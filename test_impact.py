@@ -0,0 +1,62 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+from database import template_image
+from impact import WHOLE_SCHEMA, ImpactAnalyzer, StatementLog, module_digest, schema_fingerprints
+
+
+def test_analyzer_follows_views_triggers_and_cascades():
+    """Testa se o analisador inclui as tabelas alcançadas por views, triggers, chaves estrangeiras e cascatas."""
+    analyzer = ImpactAnalyzer()
+    assert analyzer.objects("SELECT item FROM user_orders WHERE name = 'Ana'") == {"user_orders", "users", "orders"}
+    assert analyzer.objects("INSERT INTO orders (user_id, item) VALUES (1, 'Livro')") == {"orders", "logs", "users"}
+    assert analyzer.objects("DELETE FROM parents WHERE id = 1") == {"parents", "children"}
+    assert analyzer.objects("EXPLAIN QUERY PLAN SELECT id FROM test WHERE name = 'a'") == {"test"}
+    assert analyzer.objects("SELECT * FROM tabela_do_teste") == {WHOLE_SCHEMA}
+
+
+def test_statement_log_keeps_one_example_per_statement():
+    """Testa se o registro guarda um exemplo por instrução normalizada e ignora os comentários de trigger."""
+    log = StatementLog()
+    for number in range(3):
+        log.record(f"INSERT INTO users (name) VALUES ('Cliente {number}')")
+    log.record("-- TRIGGER order_insert")
+    assert list(log.statements.values()) == ["INSERT INTO users (name) VALUES ('Cliente 0')"]
+
+
+def test_index_changes_only_its_table_fingerprint():
+    """Testa se criar um índice altera só a impressão digital da sua tabela e a do esquema inteiro."""
+    connection = sqlite3.connect(":memory:")
+    connection.deserialize(template_image())
+    before = schema_fingerprints(connection)
+    connection.execute("CREATE INDEX idx_orders_item ON orders(item)")
+    after = schema_fingerprints(connection)
+    connection.close()
+
+    assert {name for name in before if before[name] != after[name]} == {"orders", WHOLE_SCHEMA}
+
+
+def test_module_digest_ignores_comments_schema_and_other_tests(tmp_path):
+    """Testa se o resumo do módulo ignora comentários, o SCHEMA e mudanças em outros testes."""
+    path = tmp_path / "modulo.py"
+    path.write_text("SCHEMA = ['CREATE TABLE a (id)']\n\ndef test_a():\n    pass\n\ndef test_b():\n    pass\n")
+    digest = module_digest(str(path), "test_a")
+
+    path.write_text("# comentário\nSCHEMA = ['CREATE TABLE b (id)']\n\ndef test_a():\n    pass\n\n"
+                    "def test_b():\n    assert False\n")
+    assert module_digest(str(path), "test_a") == digest
+    assert module_digest(str(path), "test_b") != module_digest(str(path), "test_a")
+
+
+def test_changed_only_skips_unaffected_tests(tmp_path):
+    """Na segunda execução, sem mudanças, o teste que passou não é executado de novo."""
+    command = [sys.executable, "-m", "pytest", "-q", "--changed-only", "-o", f"cache_dir={tmp_path}",
+               "--db-isolation=test", "test_database.py::test_update_user"]
+    directory = os.path.dirname(os.path.abspath(__file__))
+    first = subprocess.run(command, capture_output=True, text=True, timeout=120, cwd=directory)
+    second = subprocess.run(command, capture_output=True, text=True, timeout=120, cwd=directory)
+
+    assert "1 passed" in first.stdout
+    assert "1 deselected" in second.stdout
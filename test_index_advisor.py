@@ -0,0 +1,59 @@
+from database import connect, restore_template
+from index_advisor import Workload, advise, candidate_indexes, prepare_copy
+
+SUITE_QUERIES = [
+    "SELECT name FROM users WHERE name = 'Alicia'",
+    "UPDATE users SET name = 'Alicia' WHERE name = 'Alice'",
+    "SELECT * FROM user_orders WHERE name = 'Bob'",
+    "SELECT * FROM test WHERE name = 'User_500'",
+    "DELETE FROM parents WHERE id = 1",
+    "INSERT INTO users (name) VALUES ('Carol')",
+]
+
+
+def suite_workload():
+    workload = Workload()
+    for sql in SUITE_QUERIES + SUITE_QUERIES[:1]:
+        workload.record(sql)
+    return workload
+
+
+def test_workload_groups_and_merges(tmp_path):
+    """Testa o agrupamento das instruções pela forma normalizada e a mescla de arquivos."""
+    workload = suite_workload()
+    assert "INSERT INTO users (name) VALUES (?)" not in workload.statements
+    assert workload.statements["SELECT name FROM users WHERE name = ?"]["count"] == 2
+
+    paths = [str(tmp_path / "gw0.json"), str(tmp_path / "gw1.json")]
+    for path in paths:
+        workload.dump(path)
+    merged = Workload.load(*paths)
+    assert merged.statements["SELECT name FROM users WHERE name = ?"]["count"] == 4
+
+
+def test_candidates_come_from_scans_on_filtered_columns():
+    """Testa se só colunas filtradas de tabelas percorridas por inteiro viram candidatas."""
+    connection = connect(":memory:")
+    restore_template(connection)
+    candidates = candidate_indexes(connection, suite_workload())
+    connection.close()
+
+    assert set(candidates) == {("users", "name"), ("orders", "user_id")}
+    assert len(candidates[("users", "name")]) == 2
+    assert candidates[("orders", "user_id")] == ["SELECT * FROM user_orders WHERE name = ?"]
+
+
+def test_advisor_measures_candidates_on_copy(tmp_path):
+    """Testa a avaliação dos índices em uma cópia com dados sintéticos."""
+    connection = prepare_copy(str(tmp_path / "copia.sqlite"), users=2000, orders=20_000)
+    results = {(result["table"], result["column"]): result
+               for result in advise(connection, suite_workload(), rounds=3, warmup=1, write_rows=200)}
+    indexes = connection.execute("SELECT name FROM sqlite_master WHERE name LIKE 'idx_advisor%'").fetchall()
+    connection.close()
+
+    foreign_key = results[("orders", "user_id")]
+    assert foreign_key["uses_index"] and foreign_key["recommended"]
+    assert foreign_key["speedup"] > 1
+    assert foreign_key["size_bytes"] > 0
+    assert foreign_key["ddl"] == "CREATE INDEX idx_orders_user_id ON orders(user_id)"
+    assert indexes == [], "Os índices testados deveriam ser removidos da cópia."
@@ -0,0 +1,146 @@
+import threading
+import time
+
+import pytest
+
+from database import connect, restore_template
+from pool import ConnectionPool, PoolTimeout, measure_connection_overhead
+
+
+@pytest.fixture
+def pool_db(tmp_path):
+    """Arquivo de banco com o esquema criado, para ser aberto pelo pool."""
+    path = str(tmp_path / "pool.sqlite")
+    connection = connect(path)
+    restore_template(connection)
+    connection.close()
+    return path
+
+
+def test_pool_reuses_connection_and_resets_state(pool_db):
+    """Testa se a conexão devolvida volta ao pool limpa e é reaproveitada."""
+    pool = ConnectionPool(pool_db, size=1)
+    connection = pool.acquire()
+    connection.execute("INSERT INTO users (name) VALUES ('Pendente')")
+    connection.row_factory = lambda cursor, row: row[0]
+    pool.release(connection)
+
+    again = pool.acquire()
+    assert again is connection
+    assert not again.in_transaction
+    assert again.execute("SELECT COUNT(*) FROM users").fetchone() == (0,)
+    assert again.execute("PRAGMA foreign_keys").fetchone() == (1,)
+    pool.release(again)
+    pool.close()
+
+    assert pool.stats == {"created": 1, "reused": 1, "discarded": 0}
+
+
+def test_pool_replaces_broken_connection(pool_db):
+    """Testa se uma conexão fechada pelo teste é descartada e substituída."""
+    pool = ConnectionPool(pool_db, size=1)
+    with pool.connection() as connection:
+        connection.close()
+
+    with pool.connection() as replacement:
+        assert replacement is not connection
+        assert replacement.execute("SELECT 1").fetchone() == (1,)
+    pool.close()
+
+    assert pool.stats["discarded"] == 1
+
+
+def test_pool_replacement_keeps_slot_from_waiters(pool_db):
+    """Testa se a substituta de uma conexão livre com defeito não divide a vaga com uma thread já em espera."""
+    checking, proceed = threading.Event(), threading.Event()
+
+    class CheckingPool(ConnectionPool):
+        def _healthy(self, connection):
+            checking.set()
+            proceed.wait()
+            return ConnectionPool._healthy(connection)
+
+        def _discard(self, connection):
+            # Descarte lento: alarga a janela em que outra thread poderia tomar a vaga liberada
+            super()._discard(connection)
+            time.sleep(0.05)
+
+    pool = CheckingPool(pool_db, size=1)
+    broken = pool.acquire()
+    pool.release(broken)
+    broken.close()
+    acquired = {}
+
+    def first():
+        acquired["first"] = pool.acquire()
+
+    def waiter():
+        try:
+            acquired["waiter"] = pool.acquire(timeout=0.3)
+        except PoolTimeout as error:
+            acquired["waiter"] = error
+
+    first_thread = threading.Thread(target=first)
+    first_thread.start()
+    checking.wait()
+    waiter_thread = threading.Thread(target=waiter)
+    waiter_thread.start()
+    # Dá tempo à segunda thread de encontrar o pool cheio e esperar
+    time.sleep(0.05)
+    proceed.set()
+    first_thread.join()
+    waiter_thread.join()
+
+    assert isinstance(acquired["waiter"], PoolTimeout), "A thread em espera não deveria ter recebido uma conexão."
+    assert pool.stats["created"] == 2 and pool.stats["discarded"] == 1
+    pool.release(acquired["first"])
+    pool.close()
+
+
+def test_pool_limits_connections_across_threads(pool_db):
+    """Testa se várias threads compartilham o pool sem ultrapassar o tamanho configurado."""
+    pool = ConnectionPool(pool_db, size=2)
+    in_use = []
+    peak = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(50):
+            with pool.connection() as connection:
+                with lock:
+                    in_use.append(connection)
+                    peak.append(len(in_use))
+                connection.execute("SELECT COUNT(*) FROM users").fetchone()
+                with lock:
+                    in_use.remove(connection)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) <= 2
+    assert pool.stats["created"] <= 2
+
+    held = [pool.acquire(), pool.acquire()]
+    with pytest.raises(PoolTimeout):
+        pool.acquire(timeout=0.05)
+    for connection in held:
+        pool.release(connection)
+    pool.close()
+
+
+def test_pool_overhead(pool_db, bench_config, bench_results):
+    """Mede o custo de conexão por teste com e sem o pool, simulando milhares de testes."""
+    tests, _ = bench_config["scale_sizes"][0]
+    results = measure_connection_overhead(pool_db, tests, rounds=bench_config["rounds"],
+                                          warmup=bench_config["warmup"])
+    report = [f"\n{'variante':<10}{'mediana (ms)':>13}{'por teste (µs)':>16}"]
+    for variant, summary in results.items():
+        bench_results[f"connection_{variant}[{tests}]"] = summary
+        report.append(f"{variant:<10}{summary['median_ms']:>13.3f}{summary['per_test_us']:>16.1f}")
+    print("\n".join(report))
+
+    assert results["pool"]["median_ms"] < results["sem_pool"]["median_ms"], \
+        "Reaproveitar conexões deveria custar menos que abrir uma por teste."
@@ -0,0 +1,53 @@
+import json
+
+from database import connect, restore_template
+from profiler import PROGRESS_INTERVAL, ProfiledConnection, Profiler
+
+
+def profiled_connection(profiler, test_id="teste"):
+    connection = connect(":memory:")
+    restore_template(connection)
+    return ProfiledConnection(connection, profiler, test_id)
+
+
+def test_profiler_counts_rows_and_vm_steps():
+    """Testa a contagem de linhas (inclusive as gravadas pelo trigger) e de passos da VM."""
+    profiler = Profiler()
+    connection = profiled_connection(profiler)
+    cursor = connection.cursor()
+
+    cursor.execute("INSERT INTO users (name) VALUES ('Alice')")
+    user_id = cursor.lastrowid
+    cursor.execute("INSERT INTO orders (user_id, item) VALUES (?, 'Teclado')", (user_id,))
+    cursor.executemany("INSERT INTO test (name) VALUES (?)", ((f"User_{i}",) for i in range(2000)))
+    connection.commit()
+    rows = cursor.execute("SELECT * FROM test WHERE name LIKE '%_1%'").fetchall()
+    connection.detach()
+
+    statements = profiler.tests["teste"]
+    assert statements["INSERT INTO orders (user_id, item) VALUES (?, ?)"].rows == 2, \
+        "O pedido e o log gravado pelo trigger deveriam ser contados."
+    assert statements["INSERT INTO test (name) VALUES (?)"].rows == 2000
+    select = statements["SELECT * FROM test WHERE name LIKE ?"]
+    assert select.calls == 1 and select.rows == len(rows)
+    assert select.vm_steps >= PROGRESS_INTERVAL, "Uma varredura de 2000 linhas deveria executar muitos passos da VM."
+    assert statements["COMMIT"].calls == 1
+
+
+def test_profiler_report_and_dump(tmp_path):
+    """Testa o ranking das instruções mais lentas e o arquivo JSON gerado."""
+    profiler = Profiler()
+    for test_id, rows in [("rapido", 10), ("lento", 5000)]:
+        connection = profiled_connection(profiler, test_id)
+        connection.executemany("INSERT INTO test (name) VALUES (?)", ((f"User_{i}",) for i in range(rows)))
+        connection.detach()
+
+    slowest = profiler.slowest(1)
+    path = tmp_path / "perfil.json"
+    profiler.dump(path)
+    document = json.loads(path.read_text(encoding="utf-8"))
+
+    assert [test_id for test_id, _ in slowest] == ["lento"]
+    assert sorted(document) == ["lento", "rapido"]
+    assert document["lento"][0]["sql"] == "INSERT INTO test (name) VALUES (?)"
+    assert document["lento"][0]["rows"] == 5000
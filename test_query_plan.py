@@ -0,0 +1,56 @@
+from database import connect, restore_template
+from query_plan import PlanRecorder, PlanStore, compare_plans, is_explainable, normalize_sql
+
+
+def test_normalize_sql_replaces_literals():
+    """Testa se a mesma consulta com valores diferentes gera a mesma chave."""
+    first = normalize_sql("SELECT * FROM test  WHERE name = 'User_500' AND id > 10;")
+    second = normalize_sql("SELECT * FROM test WHERE name = 'O''Brien' AND id > 7")
+    assert first == second == "SELECT * FROM test WHERE name = ? AND id > ?"
+
+
+def test_normalize_sql_folds_keyword_case():
+    """Testa se palavras-chave em minúsculas geram a mesma chave, sem alterar identificadores entre aspas."""
+    assert normalize_sql("select * from users where id = 1") == "SELECT * FROM users WHERE id = ?"
+    assert normalize_sql('SELECT "order" FROM users') == 'SELECT "order" FROM users'
+    assert is_explainable("INSERT INTO users (name)\nSELECT name FROM test")
+    assert not is_explainable("INSERT INTO users (name) VALUES ('Selecionado')")
+
+
+def test_compare_plans_detects_degradation():
+    """Testa a detecção de SCAN novo e de índice perdido."""
+    golden = ["SEARCH test USING COVERING INDEX idx_name (name=?)"]
+    assert compare_plans(golden, golden) == []
+    assert compare_plans(golden, ["SCAN test"]) == [
+        "passou a percorrer a tabela inteira (SCAN test)",
+        "deixou de usar o índice idx_name",
+    ]
+    # Um SCAN que já existia na referência não é regressão
+    assert compare_plans(["SCAN users"], ["SCAN users"]) == []
+
+
+def test_recorder_and_store_catch_dropped_index(tmp_path):
+    """Testa o ciclo completo: gravar a referência, remover o índice e detectar a regressão."""
+    path = str(tmp_path / "planos.json")
+    connection = connect(":memory:")
+    restore_template(connection)
+
+    recorder = PlanRecorder(connection)
+    connection.execute("SELECT * FROM test WHERE name = 'User_1'").fetchall()
+    connection.execute("INSERT INTO users (name) VALUES ('Alice')")
+    store = PlanStore(path, update=True)
+    store.check(recorder.plans())
+    store.save()
+
+    assert list(recorder.statements) == ["SELECT * FROM test WHERE name = ?"], "INSERT ... VALUES não tem plano relevante."
+
+    connection.execute("DROP INDEX idx_name")
+    recorder = PlanRecorder(connection)
+    connection.execute("SELECT * FROM test WHERE name = 'User_2'").fetchall()
+    failures = PlanStore(path).check(recorder.plans())
+    connection.close()
+
+    assert failures == {"SELECT * FROM test WHERE name = ?": [
+        "passou a percorrer a tabela inteira (SCAN test)",
+        "deixou de usar o índice idx_name",
+    ]}
@@ -0,0 +1,108 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import run_testes
+from run_testes import resolve_suites, run_cli, run_parallel_sessions
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_script(*args):
+    return subprocess.run([sys.executable, "run_testes.py", *args], capture_output=True, text=True,
+                          timeout=120, cwd=DIRECTORY)
+
+
+class FakeProcess:
+    """Processo que termina na hora, sem gravar resumo, para inspecionar os comandos montados."""
+
+    def __init__(self, command, **kwargs):
+        self.command = command
+
+    def wait(self):
+        return 0
+
+
+@pytest.fixture
+def without_xdist(monkeypatch):
+    """Simula a ausência do pytest-xdist e registra os comandos das sessões paralelas."""
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(importlib.util, "find_spec", lambda name, *args: None if name == "xdist" else find_spec(name, *args))
+    commands = []
+
+    def popen(command, **kwargs):
+        commands.append(command)
+        return FakeProcess(command, **kwargs)
+
+    monkeypatch.setattr(run_testes.subprocess, "Popen", popen)
+    return commands
+
+
+def test_resolve_suites():
+    """Testa a conversão de suítes, nomes de testes e caminhos em alvos do pytest, sem repetições."""
+    assert resolve_suites(["like", "test_like_query", "transaction"]) == [
+        "test_database.py::test_like_query", "test_database.py::test_transaction_rollback"]
+    assert resolve_suites(["scale"])[0] == "test_scaling.py"
+    assert resolve_suites(["all"]) == ["."]
+    assert resolve_suites(["test_pool.py::test_pool_overhead"]) == ["test_pool.py::test_pool_overhead"]
+    with pytest.raises(ValueError, match="Suíte desconhecida: inexistente"):
+        resolve_suites(["inexistente"])
+
+
+def test_unknown_suite_or_backend_is_usage_error(capsys):
+    """Testa se suítes e destinos desconhecidos terminam com o código de uso incorreto (4)."""
+    assert run_cli(["--suite", "inexistente"]) == pytest.ExitCode.USAGE_ERROR == 4
+    assert run_cli(["--suite", "like", "--backends", "nuvem"]) == 4
+    assert "Destino desconhecido: nuvem" in capsys.readouterr().err
+
+
+def test_json_summary_and_exit_codes(tmp_path):
+    """Testa o resumo JSON de uma execução e a propagação dos códigos de saída do pytest."""
+    output = tmp_path / "resumo.json"
+    result = run_script("--suite", "like,transaction", "--format", "json", "--output", str(output),
+                        "--", "-p", "no:cacheprovider", "--db-isolation=test")
+    summary = json.loads(output.read_text(encoding="utf-8"))
+
+    assert result.returncode == 0
+    assert summary["exit_code"] == 0 and summary["totals"] == {"passed": 2}
+    assert summary["targets"] == ["test_database.py::test_like_query", "test_database.py::test_transaction_rollback"]
+    assert {test["nodeid"] for test in summary["tests"]} == set(summary["targets"])
+
+    assert run_script("--suite", "inexistente").returncode == 4
+    # Nenhum teste selecionado: o pytest termina com o código 5
+    assert run_script("--suite", "like", "--", "-p", "no:cacheprovider", "--db-isolation=test",
+                      "-k", "nenhum").returncode == 5
+
+
+def test_jobs_without_xdist_splits_targets(without_xdist, tmp_path):
+    """Testa se, sem o pytest-xdist, --jobs divide os alvos entre sessões com bancos isolados."""
+    output = str(tmp_path / "resumo.json")
+    assert run_cli(["--suite", "like,transaction,cascade", "--jobs", "2", "--format", "json", "--output", output]) == 0
+
+    suites = [command[command.index("--suite") + 1].split(",") for command in without_xdist]
+    assert suites == [["test_database.py::test_like_query", "test_database.py::test_cascade_delete"],
+                      ["test_database.py::test_transaction_rollback"]]
+    assert all("--db-isolation=test" in command for command in without_xdist)
+
+
+def test_parallel_sessions_keep_requested_isolation(without_xdist):
+    """Testa se as sessões paralelas respeitam o modo de isolamento informado pelo chamador."""
+    run_parallel_sessions(["a.py", "b.py"], 4, ["--db-isolation=rollback"])
+
+    assert len(without_xdist) == 2
+    assert all(command.count("--db-isolation=rollback") == 1 and "--db-isolation=test" not in command
+               for command in without_xdist)
+
+
+def test_parallel_sessions_merge_results():
+    """Testa se os resultados das sessões paralelas são reunidos em um só resumo."""
+    exit_code, tests = run_parallel_sessions(
+        ["test_database.py::test_like_query", "test_database.py::test_update_user"], 2, ["-p", "no:cacheprovider"])
+
+    assert exit_code == 0
+    assert sorted(test["nodeid"] for test in tests) == ["test_database.py::test_like_query",
+                                                        "test_database.py::test_update_user"]
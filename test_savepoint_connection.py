@@ -0,0 +1,48 @@
+import sqlite3
+
+import pytest
+
+from database import SavepointConnection, connect, restore_template
+
+
+@pytest.fixture
+def raw_connection():
+    """Conexão em memória com o esquema, sem transação externa."""
+    connection = connect(":memory:")
+    restore_template(connection)
+    yield connection
+    connection.close()
+
+
+def count_users(connection):
+    return connection.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+
+def test_outer_transaction_discards_commits(raw_connection):
+    """Testa se os dados confirmados pelo teste são descartados ao final."""
+    connection = SavepointConnection(raw_connection)
+    connection.execute("INSERT INTO users (name) VALUES ('Alice')")
+    connection.commit()
+    assert count_users(connection) == 1, "O commit deveria tornar o dado visível durante o teste."
+
+    connection.close()
+    assert count_users(raw_connection) == 0, "Nada deveria permanecer após o fim do teste."
+
+
+def test_rollback_undoes_only_since_last_commit(raw_connection):
+    """Testa se rollback() preserva o que foi confirmado antes dele."""
+    connection = SavepointConnection(raw_connection)
+    cursor = connection.cursor()
+    cursor.execute("INSERT INTO users (name) VALUES ('Marcelo')")
+    connection.commit()
+
+    with pytest.raises(sqlite3.IntegrityError):
+        cursor.execute("INSERT INTO orders (user_id, item) VALUES (99, 'Monitor')")
+    cursor.execute("INSERT INTO users (name) VALUES ('Temporário')")
+    connection.rollback()
+
+    names = [row[0] for row in cursor.execute("SELECT name FROM users")]
+    cursor.close()
+    connection.close()
+
+    assert names == ["Marcelo"], "Apenas a inserção confirmada deveria permanecer até o fim do teste."
@@ -0,0 +1,40 @@
+from database import connect, restore_template
+from scaling import (ORDERS_USER_INDEX, format_report, join_scaling_report, measure_view, parse_sizes,
+                     populate_users_orders, view_results)
+
+
+def test_parse_sizes():
+    """Testa a leitura de --scale-sizes em pares (usuários, pedidos), aceitando notação científica."""
+    assert parse_sizes("1000:10000,1e6:1e7") == [(1000, 10000), (1_000_000, 10_000_000)]
+
+
+def test_user_orders_view_scaling(tmp_path, bench_config, bench_results):
+    """Mede a view user_orders em vários tamanhos, com e sem índice em orders.user_id."""
+    results = {}
+    for users, orders in bench_config["scale_sizes"]:
+        connection = connect(str(tmp_path / f"escala_{users}_{orders}.sqlite"))
+        restore_template(connection)
+        populate_users_orders(connection, users, orders, skew=bench_config["scale_skew"])
+
+        expected = view_results(connection)
+        for variant in ("sem_indice", "com_indice"):
+            if variant == "com_indice":
+                connection.execute(ORDERS_USER_INDEX)
+                connection.execute("ANALYZE")
+                connection.commit()
+                assert view_results(connection) == expected, "O índice não deveria alterar os resultados da view."
+
+            for query, summary in measure_view(connection, rounds=bench_config["rounds"],
+                                               warmup=bench_config["warmup"]).items():
+                results[(users, orders, variant, query)] = summary
+                bench_results[f"user_orders_{query}_{variant}[{users}:{orders}]"] = summary
+
+        plan = str(connection.execute("EXPLAIN QUERY PLAN SELECT item FROM user_orders WHERE name = 'Cliente 1'").fetchall())
+        connection.close()
+        assert "idx_orders_user_id" in plan, "Com o índice, o JOIN deveria buscar os pedidos pelo índice."
+
+    lines = join_scaling_report(results)
+    print("\n" + format_report(lines))
+
+    assert len(lines) == len(bench_config["scale_sizes"]) * 4
+    assert all(line["median_ms"] > 0 for line in lines)
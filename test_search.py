@@ -0,0 +1,95 @@
+import pytest
+
+from benchmark import measure
+from bulk import bulk_load
+from datagen import DataGenerator
+from database import connect, restore_template
+from search import count_users, fts5_available, install_name_search, search_users
+
+pytestmark = pytest.mark.skipif(not fts5_available(), reason="SQLite sem FTS5/trigram")
+
+PATTERNS = ["%Silva", "%silva%", "João%", "%ão S%", "%Conceição%", "%a", "%ller", "%Nguyễn%"]
+
+
+def random_names(count, seed=7):
+    return ((name,) for name in DataGenerator(seed).names(count))
+
+
+@pytest.fixture
+def search_db():
+    """Banco em memória com o esquema e o índice de busca instalado."""
+    connection = connect(":memory:")
+    restore_template(connection)
+    install_name_search(connection)
+    yield connection
+    connection.close()
+
+
+def like(connection, pattern):
+    return connection.execute("SELECT id, name FROM users WHERE name LIKE ? ORDER BY id", (pattern,)).fetchall()
+
+
+def test_search_matches_like(search_db):
+    """Testa se a busca indexada retorna exatamente o mesmo que o LIKE."""
+    usuarios = ["João Silva", "Maria Silva", "José Souza", "Ana Santos"]
+    search_db.executemany("INSERT INTO users (name) VALUES (?)", [(usuario,) for usuario in usuarios])
+    bulk_load(search_db, "users", ["name"], random_names(2000))
+
+    assert count_users(search_db, "%Silva") == search_db.execute(
+        "SELECT COUNT(*) FROM users WHERE name LIKE '%Silva'").fetchone()[0]
+    for pattern in PATTERNS:
+        assert search_users(search_db, pattern) == like(search_db, pattern), f"Resultado diferente para {pattern!r}"
+
+
+def test_search_stays_in_sync(search_db):
+    """Testa a sincronização do índice em inserções, atualizações e exclusões."""
+    cursor = search_db.cursor()
+    cursor.execute("INSERT INTO users (name) VALUES ('João Silva')")
+    user_id = cursor.lastrowid
+    cursor.execute("INSERT INTO users (name) VALUES ('Maria Souza')")
+    assert search_users(search_db, "%Silva") == [(user_id, "João Silva")]
+
+    cursor.execute("UPDATE users SET name = 'João Santos' WHERE id = ?", (user_id,))
+    assert search_users(search_db, "%Silva") == []
+    assert search_users(search_db, "%Santos") == [(user_id, "João Santos")]
+
+    cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
+    assert search_users(search_db, "%Santos") == []
+    assert search_users(search_db, "%Souza") == like(search_db, "%Souza")
+
+
+def test_install_indexes_existing_rows():
+    """Testa se a instalação indexa usuários gravados antes dela."""
+    connection = connect(":memory:")
+    restore_template(connection)
+    bulk_load(connection, "users", ["name"], random_names(500))
+    install_name_search(connection)
+    assert search_users(connection, "%Silva") == like(connection, "%Silva")
+    connection.close()
+
+
+def test_search_latency(search_db, bench_config, bench_results):
+    """
+    Compara a latência do LIKE com curinga inicial e da busca indexada, no maior
+    tamanho de --scale-sizes, para o sobrenome mais comum e para um raro.
+    """
+    users, _ = bench_config["scale_sizes"][-1]
+    bulk_load(search_db, "users", ["name"], random_names(users), chunk_size=50_000)
+    search_db.executemany("INSERT INTO users (name) VALUES (?)", [("Tiago Brilhante",)] * 10)
+    search_db.commit()
+
+    plan = str(search_db.execute("EXPLAIN QUERY PLAN SELECT COUNT(*) FROM users_fts WHERE name LIKE '%Silva'").fetchall())
+    assert "VIRTUAL TABLE INDEX" in plan, "A busca deveria usar o índice trigram."
+
+    report = [f"\n{'consulta':<14}{'padrão':<13}{'usuários':>10}{'mediana (ms)':>14}{'p95 (ms)':>10}"]
+    for pattern in ("%Silva", "%Brilhante"):
+        assert count_users(search_db, pattern) == search_db.execute(
+            "SELECT COUNT(*) FROM users WHERE name LIKE ?", (pattern,)).fetchone()[0]
+        for name, function in [
+            ("like_scan", lambda: search_db.execute("SELECT COUNT(*) FROM users WHERE name LIKE ?", (pattern,)).fetchone()),
+            ("fts_trigram", lambda: count_users(search_db, pattern)),
+        ]:
+            summary = measure(function, rounds=bench_config["rounds"], warmup=bench_config["warmup"], rows=users)
+            bench_results[f"users_name_search_{name}_{pattern.strip('%')}[{users}]"] = summary
+            report.append(f"{name:<14}{pattern:<13}{users:>10}{summary['median_ms']:>14.3f}{summary['p95_ms']:>10.3f}")
+    print("\n".join(report))
@@ -0,0 +1,87 @@
+import sqlite3
+import tracemalloc
+
+import pytest
+
+from database import connect, restore_template
+from scaling import populate_users_orders
+from streaming import ResultDigest, assert_same_results, consume, digest_query, iter_batches, iter_rows
+
+
+@pytest.fixture
+def numbers_db():
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE numbers (n INTEGER, label TEXT)")
+    connection.executemany("INSERT INTO numbers VALUES (?, ?)", ((n, f"N{n % 3}") for n in range(10)))
+    yield connection
+    connection.close()
+
+
+def test_batches_and_row_factories(numbers_db):
+    """Testa a leitura em lotes com fetchmany() e os formatos de linha tuple, row e dict."""
+    batches = list(iter_batches(numbers_db, "SELECT n FROM numbers ORDER BY n", batch_size=4))
+    assert [len(rows) for rows in batches] == [4, 4, 2]
+
+    assert next(iter_rows(numbers_db, "SELECT n, label FROM numbers WHERE n = ?", (4,))) == (4, "N1")
+    row = next(iter_rows(numbers_db, "SELECT n, label FROM numbers WHERE n = 4", row_factory="row"))
+    assert (row["n"], row["label"]) == (4, "N1")
+    assert next(iter_rows(numbers_db, "SELECT n FROM numbers WHERE n = 4", row_factory="dict")) == {"n": 4}
+    assert consume(numbers_db, "SELECT * FROM numbers", batch_size=3) == 10
+
+
+def test_digest_ignores_order_but_not_duplicates_or_types():
+    """Testa se o resumo ignora a ordem, mas distingue linhas repetidas, tipos e, com ordered=True, a ordem."""
+    rows = [(1, "a"), (2, "b"), (3, "c")]
+    assert ResultDigest().update(rows) == ResultDigest().update(reversed(rows))
+    assert ResultDigest().update(rows) != ResultDigest().update(rows + [(1, "a")])
+    assert ResultDigest().update([(1, "a"), (1, "a")]) != ResultDigest().update([(1, "a"), (2, "b")])
+    assert ResultDigest().update([(1,)]) != ResultDigest().update([("1",)])
+    assert ResultDigest(ordered=True).update(rows) != ResultDigest(ordered=True).update(reversed(rows))
+
+
+def test_assert_same_results(numbers_db):
+    """Testa se assert_same_results aceita consultas equivalentes e rejeita resultados ou ordens diferentes."""
+    digest = assert_same_results(numbers_db, "SELECT * FROM numbers ORDER BY n DESC",
+                                 "SELECT * FROM numbers ORDER BY label")
+    assert digest.rows == 10
+    with pytest.raises(AssertionError, match="Resultados diferentes"):
+        assert_same_results(numbers_db, "SELECT * FROM numbers", "SELECT * FROM numbers WHERE n < ?",
+                            expected_params=(9,))
+    with pytest.raises(AssertionError):
+        assert_same_results(numbers_db, "SELECT * FROM numbers ORDER BY n DESC", "SELECT * FROM numbers ORDER BY n",
+                            ordered=True)
+
+
+def test_user_orders_verified_in_constant_memory(tmp_path, bench_config):
+    """
+    Confere a view user_orders contra o JOIN equivalente, na maior escala de
+    --scale-sizes, sem carregar o resultado: o pico de memória não cresce com
+    a quantidade de pedidos.
+    """
+    users, orders = bench_config["scale_sizes"][-1]
+    connection = connect(str(tmp_path / "streaming.sqlite"))
+    try:
+        restore_template(connection)
+        populate_users_orders(connection, users, orders, skew=bench_config["scale_skew"])
+
+        # Com --footprint o rastreamento já está ativo e o pico pertence à medição do
+        # teste: sem reset_peak(), o pico só conta se a verificação o ultrapassar
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        baseline, previous_peak = tracemalloc.get_traced_memory()
+        try:
+            digest = assert_same_results(connection, "SELECT name, item FROM user_orders",
+                                         "SELECT users.name, orders.item FROM orders "
+                                         "JOIN users ON users.id = orders.user_id")
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+        growth = (peak if peak > previous_peak else current) - baseline
+
+        assert digest.rows == orders
+        assert digest == digest_query(connection, "SELECT name, item FROM user_orders ORDER BY item", batch_size=10)
+    finally:
+        connection.close()
+    assert growth < 1024 * 1024, f"A verificação deveria usar memória constante (pico de {growth / 1024:.0f} KB)."
@@ -0,0 +1,37 @@
+import json
+import os
+import subprocess
+import sys
+
+SCRIPT = """
+import json, sys
+from warm_runner import main
+runner, exit_code = main(["-q", "-p", "no:cacheprovider", "--db-isolation=test"],
+                         commands=["test_update_user", "", "basic", "list", "inexistente"])
+sys.stderr.write(json.dumps({"runs": runner.runs, "exit_code": int(exit_code)}))
+"""
+
+
+def test_warm_runner_repeats_selection():
+    """Testa se o runner executa várias seleções no mesmo processo, repetindo a última com Enter."""
+    result = subprocess.run([sys.executable, "-c", SCRIPT], capture_output=True, text=True,
+                            timeout=120, cwd=os.path.dirname(os.path.abspath(__file__)))
+    outcome = json.loads(result.stderr.strip().splitlines()[-1])
+
+    assert outcome["exit_code"] == 0
+    assert [run["tests"] for run in outcome["runs"]] == [1, 1, 5]
+    assert all(run["failed"] == 0 for run in outcome["runs"])
+
+
+def test_warm_runner_restores_session_database_between_runs():
+    """Testa se, no isolamento padrão (session), repetir testes que gravam no banco encontra o esquema limpo."""
+    script = SCRIPT.replace(', "--db-isolation=test"', "").replace(
+        '["test_update_user", "", "basic", "list", "inexistente"]',
+        '["test_like_query", "test_like_query", "test_transaction_rollback", ""]')
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                            timeout=120, cwd=os.path.dirname(os.path.abspath(__file__)))
+    outcome = json.loads(result.stderr.strip().splitlines()[-1])
+
+    assert outcome["exit_code"] == 0
+    assert [run["tests"] for run in outcome["runs"]] == [1, 1, 1, 1]
+    assert all(run["failed"] == 0 for run in outcome["runs"]), result.stdout
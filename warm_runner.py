@@ -0,0 +1,211 @@
+import glob
+import os
+import sys
+import time
+
+import pytest
+from colorama import Fore, Style, init
+
+from run_testes import SUITES, TEST_DESCRIPTIONS
+
+# Inicializar colorama
+init(autoreset=True)
+
+# Backend da sessão, guardado no config.stash pelo conftest.py para que run() o restaure
+session_backend_key = pytest.StashKey()
+
+# Intervalo entre verificações de arquivos alterados no modo watch
+WATCH_INTERVAL = 0.5
+
+HELP = """Comandos:
+  <nomes>         executa os testes cujo nome ou caminho contém algum dos nomes
+                  (aceita também suítes do run_testes.py: basic, index, batch...)
+  all             executa todos os testes coletados
+  (Enter)         repete a última seleção
+  list            lista os testes coletados
+  watch [nomes]   reexecuta a seleção sempre que um arquivo .py mudar (Ctrl+C para parar)
+  quit            encerra"""
+
+
+def source_mtimes(directory):
+    """Data de modificação de cada arquivo .py do diretório."""
+    return {path: os.path.getmtime(path) for path in glob.glob(os.path.join(directory, "*.py"))}
+
+
+class WarmRunner:
+    """
+    Plugin do pytest que substitui o laço de execução padrão: os testes são
+    coletados uma única vez e executados sob demanda, quantas vezes for preciso,
+    no mesmo processo. Fixtures de sessão (como setup_database e a imagem-modelo
+    do esquema) e módulos importados continuam prontos entre as execuções.
+    """
+
+    def __init__(self, commands=None):
+        # Comandos pré-definidos (para uso não interativo); sem eles, lê do terminal
+        self.commands = iter(commands) if commands is not None else None
+        self.session = None
+        self.last_selection = []
+        self.failed = set()
+        self.runs = []
+
+    def read_command(self):
+        if self.commands is not None:
+            return next(self.commands, "quit")
+
+        capture = self.session.config.pluginmanager.getplugin("capturemanager")
+        capture.suspend_global_capture(in_=True)
+        try:
+            return input(f"\n{Fore.CYAN}warm> {Style.RESET_ALL}")
+        except EOFError:
+            return "quit"
+        finally:
+            capture.resume_global_capture()
+
+    def select(self, names):
+        """Itens cujo nodeid contém algum dos nomes (ou dos testes das suítes informadas)."""
+        patterns = []
+        for name in names:
+            for item in SUITES.get(name, [name]):
+                patterns.append("" if item == "." else item)
+        return [item for item in self.session.items if any(pattern in item.nodeid for pattern in patterns)]
+
+    def reset_database(self):
+        """
+        Restaura o banco da sessão a partir do modelo, para que cada execução
+        encontre o mesmo estado inicial. Com --db-isolation=test cada teste já
+        recebe um banco novo; a primeira execução usa o banco recém-criado por
+        setup_database.
+        """
+        backend = self.session.config.stash.get(session_backend_key, None)
+        if backend is not None and self.session.config.getoption("--db-isolation") != "test":
+            backend.reset()
+
+    def run(self, items):
+        """Executa os itens mantendo as fixtures de sessão e de módulo entre eles."""
+        self.failed = set()
+        start = time.perf_counter()
+        if self.runs:
+            self.reset_database()
+        # Desmonta os módulos da execução anterior que não fazem parte desta (ou
+        # que foram recriados por recollect()); a sessão e suas fixtures ficam
+        if items:
+            self.session._setupstate.teardown_exact(items[0])
+        for index, item in enumerate(items):
+            following = items[index + 1] if index + 1 < len(items) else None
+            # No último item, o "próximo" é o próprio módulo: o teardown desmonta as
+            # fixtures do teste, mas preserva as de módulo e de sessão para a próxima execução
+            item.ihook.pytest_runtest_protocol(item=item, nextitem=following or item.parent)
+        elapsed = time.perf_counter() - start
+
+        self.runs.append({"tests": len(items), "failed": len(self.failed), "seconds": elapsed})
+        color = Fore.RED if self.failed else Fore.GREEN
+        print(f"\n{color}{len(items)} teste(s), {len(self.failed)} com falha, em {elapsed * 1000:.1f} ms{Style.RESET_ALL}")
+
+    def pytest_runtest_logreport(self, report):
+        if report.failed:
+            self.failed.add(report.nodeid)
+
+    def recollect(self, changed):
+        """
+        Recarrega os módulos de teste alterados e coleta apenas os testes deles,
+        sob o mesmo diretório (as fixtures do conftest.py continuam válidas).
+        Mudanças em outros arquivos (conftest.py, database.py...) ou arquivos de
+        teste novos exigem reiniciar o processo.
+        """
+        modules = {}
+        for item in self.session.items:
+            module = item.getparent(pytest.Module)
+            modules.setdefault(str(module.path), module)
+
+        if any(path not in modules for path in changed):
+            print(f"{Fore.YELLOW}Arquivos de suporte alterados; reiniciando o runner...{Style.RESET_ALL}")
+            self.session.config.pluginmanager.getplugin("capturemanager").stop_global_capturing()
+            os.execv(sys.executable, [sys.executable, os.path.abspath(__file__), *sys.argv[1:]])
+
+        items = []
+        replaced = {}
+        for old in modules.values():
+            if str(old.path) not in changed:
+                continue
+            sys.modules.pop(old.path.stem, None)
+            replaced[old] = list(self.session.genitems(pytest.Module.from_parent(old.parent, path=old.path)))
+        for item in self.session.items:
+            module = item.getparent(pytest.Module)
+            if module not in replaced:
+                items.append(item)
+            elif replaced[module] is not None:
+                items.extend(replaced[module])
+                replaced[module] = None
+        self.session.items = items
+        print(f"{Fore.YELLOW}Recoletados os testes de "
+              f"{', '.join(os.path.basename(path) for path in changed)}{Style.RESET_ALL}")
+
+    def watch(self, names):
+        directory = str(self.session.config.rootpath)
+        mtimes = source_mtimes(directory)
+        self.run(self.select(names))
+        try:
+            while True:
+                time.sleep(WATCH_INTERVAL)
+                current = source_mtimes(directory)
+                changed = [path for path, mtime in current.items() if mtimes.get(path) != mtime]
+                if not changed:
+                    continue
+                mtimes = current
+                self.recollect(changed)
+                self.run(self.select(names))
+        except KeyboardInterrupt:
+            print(f"\n{Fore.YELLOW}Modo watch encerrado.{Style.RESET_ALL}")
+
+    def pytest_runtestloop(self, session):
+        self.session = session
+        if session.config.option.collectonly:
+            return True
+        # run() desmonta as fixtures pelo SetupState da sessão, que é interno do
+        # pytest (na forma atual desde o pytest 7): falha logo se ele mudar
+        if not hasattr(getattr(session, "_setupstate", None), "teardown_exact"):
+            raise pytest.UsageError(f"warm_runner.py não é compatível com o pytest {pytest.__version__}: "
+                                    "Session._setupstate.teardown_exact não existe mais.")
+
+        print(f"\n{Fore.GREEN}{len(session.items)} testes coletados e prontos.{Style.RESET_ALL}")
+        if self.commands is None:
+            print(HELP)
+
+        while True:
+            command = self.read_command().strip()
+            name, _, rest = command.partition(" ")
+            if command == "quit" or command == "q":
+                break
+            if command == "list":
+                for item in session.items:
+                    description = TEST_DESCRIPTIONS.get(item.name, "")
+                    print(f"{Fore.YELLOW}{item.nodeid}{Style.RESET_ALL} {description}")
+                continue
+            if name == "watch":
+                self.watch(rest.split() or self.last_selection or ["all"])
+                continue
+
+            names = self.last_selection if not command else command.split()
+            if not names:
+                print(HELP)
+                continue
+            items = self.select(names)
+            if not items:
+                print(f"{Fore.RED}Nenhum teste corresponde a: {' '.join(names)}{Style.RESET_ALL}")
+                continue
+            self.last_selection = names
+            self.run(items)
+        return True
+
+
+def main(argv=None, commands=None):
+    """Inicia o runner; argumentos são repassados ao pytest (ex.: --db-isolation=test)."""
+    runner = WarmRunner(commands)
+    exit_code = pytest.main(["-v", *(sys.argv[1:] if argv is None else argv)], plugins=[runner])
+    return runner, exit_code
+
+
+if __name__ == "__main__":
+    # O conftest.py importa este módulo pelo nome: executá-lo por ele mantém uma única session_backend_key
+    from warm_runner import main as run
+    run()